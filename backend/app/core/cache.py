@@ -0,0 +1,171 @@
+from typing import Any, Dict, Optional, Tuple
+from collections import OrderedDict
+import json
+import time
+import threading
+
+from app.db.sqlite import get_connection, get_connection_lock
+
+class VersionedCache:
+    """
+    In-process cache whose entries are only served for the data version
+    they were built from, so bumping the version invalidates them.
+    """
+    def __init__(self):
+        self._entries: Dict[str, Tuple[Any, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, version: Any) -> Optional[Any]:
+        """Get the cached value for a key if it was built from this version"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        return entry[1]
+
+    def set(self, key: str, version: Any, value: Any) -> None:
+        """Cache a value built from the given data version"""
+        with self._lock:
+            self._entries[key] = (version, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class TieredCache:
+    """
+    Key/value cache with an in-process LRU in front of a SQLite table.
+    Disk writes are batched and the table is kept under max_disk_items by
+    evicting the least recently used rows. Values are stored as JSON.
+    Without a db_path only the memory tier is used.
+    """
+    def __init__(
+        self,
+        db_path: Optional[str],
+        table: str,
+        max_memory_items: int = 10000,
+        max_disk_items: int = 1000000,
+        write_batch_size: int = 256
+    ):
+        self.db_path = db_path
+        self.table = table
+        self.max_memory_items = max_memory_items
+        self.max_disk_items = max_disk_items
+        self.write_batch_size = write_batch_size
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._pending: Dict[str, str] = {}
+        self._touched: Dict[str, None] = {}
+        self._lock = threading.RLock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.conn = get_connection(db_path) if db_path else None
+        # Held around disk access only, so memory hits don't wait on other
+        # users of the shared connection
+        self._conn_lock = get_connection_lock(db_path) if db_path else None
+        if self.conn is not None:
+            with self._conn_lock:
+                self.conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL,
+                        last_used REAL NOT NULL
+                    ) WITHOUT ROWID
+                """)
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_last_used ON {table} (last_used)")
+                self.conn.commit()
+                self._disk_items = self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached value, promoting disk hits into memory"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+            raw = self._pending.get(key)
+            if raw is None and self.conn is not None:
+                with self._conn_lock:
+                    row = self.conn.execute(f"SELECT value FROM {self.table} WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    raw = row[0]
+                    # Refreshing last_used keeps rows that are still read from being evicted
+                    self._touched[key] = None
+            if raw is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            value = json.loads(raw)
+            self._remember(key, value)
+            self._maybe_flush()
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._remember(key, value)
+            if self.conn is not None:
+                self._pending[key] = json.dumps(value)
+                self._maybe_flush()
+
+    def flush(self) -> None:
+        """Write batched entries to disk and evict the oldest rows over the limit"""
+        with self._lock:
+            if self.conn is None or not (self._pending or self._touched):
+                return
+            now = time.time()
+            with self._conn_lock, self.conn:
+                before = self.conn.total_changes
+                self.conn.executemany(
+                    f"INSERT INTO {self.table} (key, value, last_used) VALUES (?, ?, ?) ON CONFLICT(key) DO NOTHING",
+                    [(key, raw, now) for key, raw in self._pending.items()]
+                )
+                self._disk_items += self.conn.total_changes - before
+                self.conn.executemany(
+                    f"UPDATE {self.table} SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in self._touched]
+                )
+                self._pending.clear()
+                self._touched.clear()
+                if self._disk_items > self.max_disk_items:
+                    # Evict down to 90% so eviction doesn't run on every flush
+                    self.conn.execute(
+                        f"DELETE FROM {self.table} WHERE key IN "
+                        f"(SELECT key FROM {self.table} ORDER BY last_used LIMIT ?)",
+                        (self._disk_items - int(self.max_disk_items * 0.9),)
+                    )
+                    self._disk_items = self.conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def stats(self) -> Dict[str, float]:
+        """Hit counters since the cache was created"""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "memory_items": len(self._memory),
+                "disk_items": self._disk_items if self.conn is not None else 0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._pending.clear()
+            self._touched.clear()
+            self.memory_hits = self.disk_hits = self.misses = 0
+            if self.conn is not None:
+                with self._conn_lock, self.conn:
+                    self.conn.execute(f"DELETE FROM {self.table}")
+                self._disk_items = 0
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _maybe_flush(self) -> None:
+        if len(self._pending) + len(self._touched) >= self.write_batch_size:
+            self.flush()
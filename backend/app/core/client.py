@@ -1,9 +1,123 @@
+from typing import Optional
+import os
+import time
+import random
+import logging
+import threading
 import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Shared by every upstream integration (BLS, FRED, market data)
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "30"))
+HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "30"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_SECONDS = float(os.getenv("HTTP_BACKOFF_SECONDS", "0.5"))
+
+# Throttling and transient upstream failures are worth another attempt
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SECONDS
+    )
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(HTTP_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS)
 
 class HTTPClient:
-    client: httpx.Client = None
+    """
+    Process-wide pooled HTTP clients with keep-alive, opened at app startup
+    and closed at shutdown. Upstream calls (BLS, FRED) use the httpx client
+    from sync routes, jobs and worker threads; libraries built on requests
+    (yfinance) get a pooled session with the same limits and retries.
+    """
+    client: Optional[httpx.Client] = None
+    session: Optional[requests.Session] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_client(cls) -> httpx.Client:
+        with cls._lock:
+            if cls.client is None:
+                cls.client = httpx.Client(limits=_limits(), timeout=_timeout())
+            return cls.client
+
+    @classmethod
+    def get_session(cls) -> requests.Session:
+        with cls._lock:
+            if cls.session is None:
+                retry = Retry(
+                    total=HTTP_MAX_RETRIES,
+                    backoff_factor=HTTP_BACKOFF_SECONDS,
+                    status_forcelist=sorted(RETRY_STATUSES),
+                    allowed_methods=None,
+                    respect_retry_after_header=True
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    pool_maxsize=HTTP_MAX_CONNECTIONS,
+                    max_retries=retry
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                cls.session = session
+            return cls.session
+
+    @classmethod
+    def close(cls) -> None:
+        """Close the client and session; called at app shutdown"""
+        with cls._lock:
+            client, cls.client = cls.client, None
+            session, cls.session = cls.session, None
+        if client is not None:
+            client.close()
+        if session is not None:
+            session.close()
+
+def retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """
+    Seconds to wait before the next attempt: the server's Retry-After when
+    it sends one, otherwise exponential backoff with jitter
+    """
+    if response is not None:
+        retry_after = response.headers.get("retry-after")
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+    return HTTP_BACKOFF_SECONDS * (2 ** attempt) * (1 + random.random() * 0.25)
 
-    def get_client(cls):
-        if cls.client is None:
-            cls.client = httpx.Client()
-        return cls.client
\ No newline at end of file
+def request_with_retry(
+    method: str,
+    url: str,
+    client: Optional[httpx.Client] = None,
+    max_retries: int = HTTP_MAX_RETRIES,
+    **kwargs
+) -> httpx.Response:
+    """
+    Send a request on the shared client, retrying transport errors and
+    retryable statuses with backoff. The last response is returned as is.
+    """
+    client = client or HTTPClient.get_client()
+    for attempt in range(max_retries + 1):
+        try:
+            response = client.request(method, url, **kwargs)
+        except httpx.TransportError as e:
+            if attempt == max_retries:
+                raise
+            logger.warning(f"{method} {url} failed ({e!r}), retrying")
+            time.sleep(retry_delay(attempt))
+            continue
+        if response.status_code not in RETRY_STATUSES or attempt == max_retries:
+            return response
+        logger.warning(f"{method} {url} returned {response.status_code}, retrying")
+        time.sleep(retry_delay(attempt, response))
+    return response
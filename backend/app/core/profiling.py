@@ -0,0 +1,231 @@
+from typing import Any, Dict, Optional, Tuple
+from datetime import datetime
+from urllib.parse import parse_qs
+import os
+import re
+import sys
+import json
+import time
+import hmac
+import inspect
+import logging
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Off unless enabled and given a token; requests opt in with the token in the
+# X-Profile-Token header. Never in the query string, which access logs and
+# proxies record.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_DIR = os.getenv("PROFILING_DIR", os.path.join(tempfile.gettempdir(), "investor_gps_profiles"))
+PROFILING_INTERVAL_MS = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+PROFILING_TOP_N = int(os.getenv("PROFILING_TOP_N", "25"))
+
+TOKEN_HEADER = b"x-profile-token"
+OUTPUT_HEADER = b"x-profile-output"
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    # Trim interpreter and site-packages prefixes so labels stay readable
+    for marker in ("site-packages" + os.sep, "backend" + os.sep):
+        if marker in filename:
+            filename = filename.rsplit(marker, 1)[1]
+            break
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+class SamplingProfiler:
+    """
+    Statistical profiler for one request. A background thread samples the
+    stacks of the threads currently executing the request's endpoint every
+    interval, from the endpoint frame down to the leaf. Sync endpoints run
+    on the threadpool and async ones on the event loop; matching on the
+    endpoint's code object finds either without instrumenting the code.
+    Concurrent requests to the same endpoint are sampled too.
+    """
+    def __init__(self, scope: Dict[str, Any], interval: float = PROFILING_INTERVAL_MS / 1000.0):
+        self.scope = scope
+        self.interval = interval
+        self.samples = 0
+        self._stacks: Dict[Tuple[Any, ...], int] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample(own_id)
+
+    def _endpoint_code(self):
+        # The router sets scope["endpoint"] once the path has matched
+        endpoint = self.scope.get("endpoint")
+        return getattr(inspect.unwrap(endpoint), "__code__", None) if endpoint is not None else None
+
+    def sample(self, own_id: Optional[int] = None) -> None:
+        """Record the endpoint stacks of every thread running it right now"""
+        endpoint_code = self._endpoint_code()
+        if endpoint_code is None:
+            return
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                if frame.f_code is endpoint_code:
+                    key = tuple(reversed(stack))
+                    self._stacks[key] = self._stacks.get(key, 0) + 1
+                    self.samples += 1
+                    break
+                frame = frame.f_back
+
+    def report(self, top_n: int = PROFILING_TOP_N) -> Dict[str, Any]:
+        """
+        Get the call tree and the hottest functions. Seconds are estimated
+        as samples times the interval.
+        """
+        tree: Dict[str, Any] = {"function": "<request>", "samples": 0, "children": {}}
+        self_samples: Dict[str, int] = {}
+        total_samples: Dict[str, int] = {}
+        for stack, count in self._stacks.items():
+            labels = [_frame_label(code) for code in stack]
+            node = tree
+            node["samples"] += count
+            for label in labels:
+                node = node["children"].setdefault(label, {"function": label, "samples": 0, "children": {}})
+                node["samples"] += count
+            self_samples[labels[-1]] = self_samples.get(labels[-1], 0) + count
+            # Recursive functions count once per sample in the inclusive total
+            for label in set(labels):
+                total_samples[label] = total_samples.get(label, 0) + count
+
+        def finish(node: Dict[str, Any]) -> Dict[str, Any]:
+            children = sorted(node["children"].values(), key=lambda child: -child["samples"])
+            return {
+                "function": node["function"],
+                "samples": node["samples"],
+                "seconds": node["samples"] * self.interval,
+                "children": [finish(child) for child in children],
+            }
+
+        hot = sorted(total_samples, key=lambda label: (-self_samples.get(label, 0), -total_samples[label]))
+        return {
+            "interval_seconds": self.interval,
+            "samples": self.samples,
+            "top": [
+                {
+                    "function": label,
+                    "self_samples": self_samples.get(label, 0),
+                    "total_samples": total_samples[label],
+                    "self_seconds": self_samples.get(label, 0) * self.interval,
+                    "total_seconds": total_samples[label] * self.interval,
+                }
+                for label in hot[:top_n]
+            ],
+            "call_tree": finish(tree),
+        }
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling single requests on demand. A request carrying
+    the admin token in the X-Profile-Token header is profiled and its report
+    written to profile_dir; the file is named in the X-Profile-File response
+    header. With X-Profile-Output: response (or profile_output=response) the
+    report replaces the body. Other requests pass straight through.
+    """
+    def __init__(
+        self,
+        app,
+        token: str = PROFILING_TOKEN,
+        profile_dir: str = PROFILING_DIR,
+        interval: float = PROFILING_INTERVAL_MS / 1000.0,
+        top_n: int = PROFILING_TOP_N
+    ):
+        self.app = app
+        self.token = token
+        self.profile_dir = profile_dir
+        self.interval = interval
+        self.top_n = top_n
+
+    def _requested(self, scope) -> Tuple[bool, bool]:
+        """Whether to profile the request and whether to return the report"""
+        if not self.token:
+            return False, False
+        headers = dict(scope.get("headers") or [])
+        supplied = headers.get(TOKEN_HEADER, b"")
+        if not supplied or not hmac.compare_digest(supplied, self.token.encode("utf-8")):
+            return False, False
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        output = headers.get(OUTPUT_HEADER, b"").decode("latin-1") or query.get("profile_output", [""])[0]
+        return True, output == "response"
+
+    def _report_path(self, scope) -> str:
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        return os.path.join(self.profile_dir, f"{stamp}-{scope['method']}-{slug}.json")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        profile, return_report = self._requested(scope)
+        if not profile:
+            await self.app(scope, receive, send)
+            return
+
+        path = self._report_path(scope)
+        status = [500]
+
+        async def send_profiled(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                if not return_report:
+                    message = dict(message, headers=list(message.get("headers", [])) + [
+                        (b"x-profile-file", os.path.basename(path).encode("latin-1"))
+                    ])
+            # The report replaces the response, so it is dropped
+            if not return_report:
+                await send(message)
+
+        profiler = SamplingProfiler(scope, self.interval)
+        profiler.start()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_profiled)
+        finally:
+            profiler.stop()
+            wall = time.perf_counter() - start
+            report = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status[0],
+                "wall_seconds": wall,
+                **profiler.report(self.top_n),
+            }
+            os.makedirs(self.profile_dir, exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+            logger.info(f"Profiled {scope['method']} {scope['path']} in {wall:.3f}s: {path}")
+
+        if return_report:
+            body = json.dumps(report).encode("utf-8")
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                    (b"x-profile-file", os.path.basename(path).encode("latin-1")),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
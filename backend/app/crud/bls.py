@@ -1,26 +1,231 @@
-from pandas import DataFrame
+from sqlalchemy import text, bindparam
+from sqlalchemy.exc import OperationalError, ProgrammingError
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
-import pandas as pd
+from sqlalchemy.sql.elements import TextClause
+from typing import List, Dict, Any, Optional, Tuple, Union
+from datetime import datetime, timezone
+from pandas import DataFrame
+import base64
+import json
+
+from app.db import snapshots
+from app.db.snapshots import SNAPSHOT_COLUMNS, load_series_history, load_series_range
+
+try:
+    import orjson
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:  # pragma: no cover - orjson is optional
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+# Rows encoded per fetchmany batch on the JSON paths
+JSON_BATCH_SIZE = 1000
+
+MONTH_COLUMNS = [f"M{month:02d}" for month in range(1, 13)]
+
+def fetch_records(db: Session, query: Union[str, TextClause], params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Run a query and return its rows as dicts straight from the cursor.
+    """
+    result = db.execute(text(query) if isinstance(query, str) else query, params or {})
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
+
+def query_to_json(
+    db: Session,
+    query: Union[str, TextClause],
+    params: Optional[Dict[str, Any]] = None,
+    batch_size: int = JSON_BATCH_SIZE
+) -> bytes:
+    """
+    Run a query and encode its rows as a JSON array, batch by batch, without
+    building a DataFrame or an intermediate list of every row.
+    """
+    result = db.execute(text(query) if isinstance(query, str) else query, params or {})
+    keys = list(result.keys())
+    chunks = []
+    while True:
+        rows = result.fetchmany(batch_size)
+        if not rows:
+            break
+        # Encode the batch as one array and drop its brackets
+        chunks.append(dumps([dict(zip(keys, row)) for row in rows])[1:-1])
+    return b"[" + b",".join(chunks) + b"]"
 
 def get_indicators_matrix(db: Session) -> List[Dict[str, Any]]:
     """
     Get BLS indicators with their latest values and changes.
     """
-    query = "SELECT * FROM bls_summary_data"
-    df = pd.read_sql_query(query, db.bind)
-    return df.to_dict('records')
+    return fetch_records(db, "SELECT * FROM bls_summary_data")
+
+def get_indicators_json(db: Session) -> bytes:
+    """
+    Get BLS indicators with their latest values and changes as JSON.
+    """
+    return query_to_json(db, "SELECT * FROM bls_summary_data")
+
+def get_data_version(db: Session) -> Tuple[int, Optional[datetime]]:
+    """
+    Get the BLS data version ingestion bumps on every change, and when it changed.
+    """
+    try:
+        row = db.execute(text("SELECT version, updated_at FROM bls_data_version")).first()
+    except (OperationalError, ProgrammingError):
+        # Nothing has been ingested with versioning yet; server databases
+        # report the missing table as a ProgrammingError
+        return 0, None
+    if row is None:
+        return 0, None
+    return row.version, datetime.fromisoformat(row.updated_at).replace(tzinfo=timezone.utc)
 
 def get_matrix_data(db: Session) -> List[Dict[str, Any]]:
     """
     Get matrix data from materialized view.
     """
-    query = """
-    SELECT * FROM bls_combined_data
+    return fetch_records(db, "SELECT * FROM bls_combined_data")
+
+def get_matrix_data_json(db: Session) -> bytes:
     """
-    
-    df = pd.read_sql_query(query, db.bind)
-    return df.to_dict('records')
+    Get matrix data from materialized view as JSON.
+    """
+    return query_to_json(db, "SELECT * FROM bls_combined_data")
+
+def encode_cursor(series: str, year: int) -> str:
+    """
+    Encode the last (series, year) of a page as an opaque keyset cursor
+    """
+    return base64.urlsafe_b64encode(json.dumps([series, year]).encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Decode a keyset cursor, raising ValueError if it is malformed
+    """
+    try:
+        series, year = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(series), int(year)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+def get_matrix_page(
+    db: Session,
+    series: Optional[List[str]] = None,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    months: Optional[List[str]] = None,
+    cursor: Optional[str] = None,
+    limit: int = 500
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Get one page of matrix data filtered by series and year range with only
+    the requested month columns. Rows are ordered by (series, year) and paged
+    with a keyset cursor, so every filter is a seek on the (series, year) index.
+    Returns the rows and the cursor for the next page, if there is one.
+    """
+    months = months or MONTH_COLUMNS
+    unknown = [month for month in months if month not in MONTH_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown month columns: {', '.join(unknown)}")
+    columns = ", ".join(["series", "year"] + [m for m in MONTH_COLUMNS if m in months] + ["yoy_change"])
+
+    conditions = []
+    params: Dict[str, Any] = {"limit": limit + 1}
+    bindparams = []
+    if series:
+        conditions.append("series IN :series")
+        params["series"] = list(series)
+        bindparams.append(bindparam("series", expanding=True))
+    if start_year is not None:
+        conditions.append("year >= :start_year")
+        params["start_year"] = start_year
+    if end_year is not None:
+        conditions.append("year <= :end_year")
+        params["end_year"] = end_year
+    if cursor:
+        after_series, after_year = decode_cursor(cursor)
+        conditions.append("(series, year) > (:after_series, :after_year)")
+        params.update(after_series=after_series, after_year=after_year)
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = text(
+        f"SELECT {columns} FROM bls_combined_data {where} ORDER BY series, year LIMIT :limit"
+    ).bindparams(*bindparams)
+
+    result = db.execute(query, params)
+    keys = list(result.keys())
+    rows = [dict(zip(keys, row)) for row in result]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["series"], rows[-1]["year"])
+    return rows, next_cursor
+
+def _series_points_query(series_id: str, start: Tuple[int, int], end: Tuple[int, int]):
+    # The indicator lookup is one seek on its unique series_id index and the
+    # (year, month) bounds are one range seek on idx_indicator_time
+    query = text(
+        "SELECT year, month, value, is_preliminary, is_revised FROM time_series_points "
+        "WHERE indicator_id = (SELECT id FROM indicators WHERE series_id = :series_id) "
+        "AND (year, month) >= (:start_year, :start_month) AND (year, month) <= (:end_year, :end_month) "
+        "ORDER BY year, month"
+    )
+    params = {
+        "series_id": series_id,
+        "start_year": start[0], "start_month": start[1],
+        "end_year": end[0], "end_month": end[1],
+    }
+    return query, params
+
+def get_series_points(
+    db: Session,
+    series_id: str,
+    start: Tuple[int, int] = (0, 1),
+    end: Tuple[int, int] = (9999, 12)
+) -> List[Dict[str, Any]]:
+    """
+    Get the observations of one series between two (year, month) bounds, inclusive.
+    """
+    return fetch_records(db, *_series_points_query(series_id, start, end))
+
+def get_series_points_json(
+    db: Session,
+    series_id: str,
+    start: Tuple[int, int] = (0, 1),
+    end: Tuple[int, int] = (9999, 12)
+) -> bytes:
+    """
+    Get the observations of one series between two (year, month) bounds as JSON.
+    On SQLite the range is sliced from the series' memory-mapped snapshot,
+    shared by every worker; other databases are queried directly.
+    """
+    if not snapshots_enabled(db):
+        return query_to_json(db, *_series_points_query(series_id, start, end))
+    try:
+        arrays = load_series_range(db, series_id, start, end, db_path=db.bind.url.database)
+    except OSError:
+        # A stale snapshot that can't be rewritten here, e.g. a read-only volume
+        return query_to_json(db, *_series_points_query(series_id, start, end))
+    if arrays is None:
+        return b"[]"
+    # Flags as 0/1, the same as the SQL path returns them
+    columns = [
+        arrays[name].astype(int).tolist() if name in ("is_preliminary", "is_revised") else arrays[name].tolist()
+        for name in SNAPSHOT_COLUMNS
+    ]
+    return dumps([dict(zip(SNAPSHOT_COLUMNS, row)) for row in zip(*columns)])
+
+def snapshots_enabled(db: Session) -> bool:
+    """Whether series reads can use snapshots: pyarrow is installed and the store is a SQLite file"""
+    url = db.bind.url
+    return snapshots.pa is not None and url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+def get_series_history(db: Session, series_id: str) -> DataFrame:
+    """
+    Get the full history of one series from its memory-mapped columnar snapshot.
+    """
+    return load_series_history(db, series_id, db_path=db.bind.url.database)
 
 def map_series_id_to_name(series_id: str) -> str:
     """
@@ -0,0 +1,57 @@
+from typing import Iterable, List, Tuple
+from datetime import date
+
+# Inclusive integer ranges: years for the BLS planner, ordinals for dates
+Range = Tuple[int, int]
+DateRange = Tuple[date, date]
+
+# Local stores of remote series (BLS, FRED observations, market prices)
+# record the inclusive ranges they have fetched and request only what is
+# missing.
+
+def merge_ranges(ranges: Iterable[Range]) -> List[Range]:
+    """
+    Merge overlapping and adjacent inclusive ranges
+    """
+    merged: List[Range] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def subtract_ranges(wanted: Range, stored: Iterable[Range]) -> List[Range]:
+    """
+    Get the parts of a range not covered by the stored ranges
+    """
+    missing = []
+    cursor, end = wanted
+    for stored_start, stored_end in merge_ranges(stored):
+        if stored_end < cursor:
+            continue
+        if stored_start > end:
+            break
+        if stored_start > cursor:
+            missing.append((cursor, stored_start - 1))
+        cursor = stored_end + 1
+    if cursor <= end:
+        missing.append((cursor, end))
+    return missing
+
+def merge_date_ranges(ranges: Iterable[DateRange]) -> List[DateRange]:
+    """
+    Merge overlapping and adjacent inclusive date ranges
+    """
+    merged = merge_ranges((start.toordinal(), end.toordinal()) for start, end in ranges)
+    return [(date.fromordinal(start), date.fromordinal(end)) for start, end in merged]
+
+def missing_date_ranges(start: date, end: date, fetched: Iterable[DateRange]) -> List[DateRange]:
+    """
+    Get the parts of start..end not covered by the fetched ranges
+    """
+    missing = subtract_ranges(
+        (start.toordinal(), end.toordinal()),
+        [(s.toordinal(), e.toordinal()) for s, e in fetched]
+    )
+    return [(date.fromordinal(s), date.fromordinal(e)) for s, e in missing]
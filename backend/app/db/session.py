@@ -1,16 +1,71 @@
-from sqlalchemy import create_engine
+from typing import Any, Dict
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 
-# Create the services directory if it doesn't exist
+from app.core.metrics import instrument_engine
+from app.db.sqlite import BLS_DB_PATH, SQLITE_PRAGMAS, apply_pragmas
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///app/services/bls_data.db"
+# The BLS store ingestion writes (app/db/sqlite.py). Deliberately not
+# DATABASE_URL: that points at the Postgres database alembic manages, which
+# ingestion doesn't write yet, so the API would read empty tables there.
+BLS_DATABASE_URL = os.getenv("BLS_DATABASE_URL", f"sqlite:///{BLS_DB_PATH}")
+# API reads; point at a replica to take them off the primary
+BLS_DATABASE_READ_URL = os.getenv("BLS_DATABASE_READ_URL", BLS_DATABASE_URL)
+
+# Per process: a deployment holds workers * (pool size + overflow) connections
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """
+    Get the create_engine arguments for a database URL
+    """
+    url = make_url(url)
+    options: Dict[str, Any] = {"echo": DB_ECHO}
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        # In-memory databases use a single connection per thread, no pool to size
+        if url.database not in (None, "", ":memory:"):
+            options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+    else:
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=True
+        )
+    return options
+
+def create_db_engine(url: str = BLS_DATABASE_URL, read_only: bool = False) -> Engine:
+    """
+    Create an engine with the configured pool. SQLite connections get the
+    same pragmas as the ingestion writer; read-only engines refuse writes.
+    """
+    engine = create_engine(url, **engine_options(url))
+    if engine.dialect.name == "sqlite":
+        pragmas = dict(SQLITE_PRAGMAS, query_only="ON") if read_only else SQLITE_PRAGMAS
+
+        @event.listens_for(engine, "connect")
+        def _set_sqlite_pragmas(dbapi_connection, connection_record):
+            apply_pragmas(dbapi_connection, pragmas)
+    elif read_only and engine.dialect.name == "postgresql":
+        engine = engine.execution_options(postgresql_readonly=True)
+    return engine
+
+engine = create_db_engine(BLS_DATABASE_URL)
+read_engine = create_db_engine(BLS_DATABASE_READ_URL, read_only=True)
+instrument_engine(engine, "primary")
+instrument_engine(read_engine, "read")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 Base = declarative_base()
 
@@ -20,4 +75,12 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+# Dependency for the read-only API routes
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
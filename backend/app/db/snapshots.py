@@ -0,0 +1,176 @@
+from typing import Any, Dict, List, Optional, Tuple
+import os
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:  # pragma: no cover - snapshots are skipped without pyarrow
+    pa = None
+
+from app.db.sqlite import BLS_DB_PATH
+
+logger = logging.getLogger(__name__)
+
+# Per-series Arrow IPC files. They are uncompressed so readers can memory-map
+# them and get NumPy arrays without copying, and every worker process shares
+# the same page cache pages.
+SNAPSHOT_DIR = os.getenv("BLS_SNAPSHOT_DIR")
+
+SNAPSHOT_COLUMNS = ["year", "month", "value", "is_preliminary", "is_revised"]
+VERSION_KEY = b"data_version"
+
+_HISTORY_SQL = (
+    "SELECT p.year, p.month, p.value, p.is_preliminary, p.is_revised FROM time_series_points p "
+    "WHERE p.indicator_id = (SELECT id FROM indicators WHERE series_id = :series_id) "
+    "ORDER BY p.year, p.month"
+)
+_VERSION_SQL = "SELECT last_updated FROM indicators WHERE series_id = :series_id"
+
+def snapshot_dir(db_path: str = BLS_DB_PATH) -> str:
+    """
+    Get the snapshot directory for a database file
+    """
+    return SNAPSHOT_DIR or os.path.join(os.path.dirname(os.path.abspath(db_path)), "snapshots")
+
+def snapshot_path(series_id: str, db_path: str = BLS_DB_PATH) -> str:
+    """
+    Get the snapshot file for a series
+    """
+    return os.path.join(snapshot_dir(db_path), f"{series_id}.arrow")
+
+def _execute(conn, sql: str, params: Dict[str, Any]):
+    # Works with both a raw sqlite3 connection and a SQLAlchemy session
+    if hasattr(conn, "bind"):
+        return conn.execute(text(sql), params)
+    return conn.execute(sql, params)
+
+def get_series_version(conn, series_id: str) -> Optional[str]:
+    """
+    Get the data version of a series: when its observations last changed
+    """
+    row = _execute(conn, _VERSION_SQL, {"series_id": series_id}).fetchone()
+    return str(row[0]) if row and row[0] is not None else None
+
+def read_snapshot_version(path: str) -> Optional[str]:
+    """
+    Get the data version a snapshot was written at, reading only its schema
+    """
+    if pa is None or not os.path.exists(path):
+        return None
+    try:
+        with pa.memory_map(path, "r") as source:
+            metadata = ipc.open_file(source).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    version = metadata.get(VERSION_KEY)
+    return version.decode("utf-8") if version is not None else None
+
+def write_series_snapshot(conn, series_id: str, version: str, db_path: str = BLS_DB_PATH) -> str:
+    """
+    Write a series' full history to its snapshot file. The file is replaced
+    atomically, so readers holding the old mapping keep a consistent view.
+    """
+    rows = _execute(conn, _HISTORY_SQL, {"series_id": series_id}).fetchall()
+    columns = list(zip(*rows)) if rows else [[] for _ in SNAPSHOT_COLUMNS]
+    table = pa.table(
+        {
+            "year": pa.array(columns[0], type=pa.int16()),
+            "month": pa.array(columns[1], type=pa.int8()),
+            "value": pa.array(columns[2], type=pa.float64()),
+            "is_preliminary": pa.array([bool(flag) for flag in columns[3]], type=pa.bool_()),
+            "is_revised": pa.array([bool(flag) for flag in columns[4]], type=pa.bool_()),
+        },
+        metadata={VERSION_KEY: version.encode("utf-8"), b"series_id": series_id.encode("utf-8")}
+    )
+
+    path = snapshot_path(series_id, db_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    return path
+
+def refresh_snapshots(conn, series_ids: List[str], db_path: str = BLS_DB_PATH) -> int:
+    """
+    Rewrite the snapshots whose data version is behind the database.
+    Returns the number of snapshots written.
+    """
+    if pa is None:
+        return 0
+    written = 0
+    for series_id in series_ids:
+        version = get_series_version(conn, series_id)
+        if version is None or read_snapshot_version(snapshot_path(series_id, db_path)) == version:
+            continue
+        write_series_snapshot(conn, series_id, version, db_path)
+        written += 1
+    logger.info(f"Refreshed {written} series snapshots")
+    return written
+
+def load_series_arrays(conn, series_id: str, db_path: str = BLS_DB_PATH) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Load a series' full history as NumPy arrays memory-mapped from its
+    snapshot without copying. A stale or missing snapshot is rebuilt first.
+    Returns None for unknown series.
+    """
+    table = _load_series_table(conn, series_id, db_path)
+    if table is None:
+        return None
+    arrays = {}
+    for name in SNAPSHOT_COLUMNS:
+        column = table.column(name)
+        chunk = column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+        # Booleans are bit-packed in Arrow, so only they need a copy
+        arrays[name] = chunk.to_numpy(zero_copy_only=name not in ("is_preliminary", "is_revised"))
+    return arrays
+
+def load_series_range(
+    conn,
+    series_id: str,
+    start: Tuple[int, int],
+    end: Tuple[int, int],
+    db_path: str = BLS_DB_PATH
+) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Get the snapshot arrays of a series between two (year, month) bounds,
+    inclusive. The history is sorted by period, so the bounds are two binary
+    searches and the result is a view, not a copy. Returns None for unknown
+    series.
+    """
+    arrays = load_series_arrays(conn, series_id, db_path)
+    if arrays is None:
+        return None
+    periods = arrays["year"].astype(np.int32) * 100 + arrays["month"]
+    lo = np.searchsorted(periods, start[0] * 100 + start[1], side="left")
+    hi = np.searchsorted(periods, end[0] * 100 + end[1], side="right")
+    return {name: values[lo:hi] for name, values in arrays.items()}
+
+def load_series_history(conn, series_id: str, db_path: str = BLS_DB_PATH) -> pd.DataFrame:
+    """
+    Load a series' full history as a DataFrame backed by its memory-mapped
+    snapshot. Falls back to SQLite when pyarrow is not installed.
+    """
+    if pa is None:
+        rows = _execute(conn, _HISTORY_SQL, {"series_id": series_id}).fetchall()
+        return pd.DataFrame(rows, columns=SNAPSHOT_COLUMNS)
+    table = _load_series_table(conn, series_id, db_path)
+    if table is None:
+        return pd.DataFrame(columns=SNAPSHOT_COLUMNS)
+    return table.to_pandas(split_blocks=True)
+
+def _load_series_table(conn, series_id: str, db_path: str):
+    version = get_series_version(conn, series_id)
+    if version is None:
+        return None
+    path = snapshot_path(series_id, db_path)
+    if read_snapshot_version(path) != version:
+        write_series_snapshot(conn, series_id, version, db_path)
+    # Record batches point into the mapping, so nothing is read until used
+    return ipc.open_file(pa.memory_map(path, "r")).read_all()
@@ -0,0 +1,78 @@
+from typing import Any, Dict, Tuple
+import os
+import sqlite3
+import threading
+import logging
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# The BLS store shared by ingestion (app/services/bls.py) and the API (get_db)
+BLS_DB_PATH = os.getenv(
+    "BLS_DB_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "services", "bls_data.db")
+)
+
+# WAL lets API reads run while ingestion writes; NORMAL sync is durable under WAL
+SQLITE_PRAGMAS: Dict[str, Any] = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),  # negative means KiB
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+}
+
+# Keyed by process too: a connection inherited through fork must not be reused
+_connections: Dict[Tuple[int, str], sqlite3.Connection] = {}
+# Statements from any thread join whatever transaction is open on a shared
+# connection, so every store using it takes this lock around its work
+_connection_locks: Dict[Tuple[int, str], threading.RLock] = {}
+_lock = threading.Lock()
+
+def apply_pragmas(dbapi_connection, pragmas: Dict[str, Any] = None) -> None:
+    """
+    Apply the configured pragmas to a raw sqlite3 connection
+    """
+    cursor = dbapi_connection.cursor()
+    for name, value in (pragmas or SQLITE_PRAGMAS).items():
+        cursor.execute(f"PRAGMA {name} = {value}")
+    cursor.close()
+
+def get_connection(db_path: str = BLS_DB_PATH) -> sqlite3.Connection:
+    """
+    Get the shared connection for a database file, opening it on first use
+    """
+    key = (os.getpid(), db_path)
+    with _lock:
+        conn = _connections.get(key)
+        if conn is None:
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            apply_pragmas(conn)
+            _connections[key] = conn
+            logger.info(f"Opened SQLite connection to {db_path}")
+        return conn
+
+def get_connection_lock(db_path: str = BLS_DB_PATH) -> threading.RLock:
+    """
+    Get the lock serializing transactions on the shared connection for a
+    database file. Hold it from the first statement to the commit.
+    """
+    key = (os.getpid(), db_path)
+    with _lock:
+        lock = _connection_locks.get(key)
+        if lock is None:
+            lock = _connection_locks[key] = threading.RLock()
+        return lock
+
+def close_connections() -> None:
+    """
+    Close every shared connection
+    """
+    with _lock:
+        for (pid, _), conn in _connections.items():
+            if pid == os.getpid():
+                conn.close()
+        _connections.clear()
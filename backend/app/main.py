@@ -1,12 +1,26 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from contextlib import asynccontextmanager
 from datetime import datetime
 
+from app.core.client import HTTPClient
+from app.core.metrics import CONTENT_TYPE, REGISTRY, TimingMiddleware
+from app.core.profiling import PROFILING_ENABLED, PROFILING_TOKEN, ProfilingMiddleware
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled keep-alive client and session per worker for all upstream calls
+    HTTPClient.get_client()
+    HTTPClient.get_session()
+    yield
+    HTTPClient.close()
+
 app = FastAPI(
     title="Investor GPS API",
     description="Financial analytics platform API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -18,6 +32,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# On-demand profiling of single requests; needs an admin token to trigger
+if PROFILING_ENABLED and PROFILING_TOKEN:
+    app.add_middleware(ProfilingMiddleware)
+
+# Outermost, so the timings include the other middleware
+app.add_middleware(TimingMiddleware)
+
 @app.get("/")
 async def root():
     return {
@@ -36,6 +57,10 @@ async def health_check():
         status_code=200
     )
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
 # Import and include routers
 from .routers import macro
 
@@ -1,12 +1,9 @@
 from sqlalchemy import Column, Integer, String, Float, Date, Enum, DateTime, Text, Index, ForeignKey, Table
-from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
-from app.db.base_class import Base
+from app.db.session import Base
 from datetime import datetime
 from sqlalchemy import Boolean
 
-Base = declarative_base()
-
 class MacroIndicator(Base):
     __tablename__ = "macro_indicators"
 
@@ -75,9 +72,11 @@ class TimeSeriesPoint(Base):
     is_revised = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     
-    # Create a composite index for efficient time series queries
+    # Create a composite index for efficient time series queries.
+    # Unique so each observation is upserted in place; range scans for one
+    # indicator are a single seek on it.
     __table_args__ = (
-        Index('idx_indicator_time', 'indicator_id', 'year', 'month'),
+        Index('idx_indicator_time', 'indicator_id', 'year', 'month', unique=True),
     )
 
     # Relationship back to the indicator
@@ -1,22 +1,133 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+from email.utils import format_datetime, parsedate_to_datetime
+import hashlib
 
-from ..db.session import get_db
+from ..core.cache import VersionedCache
+from ..db.session import get_read_db
 from ..crud import bls
 
 router = APIRouter()
 
+# Serialized responses, rebuilt only when ingestion bumps the data version
+response_cache = VersionedCache()
+
+def _is_not_modified(request: Request, etag: str, last_modified) -> bool:
+    """Check the conditional GET headers against the current version"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            return last_modified.replace(microsecond=0) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def _version_headers(db: Session, resource: str) -> Tuple[str, Dict[str, str], Any]:
+    """Build the ETag and Last-Modified headers for a resource at the current data version"""
+    version, updated_at = bls.get_data_version(db)
+    stamp = int(updated_at.timestamp()) if updated_at else 0
+    etag = f'"{resource}-{version}-{stamp}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if updated_at is not None:
+        headers["Last-Modified"] = format_datetime(updated_at, usegmt=True)
+    return etag, headers, updated_at
+
 @router.get("/bls/indicators", response_model=List[Dict[str, Any]])
 def get_bls_indicators(
-    db: Session = Depends(get_db)
+    request: Request,
+    db: Session = Depends(get_read_db)
 ):
     """
     Get BLS indicators with their latest values and changes.
+    Supports conditional GET through ETag/If-None-Match and Last-Modified.
     """
     try:
-        indicators = bls.get_indicators_matrix(db)
-        return indicators
+        etag, headers, updated_at = _version_headers(db, "bls-indicators")
+        if _is_not_modified(request, etag, updated_at):
+            return Response(status_code=304, headers=headers)
+
+        body = response_cache.get("bls_indicators", etag)
+        if body is None:
+            body = bls.get_indicators_json(db)
+            response_cache.set("bls_indicators", etag, body)
+        return Response(content=body, media_type="application/json", headers=headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/bls/matrix")
+def get_bls_matrix(
+    request: Request,
+    series: Optional[List[str]] = Query(None, description="Series names to include"),
+    start_year: Optional[int] = Query(None),
+    end_year: Optional[int] = Query(None),
+    months: Optional[List[str]] = Query(None, description="Month columns to return, e.g. M01"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get a page of BLS matrix data filtered by series, year range and month columns.
+    """
+    try:
+        query_hash = hashlib.sha1(str(request.url.query).encode("utf-8")).hexdigest()[:16]
+        etag, headers, updated_at = _version_headers(db, f"bls-matrix-{query_hash}")
+        if _is_not_modified(request, etag, updated_at):
+            return Response(status_code=304, headers=headers)
+
+        rows, next_cursor = bls.get_matrix_page(
+            db,
+            series=series,
+            start_year=start_year,
+            end_year=end_year,
+            months=months,
+            cursor=cursor,
+            limit=limit
+        )
+        body = bls.dumps({"data": rows, "next_cursor": next_cursor})
+        return Response(content=body, media_type="application/json", headers=headers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _parse_month(value: str) -> Tuple[int, int]:
+    """Parse a YYYY-MM bound into (year, month)"""
+    try:
+        year, month = (int(part) for part in value.split("-"))
+    except ValueError:
+        raise ValueError(f"Expected YYYY-MM, got {value}")
+    if not 1 <= month <= 12:
+        raise ValueError(f"Month out of range in {value}")
+    return year, month
+
+@router.get("/bls/series/{series_id}")
+def get_bls_series(
+    series_id: str,
+    request: Request,
+    start: Optional[str] = Query(None, description="First month, YYYY-MM"),
+    end: Optional[str] = Query(None, description="Last month, YYYY-MM"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get the observations of one BLS series over a month range.
+    """
+    try:
+        start_bound = _parse_month(start) if start else (0, 1)
+        end_bound = _parse_month(end) if end else (9999, 12)
+
+        query_hash = hashlib.sha1(str(request.url).encode("utf-8")).hexdigest()[:16]
+        etag, headers, updated_at = _version_headers(db, f"bls-series-{query_hash}")
+        if _is_not_modified(request, etag, updated_at):
+            return Response(status_code=304, headers=headers)
+
+        body = bls.get_series_points_json(db, series_id, start_bound, end_bound)
+        return Response(content=body, media_type="application/json", headers=headers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,12 +1,20 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
-import requests
-import json
 import logging
-import prettytable
 import sqlite3
+import sys
+import httpx
 import pandas as pd
 from pandas import DataFrame
+from sqlalchemy.dialects.sqlite import dialect as sqlite_dialect
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.core.client import request_with_retry
+from app.core.metrics import track_upstream
+from app.db.snapshots import refresh_snapshots
+from app.db.sqlite import BLS_DB_PATH, get_connection, get_connection_lock
+from app.models.macro import Indicator, TimeSeriesPoint, IndicatorRevision
+from app.services.bls_planner import BLSRequestPlanner
 
 logger = logging.getLogger(__name__)
 
@@ -28,119 +36,550 @@ SERIES_MAP = {
     "U.S. Export Price Index": "EIUIQ" # Monthly for BEA End Use, All commodities, not seasonally adjusted
 }
 
+COMBINED_TABLE = "bls_combined_data"
+SUMMARY_TABLE = "bls_summary_data"
+USAGE_TABLE = "bls_api_usage"
+VERSION_TABLE = "bls_data_version"
+MONTH_COLUMNS = [f"M{month:02d}" for month in range(1, 13)]
+COMBINED_COLUMNS = MONTH_COLUMNS + ["yoy_change"]
+
+_COMBINED_UPSERT_SQL = (
+    f"INSERT INTO {COMBINED_TABLE} (series, year, {', '.join(COMBINED_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * (len(COMBINED_COLUMNS) + 2))}) "
+    "ON CONFLICT(series, year) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in COMBINED_COLUMNS)
+    + " WHERE "
+    + " OR ".join(f"{c} IS NOT excluded.{c}" for c in COMBINED_COLUMNS)
+)
+
+_SUMMARY_UPSERT_SQL = (
+    f'INSERT INTO {SUMMARY_TABLE} ("series name", latest_mom_chg, latest_yoy_chg) VALUES (?, ?, ?) '
+    'ON CONFLICT("series name") DO UPDATE SET '
+    "latest_mom_chg = excluded.latest_mom_chg, latest_yoy_chg = excluded.latest_yoy_chg "
+    "WHERE latest_mom_chg IS NOT excluded.latest_mom_chg "
+    "OR latest_yoy_chg IS NOT excluded.latest_yoy_chg"
+)
+
+LONG_FORMAT_TABLES = [Indicator.__table__, TimeSeriesPoint.__table__, IndicatorRevision.__table__]
+
+SERIES_NAMES = {series_id: name for name, series_id in SERIES_MAP.items()}
+
 class BLSError(Exception):
     pass
 
-def fetch_bls_data(series_ids: List[str], start_year: str, end_year: str) -> Dict[str, Any]:
-    """
-    Fetch data from BLS API for given series IDs and date range
-    """
-    headers = {'Content-type': 'application/json'}
-    data = json.dumps({
+def _bls_request(series_ids: List[str], start_year: str, end_year: str) -> Dict[str, Any]:
+    return {
         "seriesid": series_ids,
         "startyear": start_year,
         "endyear": end_year
-    })
-    
+    }
+
+def _parse_bls_response(response: httpx.Response) -> Dict[str, Any]:
     try:
-        response = requests.post(BLS_API_URL, data=data, headers=headers)
         response.raise_for_status()
-        json_data = json.loads(response.text)
-        
-        if not json_data.get('Results'):
-            raise BLSError("No results returned from BLS API")
-            
-        return json_data
-    except requests.exceptions.RequestException as e:
+        json_data = response.json()
+    except (httpx.HTTPError, ValueError) as e:
+        raise BLSError(f"Failed to fetch BLS data: {str(e)}")
+
+    if json_data.get('status') not in (None, 'REQUEST_SUCCEEDED'):
+        raise BLSError(f"BLS API request failed: {json_data.get('message')}")
+    if not json_data.get('Results'):
+        raise BLSError("No results returned from BLS API")
+    # Limit violations are reported here while the payload is silently cut short
+    for message in json_data.get('message', []):
+        logger.warning(f"BLS API: {message}")
+
+    return json_data
+
+@track_upstream("bls", "fetch_bls_data")
+def fetch_bls_data(series_ids: List[str], start_year: str, end_year: str) -> Dict[str, Any]:
+    """
+    Fetch data from BLS API for given series IDs and date range, on the
+    shared keep-alive client
+    """
+    try:
+        response = request_with_retry("POST", BLS_API_URL, json=_bls_request(series_ids, start_year, end_year))
+    except httpx.HTTPError as e:
         raise BLSError(f"Failed to fetch BLS data: {str(e)}")
+    return _parse_bls_response(response)
+
+def bls_payload_to_frame(series_list: List[Dict[str, Any]]) -> DataFrame:
+    """
+    Flatten the Results.series payload into one long frame with a row per
+    (series ID, year, period) observation
+    """
+    series_ids, years, periods, values, latest = [], [], [], [], []
+    for series in series_list:
+        for point in series['data']:
+            series_ids.append(series['seriesID'])
+            years.append(point['year'])
+            periods.append(point['period'])
+            values.append(point['value'])
+            latest.append(point.get('latest') == 'true')
+
+    return pd.DataFrame({
+        'series_id': series_ids,
+        'year': years,
+        'period': periods,
+        'value': pd.to_numeric(pd.Series(values, dtype=object), errors='coerce'),
+        'latest': latest
+    })
+
+def process_bls_payload(series_list: List[Dict[str, Any]]) -> Tuple[DataFrame, DataFrame]:
+    """
+    Compute MoM, YoY and the latest-period summary for every series in a
+    BLS payload in one grouped pass.
+    Returns the bls_combined_data and bls_summary_data frames.
+    """
+    df = bls_payload_to_frame(series_list)
+    if df.empty:
+        return (
+            pd.DataFrame(columns=['series', 'year', 'yoy_change']),
+            pd.DataFrame(columns=['series name', 'latest_mom_chg', 'latest_yoy_chg'])
+        )
+
+    df['series'] = df['series_id'].map(SERIES_NAMES).fillna(df['series_id'])
+    df = df.sort_values(['series', 'year', 'period'], ignore_index=True)
+
+    # MoM: change from the previous observation within each series
+    previous = df.groupby('series', sort=False)['value'].shift()
+    df['mom_change'] = (df['value'] / previous - 1).round(3) * 100
+
+    # Latest observation per series, preferring the API's own latest flag
+    latest = (
+        df.sort_values(['series', 'latest', 'year', 'period'])
+        .groupby('series', sort=False)
+        .tail(1)
+        .set_index('series')
+    )
+
+    # YoY: change in each series' latest month from one year row to the next
+    latest_month = df[df['period'] == df['series'].map(latest['period'])]
+    previous = latest_month.groupby('series', sort=False)['value'].shift()
+    yoy = ((latest_month['value'] / previous - 1).round(3) * 100).rename('yoy_change')
+    yoy.index = pd.MultiIndex.from_frame(latest_month[['series', 'year']])
+
+    combined = df.pivot(index=['series', 'year'], columns='period', values='mom_change')
+    combined['yoy_change'] = yoy
+    combined = combined.reset_index()
+    combined.columns.name = None
+
+    latest_key = pd.MultiIndex.from_arrays([latest.index, latest['year']])
+    summary = pd.DataFrame({
+        'series name': latest.index,
+        'latest_mom_chg': latest['mom_change'].to_numpy(),
+        'latest_yoy_chg': yoy.reindex(latest_key).to_numpy()
+    })
+
+    logger.info(f"Processed {len(df)} observations for {len(summary)} series")
+    return combined, summary
+
+def process_bls_data(data: List[Dict[str, Any]], series_id: str) -> Tuple[DataFrame, DataFrame]:
+    """
+    Process a single series' BLS data into its combined and summary frames
+    """
+    return process_bls_payload([{'seriesID': series_id, 'data': data}])
+
+def ensure_bls_schema(conn: sqlite3.Connection) -> None:
+    """
+    Create the BLS tables and the unique keys the upserts rely on.
+    Observations live in the long-format indicators/time_series_points tables;
+    bls_combined_data and bls_summary_data are views materialized from them.
+    Tables left behind by the old drop-and-append flow are upgraded in place.
+    """
+    for table in LONG_FORMAT_TABLES:
+        conn.execute(str(CreateTable(table, if_not_exists=True).compile(dialect=sqlite_dialect())))
+        for index in table.indexes:
+            conn.execute(str(CreateIndex(index, if_not_exists=True).compile(dialect=sqlite_dialect())))
+
+    month_ddl = ", ".join(f"{m} REAL" for m in MONTH_COLUMNS)
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {COMBINED_TABLE} "
+        f"(series TEXT, year INTEGER, {month_ddl}, yoy_change REAL)"
+    )
+    conn.execute(
+        f'CREATE TABLE IF NOT EXISTS {SUMMARY_TABLE} '
+        f'("series name" TEXT, latest_mom_chg REAL, latest_yoy_chg REAL)'
+    )
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {USAGE_TABLE} (day TEXT PRIMARY KEY, queries INTEGER)")
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} "
+        "(id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER, updated_at TEXT)"
+    )
+
+    # to_sql only created the month columns present in the first series
+    _add_missing_columns(conn, COMBINED_TABLE, {column: "REAL" for column in COMBINED_COLUMNS})
+
+    _ensure_unique_key(conn, COMBINED_TABLE, "uq_bls_combined_series_year", ["series", "year"])
+    _ensure_unique_key(conn, SUMMARY_TABLE, "uq_bls_summary_series", ['"series name"'])
+    conn.commit()
+
+def _add_missing_columns(conn: sqlite3.Connection, table: str, columns: Dict[str, str]) -> None:
+    """Add columns that an older version of a table was created without"""
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for column, column_type in columns.items():
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+def _ensure_unique_key(conn: sqlite3.Connection, table: str, index_name: str, columns: List[str]) -> None:
+    """Create a unique index, dropping duplicate rows from legacy tables first"""
+    indexes = {row[1] for row in conn.execute(f"PRAGMA index_list({table})")}
+    if index_name in indexes:
+        return
+    key = ", ".join(columns)
+    conn.execute(
+        f"DELETE FROM {table} WHERE rowid NOT IN "
+        f"(SELECT MAX(rowid) FROM {table} GROUP BY {key})"
+    )
+    conn.execute(f"CREATE UNIQUE INDEX {index_name} ON {table} ({key})")
+
+def period_to_month(period: str) -> Optional[int]:
+    """
+    Get the month a BLS period is stored under: its own month for monthly
+    periods, the closing month for quarters, None for annual averages
+    """
+    if period.startswith('M') and period != 'M13':
+        return int(period[1:])
+    if period.startswith('Q') and period != 'Q05':
+        return int(period[1:]) * 3
+    return None
 
-def process_bls_data(data: List[Dict[str, Any]], series_id) -> tuple[DataFrame, DataFrame]:
+def month_to_period(month: int, frequency: str) -> str:
     """
-    Process BLS data and print it in a formatted table
+    Get the BLS period code for a stored month
     """
-    series_name = next((k for k, v in SERIES_MAP.items() if v == series_id), 'Unknown')
+    if frequency == "Quarterly":
+        return f"Q{month // 3:02d}"
+    return f"M{month:02d}"
 
-    # Create DataFrame
-    df = pd.DataFrame(data)
-    df['value'] = pd.to_numeric(df['value'])
-    df['series'] = series_name
+def parse_bls_value(value: Any) -> Optional[float]:
+    """
+    Parse an observation value; BLS sends "-" for unavailable observations
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def get_ingestion_state(conn: sqlite3.Connection) -> Dict[str, Tuple[int, int, str]]:
+    """
+    Get the stored (first year, last year, last period) for every ingested series ID.
+    Each bound is one seek on idx_indicator_time, whatever the history length.
+    """
+    rows = conn.execute(
+        "SELECT i.series_id, i.frequency, "
+        "(SELECT p.year FROM time_series_points p WHERE p.indicator_id = i.id "
+        " ORDER BY p.year, p.month LIMIT 1), "
+        "(SELECT p.year * 100 + p.month FROM time_series_points p WHERE p.indicator_id = i.id "
+        " ORDER BY p.year DESC, p.month DESC LIMIT 1) "
+        "FROM indicators i"
+    )
+    return {
+        series_id: (first_year, last // 100, month_to_period(last % 100, frequency))
+        for series_id, frequency, first_year, last in rows
+        if first_year is not None
+    }
+
+def get_remaining_queries(conn: sqlite3.Connection, daily_queries: int) -> int:
+    """
+    Get the number of BLS API queries left in today's quota
+    """
+    row = conn.execute(f"SELECT queries FROM {USAGE_TABLE} WHERE day = ?", (_quota_day(),)).fetchone()
+    return daily_queries - (row[0] if row else 0)
+
+def record_queries(conn: sqlite3.Connection, queries: int) -> None:
+    """
+    Count BLS API queries against today's quota
+    """
+    conn.execute(
+        f"INSERT INTO {USAGE_TABLE} (day, queries) VALUES (?, ?) "
+        "ON CONFLICT(day) DO UPDATE SET queries = queries + excluded.queries",
+        (_quota_day(), queries)
+    )
+    conn.commit()
+
+def bump_data_version(conn: sqlite3.Connection) -> None:
+    """
+    Mark the stored BLS data as changed so API response caches are rebuilt
+    """
+    conn.execute(
+        f"INSERT INTO {VERSION_TABLE} (id, version, updated_at) VALUES (1, 1, ?) "
+        "ON CONFLICT(id) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at",
+        (datetime.utcnow().isoformat(),)
+    )
+
+def _quota_day() -> str:
+    # The BLS quota resets at midnight Eastern; UTC keeps the counter conservative
+    return datetime.utcnow().date().isoformat()
+
+def get_latest_period(data: List[Dict[str, Any]]) -> Tuple[int, str]:
+    """
+    Get the (year, period) of the newest observation in a BLS series payload
+    """
+    for point in data:
+        if point.get('latest') == 'true':
+            return int(point['year']), point['period']
+    newest = max(data, key=lambda point: (point['year'], point['period']))
+    return int(newest['year']), newest['period']
+
+def stored_year_ranges(state: Dict[str, Tuple[int, int, str]]) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    Get the year ranges that need no refetch for every stored series.
+    The last stored year may be incomplete, so it is always fetched again.
+    """
+    return {
+        series_id: [(first_year, last_year - 1)]
+        for series_id, (first_year, last_year, _) in state.items()
+        if first_year <= last_year - 1
+    }
+
+def upsert_time_series_points(conn: sqlite3.Connection, series_list: List[Dict[str, Any]]) -> Tuple[Dict[str, int], int]:
+    """
+    Upsert raw observations into time_series_points without committing.
+    Changed values are recorded in indicator_revisions and flagged is_revised.
+    Returns the first year with a new or changed observation per series ID,
+    and the number of observations written.
+    """
+    now = datetime.utcnow().isoformat()
+    conn.executemany(
+        "INSERT INTO indicators (name, series_id, frequency, last_updated) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT(series_id) DO NOTHING",
+        [
+            (
+                SERIES_NAMES.get(series['seriesID'], series['seriesID']),
+                series['seriesID'],
+                "Quarterly" if series['data'][0]['period'].startswith('Q') else "Monthly",
+                now
+            )
+            for series in series_list
+        ]
+    )
+
+    inserts, updates, revisions = [], [], []
+    first_changed: Dict[str, int] = {}
+    for series in series_list:
+        series_id = series['seriesID']
+        indicator_id = conn.execute("SELECT id FROM indicators WHERE series_id = ?", (series_id,)).fetchone()[0]
+
+        points = {}
+        for point in series['data']:
+            month = period_to_month(point['period'])
+            value = parse_bls_value(point.get('value'))
+            # Unavailable observations ("-", e.g. months a shutdown skipped) aren't stored
+            if month is None or value is None:
+                continue
+            footnotes = [note for note in point.get('footnotes', []) if note]
+            points[(int(point['year']), month)] = (
+                value,
+                "; ".join(note.get('text', '') for note in footnotes) or None,
+                any(note.get('code') == 'P' for note in footnotes)
+            )
+        if not points:
+            continue
+
+        # One range seek over the fetched years
+        existing = {
+            (year, month): (point_id, value, footnotes, bool(is_preliminary))
+            for point_id, year, month, value, footnotes, is_preliminary in conn.execute(
+                "SELECT id, year, month, value, footnotes, is_preliminary FROM time_series_points "
+                "WHERE indicator_id = ? AND year >= ?",
+                (indicator_id, min(year for year, _ in points))
+            )
+        }
+
+        changed_years = []
+        for (year, month), (value, footnotes, is_preliminary) in points.items():
+            stored = existing.get((year, month))
+            if stored is None:
+                inserts.append((indicator_id, year, month, value, footnotes, is_preliminary, False, now))
+                changed_years.append(year)
+            elif stored[1:] != (value, footnotes, is_preliminary):
+                is_revised = stored[1] != value
+                updates.append((value, footnotes, is_preliminary, is_revised, stored[0]))
+                if is_revised:
+                    revisions.append((stored[0], stored[1], value, now, f"BLS revision of {year} {month:02d}"))
+                changed_years.append(year)
+        if changed_years:
+            first_changed[series_id] = min(changed_years)
+
+    conn.executemany(
+        "INSERT INTO time_series_points "
+        "(indicator_id, year, month, value, footnotes, is_preliminary, is_revised, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        inserts
+    )
+    conn.executemany(
+        "UPDATE time_series_points SET value = ?, footnotes = ?, is_preliminary = ?, "
+        "is_revised = is_revised OR ? WHERE id = ?",
+        updates
+    )
+    conn.executemany(
+        "INSERT INTO indicator_revisions "
+        "(time_series_point_id, previous_value, new_value, revision_date, revision_note) "
+        "VALUES (?, ?, ?, ?, ?)",
+        revisions
+    )
+    conn.executemany(
+        "UPDATE indicators SET last_updated = ? WHERE series_id = ?",
+        [(now, series_id) for series_id in first_changed]
+    )
+
+    logger.info(f"Stored {len(inserts)} new and {len(updates)} updated observations")
+    return first_changed, len(inserts) + len(updates)
+
+def load_series_payload(conn: sqlite3.Connection, start_years: Dict[str, int]) -> List[Dict[str, Any]]:
+    """
+    Rebuild Results.series payloads from time_series_points, from each series'
+    start year to its latest observation, with one index seek per series
+    """
+    series_list = []
+    for series_id, start_year in start_years.items():
+        rows = conn.execute(
+            "SELECT i.frequency, p.year, p.month, p.value FROM indicators i "
+            "JOIN time_series_points p ON p.indicator_id = i.id "
+            "WHERE i.series_id = ? AND p.year >= ? ORDER BY p.year, p.month",
+            (series_id, start_year)
+        ).fetchall()
+        data = [
+            {'year': str(year), 'period': month_to_period(month, frequency), 'value': value, 'latest': 'false'}
+            for frequency, year, month, value in rows
+        ]
+        if data:
+            data[-1]['latest'] = 'true'
+            series_list.append({'seriesID': series_id, 'data': data})
+    return series_list
 
-    # Pivot the DataFrame
-    pivoted_df = df.pivot(
-        index=['series', 'year'],
-        columns='period',
-        values='value'
-    ).reset_index()
+def upsert_bls_data(conn: sqlite3.Connection, combined_df: DataFrame, summary_df: DataFrame) -> int:
+    """
+    Upsert materialized rows for all series with one executemany per table,
+    without committing. The frames should only hold the rows to write;
+    unchanged rows are left untouched. Returns the number of rows written.
+    """
+    before = conn.total_changes
 
-    pivoted_df.columns.name = None
+    combined = combined_df.reindex(columns=["series", "year"] + COMBINED_COLUMNS)
+    combined["year"] = combined["year"].astype(int)
+    combined = combined.astype(object).where(combined.notna(), None)
+    conn.executemany(_COMBINED_UPSERT_SQL, combined.itertuples(index=False, name=None))
 
-    # Calculate yoy change
-    latest_mo = df[df['latest'] == 'true']['period'].values[0]
-    latest_yr = df[df['latest'] == 'true']['year'].values[0]
-    #pivoted_df['yoy_change'] = pivoted_df.groupby('series')[latest_mo].pct_change().round(3) * 100
+    summary = summary_df[["series name", "latest_mom_chg", "latest_yoy_chg"]]
+    summary = summary.astype(object).where(summary.notna(), None)
+    conn.executemany(_SUMMARY_UPSERT_SQL, summary.itertuples(index=False, name=None))
 
-    # Calculate mom change
-    df_sorted = df.sort_values(by=['year','period'])
-    df_sorted['mom_change'] = df_sorted.groupby('series')['value'].pct_change().round(3) * 100
+    rows_written = conn.total_changes - before
+    logger.info(f"Upserted {rows_written} changed materialized rows")
+    return rows_written
 
-    pivoted_df_sorted = df_sorted.pivot(
-        index=['series', 'year'],
-        columns='period',
-        values='mom_change'
-    ).reset_index()
-    pivoted_df_sorted['yoy_change'] = pivoted_df.groupby('series')[latest_mo].pct_change().round(3) * 100
-    pivoted_df_sorted.columns.name = None
+def store_bls_payload(conn: sqlite3.Connection, series_list: List[Dict[str, Any]]) -> int:
+    """
+    Store fetched observations and refresh the materialized tables for the
+    years they affect, in one transaction. MoM and YoY bases come from the
+    local long-format store, so only new periods need to be fetched.
+    Returns the number of new or changed observations.
+    """
+    with conn:
+        before = get_ingestion_state(conn)
+        first_changed, observations_written = upsert_time_series_points(conn, series_list)
+        if not first_changed:
+            return 0
 
-    latest_mom_chg = pivoted_df_sorted[(pivoted_df_sorted['year'] == latest_yr)][latest_mo].values[0]
-    latest_yoy_chg = pivoted_df_sorted[(pivoted_df_sorted['year'] == latest_yr)]['yoy_change'].values[0]
+        # YoY compares each year in the series' latest month, so a new latest
+        # period changes it for every stored year
+        after = get_ingestion_state(conn)
+        for series_id in first_changed:
+            if before.get(series_id, (None, None, None))[1:] != after[series_id][1:]:
+                first_changed[series_id] = after[series_id][0]
 
-    summary_df = pd.DataFrame({
-        'series name': series_name,
-        'latest_mom_chg': latest_mom_chg,
-        'latest_yoy_chg': latest_yoy_chg
-    },index=[0])
+        # The year before the first change is the MoM/YoY base
+        local = load_series_payload(conn, {series_id: year - 1 for series_id, year in first_changed.items()})
+        combined_df, summary_df = process_bls_payload(local)
 
-    print(summary_df)
-    print(f"Latest MOM change and YOY change for {series_name}: {latest_mom_chg}%, {latest_yoy_chg}%")
+        write_from = combined_df['series'].map(
+            {SERIES_NAMES.get(series_id, series_id): year for series_id, year in first_changed.items()}
+        )
+        combined_df = combined_df[combined_df['year'].astype(int) >= write_from]
 
-    return pivoted_df_sorted, summary_df
+        upsert_bls_data(conn, combined_df, summary_df)
+        bump_data_version(conn)
+    return observations_written
 
-def store_bls_data_in_sqlite(mom_df, smry_df, series_id, db_path: str = "bls_data.db", is_first_call: bool = False) -> None:
+def ingest_bls_data(
+    series_ids: List[str],
+    start_year: str,
+    end_year: str,
+    db_path: str = BLS_DB_PATH,
+    incremental: bool = True,
+    planner: Optional[BLSRequestPlanner] = None
+) -> int:
     """
-    Store BLS data in SQLite with the following schema:
-    - Series as column index
-    - Year as row index
-    - Months/PeriodName as header row
-    - Values in cells
+    Fetch, process and store BLS series into SQLite in one transaction.
+    In incremental mode years already stored are skipped, so the cost
+    follows the amount of new data. Returns the number of new or changed
+    observations.
     """
+    planner = planner or BLSRequestPlanner()
+    conn = get_connection(db_path)
+    # Held around each transaction, but not across the BLS requests
+    lock = get_connection_lock(db_path)
     try:
-        # Create a connection to SQLite database
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Drop the table if it exists and this is the first call
-        combined_table_name = "bls_combined_data"
-        summary_table_name = "bls_summary_data"
-        if is_first_call:
-            cursor.execute(f"DROP TABLE IF EXISTS {combined_table_name}")
-            logger.info(f"Dropped existing table {combined_table_name}")
-            cursor.execute(f"DROP TABLE IF EXISTS {summary_table_name}")
-            logger.info(f"Dropped existing table {summary_table_name}")
-
-        # Store in SQLite
-        mom_df.to_sql(combined_table_name, conn, if_exists='append', index=False)
-        logger.info(f"Stored MOM data for {series_id} in table {combined_table_name}")
-
-        smry_df.to_sql(summary_table_name, conn, if_exists='append', index=False)
-        logger.info(f"Stored summary data for {series_id} in table {summary_table_name}")
-        
-        conn.close()
+        with lock:
+            ensure_bls_schema(conn)
+            state = get_ingestion_state(conn) if incremental else {}
+            remaining = get_remaining_queries(conn, planner.daily_queries)
+
+        plan = planner.plan(series_ids, start_year, end_year, stored=stored_year_ranges(state))
+        if len(plan) > remaining:
+            raise BLSError(
+                f"Refresh needs {len(plan)} BLS queries but only {remaining} "
+                f"of {planner.daily_queries} remain today"
+            )
+
+        # A series split across year windows is stored as one payload
+        payloads: Dict[str, List[Dict[str, Any]]] = {}
+        for request in plan:
+            bls_data = fetch_bls_data(**request)
+            with lock:
+                record_queries(conn, 1)
+            for series in bls_data['Results']['series']:
+                payloads.setdefault(series['seriesID'], []).extend(series['data'])
+
+        series_list = []
+        for series_id, data in payloads.items():
+            if not data:
+                logger.warning(f"No data returned for {series_id}")
+                continue
+            series_list.append({'seriesID': series_id, 'data': data})
+
+        with lock:
+            observations_written = store_bls_payload(conn, series_list)
+            refresh_snapshots(conn, [series['seriesID'] for series in series_list], db_path)
         logger.info("Successfully stored all BLS data in SQLite")
-        
+        return observations_written
     except Exception as e:
         logger.error(f"Error storing BLS data in SQLite: {str(e)}")
         raise
 
+def migrate_to_long_format(db_path: str = BLS_DB_PATH, end_year: Optional[str] = None) -> int:
+    """
+    Backfill time_series_points for every series and year in bls_combined_data.
+    The wide table only holds MoM changes, not levels, so the levels are
+    refetched through the request planner. Returns the number of observations stored.
+    """
+    conn = get_connection(db_path)
+    with get_connection_lock(db_path):
+        ensure_bls_schema(conn)
+        spans = conn.execute(
+            f"SELECT series, MIN(CAST(year AS INTEGER)) FROM {COMBINED_TABLE} GROUP BY series"
+        ).fetchall()
+    if not spans:
+        return 0
+
+    series_ids = [SERIES_MAP.get(name, name) for name, _ in spans]
+    start_year = str(min(first_year for _, first_year in spans))
+    end_year = end_year or str(datetime.now().year)
+    logger.info(f"Migrating {len(series_ids)} series from {start_year} to long format")
+    return ingest_bls_data(series_ids, start_year, end_year, db_path=db_path)
+
 def generate_sentiment(yoy_change: float) -> str:
     """
     Generate sentiment based on YoY and MoM changes
@@ -172,21 +611,17 @@ if __name__ == "__main__":
     last_year = str(int(current_year) - 1)
     
     try:
-        # Fetch latest data from BLS
-        bls_data = fetch_bls_data(
-            series_ids=list(SERIES_MAP.values()),
-            start_year=last_year,
-            end_year=current_year
-        )
-        # Process and store data in SQLite
-        is_first_call = True
-        for series in bls_data['Results']['series']:
-            data = series['data']
-            series_id = series['seriesID']
-            print(f"Processing data for {series['seriesID']}")
-            mom_df,smry_df = process_bls_data(data, series_id)
-            store_bls_data_in_sqlite(mom_df, smry_df, series_id, is_first_call=is_first_call)
-            is_first_call = False
+        if "--migrate" in sys.argv:
+            # One-off backfill of levels for the history in bls_combined_data
+            rows_written = migrate_to_long_format(end_year=current_year)
+        else:
+            # Fetch only the periods newer than what is already stored
+            rows_written = ingest_bls_data(
+                series_ids=list(SERIES_MAP.values()),
+                start_year=last_year,
+                end_year=current_year
+            )
+        logger.info(f"Observations written: {rows_written}")
 
     except BLSError as e:
         logger.error(f"BLS API error: {str(e)}")
@@ -0,0 +1,103 @@
+from typing import List, Dict, Any, Optional, Iterable
+import logging
+
+from app.db.ranges import Range, merge_ranges, subtract_ranges
+
+logger = logging.getLogger(__name__)
+
+# Public API limits per registration level
+# https://www.bls.gov/developers/api_faqs.htm
+BLS_API_LIMITS = {
+    "v1": {"max_series": 25, "max_years": 10, "daily_queries": 25},
+    "v2": {"max_series": 50, "max_years": 20, "daily_queries": 500},
+}
+
+# Inclusive (first year, last year)
+YearRange = Range
+
+class BLSRequestPlanner:
+    """
+    Pack series and year ranges into the fewest requests the BLS API accepts.
+
+    Year windows are aligned on the requested end year so series that share
+    a window share requests, then each window is split by the series limit.
+    """
+    def __init__(self, api_version: str = "v1"):
+        limits = BLS_API_LIMITS[api_version]
+        self.max_series = limits["max_series"]
+        self.max_years = limits["max_years"]
+        self.daily_queries = limits["daily_queries"]
+
+    def missing_ranges(self, start_year: int, end_year: int, stored: Iterable[YearRange] = ()) -> List[YearRange]:
+        """Years in the requested range that are not stored locally"""
+        return subtract_ranges((start_year, end_year), stored)
+
+    def fetch_ranges(
+        self,
+        start_year: int,
+        end_year: int,
+        stored: Iterable[YearRange] = (),
+        lookback_years: int = 0
+    ) -> List[YearRange]:
+        """
+        Years to request for one series. Missing ranges that follow stored
+        data are extended back by lookback_years to refetch the base periods
+        MoM and YoY changes are computed against.
+        """
+        stored = merge_ranges(stored)
+        ranges = []
+        for start, end in self.missing_ranges(start_year, end_year, stored):
+            if lookback_years and any(s <= start - 1 <= e for s, e in stored):
+                start -= lookback_years
+            ranges.append((start, end))
+        return merge_ranges(ranges)
+
+    def plan(
+        self,
+        series_ids: Iterable[str],
+        start_year: int,
+        end_year: int,
+        stored: Optional[Dict[str, List[YearRange]]] = None,
+        lookback_years: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Plan the requests needed to cover every series over the year range.
+        Each request is a dict of fetch_bls_data keyword arguments.
+        """
+        stored = stored or {}
+        start_year, end_year = int(start_year), int(end_year)
+
+        # window -> series_id -> (first, last) year needed inside the window
+        windows: Dict[YearRange, Dict[str, YearRange]] = {}
+        for series_id in dict.fromkeys(series_ids):
+            for start, end in self.fetch_ranges(start_year, end_year, stored.get(series_id, []), lookback_years):
+                for window in self._windows(start, end, end_year):
+                    first, last = max(start, window[0]), min(end, window[1])
+                    members = windows.setdefault(window, {})
+                    if series_id in members:
+                        first, last = min(first, members[series_id][0]), max(last, members[series_id][1])
+                    members[series_id] = (first, last)
+
+        requests = []
+        for window in sorted(windows):
+            # Neighbouring ranges share a request so each one stays narrow
+            members = sorted(windows[window].items(), key=lambda item: item[1])
+            for i in range(0, len(members), self.max_series):
+                chunk = members[i:i + self.max_series]
+                requests.append({
+                    "series_ids": [series_id for series_id, _ in chunk],
+                    "start_year": str(min(first for _, (first, _) in chunk)),
+                    "end_year": str(max(last for _, (_, last) in chunk)),
+                })
+
+        logger.info(f"Planned {len(requests)} BLS requests for {len(windows)} year windows")
+        return requests
+
+    def _windows(self, start: int, end: int, anchor: int) -> List[YearRange]:
+        """Grid windows of max_years ending on the anchor year that cover start..end"""
+        first = (anchor - end) // self.max_years
+        last = (anchor - start) // self.max_years
+        return [
+            (anchor - (k + 1) * self.max_years + 1, anchor - k * self.max_years)
+            for k in range(last, first - 1, -1)
+        ]
@@ -1,32 +1,296 @@
-from fredapi import Fred
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
 import os
+import logging
 from dotenv import load_dotenv
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import httpx
 import pandas as pd
 
+from app.core.client import request_with_retry
+from app.core.metrics import track_upstream
+from app.core.ratelimit import TokenBucket
+from app.db.ranges import DateRange, merge_date_ranges, missing_date_ranges
+from app.db.sqlite import BLS_DB_PATH, get_connection, get_connection_lock
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Observations live next to the BLS tables unless pointed elsewhere
+FRED_CACHE_PATH = os.getenv("FRED_CACHE_PATH", BLS_DB_PATH)
+
+# History kept for latest/previous lookups; covers two quarterly releases
+DEFAULT_HISTORY_DAYS = int(os.getenv("FRED_HISTORY_DAYS", "730"))
+
+# Observations re-requested on refresh so revisions to recent periods (e.g.
+# payrolls revising the prior two months) replace the values first published
+FRED_REVISION_LOOKBACK = int(os.getenv("FRED_REVISION_LOOKBACK", "3"))
+
+# FRED allows 120 requests per minute per API key
+FRED_REQUESTS_PER_MINUTE = int(os.getenv("FRED_REQUESTS_PER_MINUTE", "120"))
+FRED_MAX_WORKERS = int(os.getenv("FRED_MAX_WORKERS", "8"))
+
+# Shared by every FREDService in the process, since the limit is per key
+fred_rate_limiter = TokenBucket(rate=FRED_REQUESTS_PER_MINUTE / 60.0, capacity=FRED_MAX_WORKERS)
+
+FRED_API_URL = "https://api.stlouisfed.org/fred/series/observations"
+
+OBSERVATIONS_TABLE = "fred_observations"
+RANGES_TABLE = "fred_fetched_ranges"
+
+class FREDClient:
+    """
+    FRED observations over the shared keep-alive HTTP client. Drop-in for
+    fredapi.Fred.get_series, which opens a new connection per call.
+    """
+    def __init__(self, api_key: Optional[str] = None, client: Optional[httpx.Client] = None):
+        self.api_key = api_key or os.getenv("FRED_API_KEY")
+        if not self.api_key:
+            raise ValueError("FRED_API_KEY is not set")
+        self.client = client
+
+    @track_upstream("fred", "observations")
+    def get_series(
+        self,
+        series_id: str,
+        observation_start: Optional[date] = None,
+        observation_end: Optional[date] = None
+    ) -> pd.Series:
+        params = {"series_id": series_id, "api_key": self.api_key, "file_type": "json"}
+        if observation_start is not None:
+            params["observation_start"] = observation_start.strftime("%Y-%m-%d")
+        if observation_end is not None:
+            params["observation_end"] = observation_end.strftime("%Y-%m-%d")
+
+        response = request_with_retry("GET", FRED_API_URL, client=self.client, params=params)
+        if response.status_code != 200:
+            # Errors usually carry a JSON message, but proxies and outages send HTML
+            try:
+                message = response.json().get("error_message")
+            except ValueError:
+                message = None
+            raise ValueError(message or f"FRED returned {response.status_code}")
+
+        observations = response.json().get("observations", [])
+        # FRED marks missing values with "."
+        values = pd.to_numeric([o["value"] for o in observations], errors="coerce")
+        index = pd.to_datetime([o["date"] for o in observations])
+        return pd.Series(values, index=index, name=series_id, dtype=float)
+
+class FREDObservationCache:
+    """
+    Persistent per-series FRED observations plus the date ranges already
+    fetched, so callers only request the parts of a window they lack.
+
+    A fetched range is only trusted up to the newest observation FRED has
+    published, so the tail past it is always requested again on refresh.
+    Refreshes also re-request the last few observations to pick up revisions.
+    """
+    def __init__(self, db_path: str = FRED_CACHE_PATH):
+        self.conn = get_connection(db_path)
+        # Shared with every other user of the connection, ingestion included
+        self._lock = get_connection_lock(db_path)
+        self.ensure_schema()
+
+    def ensure_schema(self) -> None:
+        with self._lock:
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {OBSERVATIONS_TABLE} (
+                    series_id TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    value REAL,
+                    PRIMARY KEY (series_id, date)
+                ) WITHOUT ROWID
+            """)
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {RANGES_TABLE} (
+                    series_id TEXT NOT NULL,
+                    start_date TEXT NOT NULL,
+                    end_date TEXT NOT NULL,
+                    PRIMARY KEY (series_id, start_date)
+                ) WITHOUT ROWID
+            """)
+            self.conn.commit()
+
+    def fetched_ranges(self, series_id: str) -> List[DateRange]:
+        """Merged date ranges already fetched for a series"""
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT start_date, end_date FROM {RANGES_TABLE} WHERE series_id = ?", (series_id,)
+            ).fetchall()
+        return merge_date_ranges((date.fromisoformat(start), date.fromisoformat(end)) for start, end in rows)
+
+    def missing_ranges(self, series_id: str, start: date, end: date) -> List[DateRange]:
+        """Parts of start..end that have not been fetched"""
+        return missing_date_ranges(start, end, self.fetched_ranges(series_id))
+
+    def last_observation_date(self, series_id: str) -> Optional[date]:
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT MAX(date) FROM {OBSERVATIONS_TABLE} WHERE series_id = ?", (series_id,)
+            ).fetchone()
+        return date.fromisoformat(row[0]) if row and row[0] else None
+
+    def revision_start(self, series_id: str, lookback: int) -> Optional[date]:
+        """Date of the lookback-th newest cached observation, if there are any"""
+        if lookback <= 0:
+            return None
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT date FROM {OBSERVATIONS_TABLE} WHERE series_id = ? ORDER BY date DESC LIMIT ?",
+                (series_id, lookback)
+            ).fetchall()
+        return date.fromisoformat(rows[-1][0]) if rows else None
+
+    def store(self, series_id: str, observations: pd.Series, start: date, end: date) -> int:
+        """
+        Save the observations fetched for start..end and record the range.
+        Returns the number of observations written.
+        """
+        rows = [
+            (series_id, pd.Timestamp(when).date().isoformat(), None if pd.isna(value) else float(value))
+            for when, value in observations.items()
+        ]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO {OBSERVATIONS_TABLE} (series_id, date, value) VALUES (?, ?, ?)", rows
+            )
+            last = self.conn.execute(
+                f"SELECT MAX(date) FROM {OBSERVATIONS_TABLE} WHERE series_id = ?", (series_id,)
+            ).fetchone()[0]
+            # Dates after the newest observation may still get one published
+            covered_end = min(end, date.fromisoformat(last)) if last else None
+            if covered_end is not None and covered_end >= start:
+                self.conn.execute(
+                    f"INSERT OR REPLACE INTO {RANGES_TABLE} (series_id, start_date, end_date) VALUES (?, ?, ?)",
+                    (series_id, start.isoformat(), covered_end.isoformat())
+                )
+        return len(rows)
+
+    def get_observations(self, series_id: str, start: Optional[date] = None, end: Optional[date] = None) -> pd.Series:
+        """Cached observations for a series, oldest first, indexed by date"""
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT date, value FROM {OBSERVATIONS_TABLE} WHERE series_id = ? AND date >= ? AND date <= ? ORDER BY date",
+                (series_id, (start or date.min).isoformat(), (end or date.max).isoformat())
+            ).fetchall()
+        return pd.Series(
+            [value for _, value in rows],
+            index=pd.DatetimeIndex([when for when, _ in rows]),
+            dtype="float64",
+            name=series_id
+        )
+
+    def clear(self, series_id: Optional[str] = None) -> None:
+        with self._lock, self.conn:
+            for table in (OBSERVATIONS_TABLE, RANGES_TABLE):
+                if series_id is None:
+                    self.conn.execute(f"DELETE FROM {table}")
+                else:
+                    self.conn.execute(f"DELETE FROM {table} WHERE series_id = ?", (series_id,))
+
 class FREDService:
-    def __init__(self):
-        self.fred = Fred(api_key=os.getenv("FRED_API_KEY"))
-        
-    def get_series(self, series_id: str, days_back: int = 365) -> pd.DataFrame:
-        """Fetch a time series from FRED"""
-        end_date = datetime.now()
+    def __init__(
+        self,
+        fred: Optional[FREDClient] = None,
+        cache: Optional[FREDObservationCache] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        max_workers: int = FRED_MAX_WORKERS
+    ):
+        self.fred = fred or FREDClient()
+        self.cache = cache or FREDObservationCache()
+        self.rate_limiter = rate_limiter or fred_rate_limiter
+        self.max_workers = max_workers
+
+    def _map_concurrent(
+        self,
+        func: Callable[[str], Any],
+        keys: List[str],
+        max_workers: Optional[int] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        Run func for every key on a bounded thread pool.
+        Returns the results and the error messages, both keyed like the input.
+        """
+        results, errors = {}, {}
+        if not keys:
+            return results, errors
+        workers = max(1, min(max_workers or self.max_workers, len(keys)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fred") as executor:
+            futures = {key: executor.submit(func, key) for key in keys}
+            for key, future in futures.items():
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    logger.error(f"FRED request for {key} failed: {e}")
+                    errors[key] = str(e)
+        return results, errors
+
+    def fetch_missing(self, series_id: str, start: date, end: date, revision_lookback: int = 0) -> int:
+        """
+        Fetch the parts of start..end missing from the cache, plus the last
+        revision_lookback cached observations so their revisions are stored.
+        Returns the number of API calls made.
+        """
+        missing = self.cache.missing_ranges(series_id, start, end)
+        revised_from = self.cache.revision_start(series_id, revision_lookback)
+        if revised_from is not None and revised_from <= end:
+            # Merges with the tail past the newest observation into one call
+            missing = merge_date_ranges(missing + [(max(revised_from, start), end)])
+        for range_start, range_end in missing:
+            self.rate_limiter.acquire()
+            observations = self.fred.get_series(series_id, range_start, range_end)
+            self.cache.store(series_id, observations, range_start, range_end)
+        return len(missing)
+
+    @track_upstream("fred", "get_series")
+    def get_series(self, series_id: str, days_back: int = 365) -> pd.Series:
+        """Fetch a time series from FRED, reusing cached observations"""
+        end_date = date.today()
         start_date = end_date - timedelta(days=days_back)
-        return self.fred.get_series(series_id, start_date, end_date)
-    
+        self.fetch_missing(series_id, start_date, end_date)
+        return self.cache.get_observations(series_id, start_date, end_date)
+
+    def get_latest_values(self, series_id: str) -> Tuple[float, float]:
+        """Get the most recent and the previous value from one cached series"""
+        series = self.get_series(series_id, days_back=DEFAULT_HISTORY_DAYS).dropna()
+        if len(series) < 2:
+            raise ValueError(f"Not enough observations for {series_id}")
+        return series.iloc[-1], series.iloc[-2]
+
     def get_latest_value(self, series_id: str) -> float:
         """Get the most recent value for a series"""
-        series = self.get_series(series_id, days_back=1)
-        return series.iloc[-1]
-    
+        return self.get_latest_values(series_id)[0]
+
     def get_previous_value(self, series_id: str) -> float:
         """Get the previous value for a series"""
-        series = self.get_series(series_id, days_back=2)
-        return series.iloc[-2]
-    
+        return self.get_latest_values(series_id)[1]
+
+    def refresh(
+        self,
+        series_ids: Optional[List[str]] = None,
+        days_back: int = DEFAULT_HISTORY_DAYS,
+        max_workers: Optional[int] = None,
+        revision_lookback: int = FRED_REVISION_LOOKBACK
+    ) -> Dict[str, int]:
+        """
+        Bring the cache up to date concurrently. A series already cached
+        costs one call, covering its last revision_lookback observations
+        and everything after them.
+        Returns the number of API calls made per series.
+        """
+        end = date.today()
+        start = end - timedelta(days=days_back)
+        calls, errors = self._map_concurrent(
+            lambda series_id: self.fetch_missing(series_id, start, end, revision_lookback),
+            list(dict.fromkeys(series_ids or FRED_SERIES.values())),
+            max_workers
+        )
+        calls.update({series_id: 0 for series_id in errors})
+        logger.info(f"Refreshed {len(calls)} FRED series with {sum(calls.values())} calls")
+        return calls
+
     def calculate_change(self, current: float, previous: float) -> float:
         """Calculate percentage change between two values"""
         return ((current - previous) / previous) * 100 if previous != 0 else 0
@@ -39,29 +303,51 @@ class FREDService:
             return "bearish"
         return "neutral"
     
+    def build_indicator_data(self, series_id: str, name: str, category: str) -> Dict:
+        """Build indicator data for a series, raising if it cannot be fetched"""
+        current, previous = self.get_latest_values(series_id)
+        change = self.calculate_change(current, previous)
+        signal = self.determine_signal(change)
+        
+        return {
+            "name": name,
+            "value": current,
+            "previous_value": previous,
+            "change": change,
+            "signal": signal,
+            "source": "FRED",
+            "description": f"FRED Series: {series_id}",
+            "category": category,
+            "frequency": "monthly"  # Default to monthly, can be overridden
+        }
+    
     def get_indicator_data(self, series_id: str, name: str, category: str) -> Dict:
         """Get complete indicator data including current value, previous value, and signal"""
         try:
-            current = self.get_latest_value(series_id)
-            previous = self.get_previous_value(series_id)
-            change = self.calculate_change(current, previous)
-            signal = self.determine_signal(change)
-            
-            return {
-                "name": name,
-                "value": current,
-                "previous_value": previous,
-                "change": change,
-                "signal": signal,
-                "source": "FRED",
-                "description": f"FRED Series: {series_id}",
-                "category": category,
-                "frequency": "monthly"  # Default to monthly, can be overridden
-            }
+            return self.build_indicator_data(series_id, name, category)
         except Exception as e:
-            print(f"Error fetching data for {series_id}: {str(e)}")
+            logger.error(f"Error fetching data for {series_id}: {str(e)}")
             return None
 
+    def get_indicators(
+        self,
+        series_map: Optional[Dict[str, str]] = None,
+        category: str = "macro",
+        max_workers: Optional[int] = None
+    ) -> Dict[str, Dict]:
+        """
+        Get indicator data for many series concurrently. series_map maps
+        indicator names to FRED series IDs and defaults to FRED_SERIES.
+        Failed series don't fail the batch; they are reported under "errors".
+        """
+        series_map = series_map or FRED_SERIES
+        indicators, errors = self._map_concurrent(
+            lambda name: self.build_indicator_data(series_map[name], name, category),
+            list(series_map),
+            max_workers
+        )
+        return {"indicators": indicators, "errors": errors}
+
 # Common FRED series IDs
 FRED_SERIES = {
     "GDP": "GDP",  # Gross Domestic Product
@@ -74,4 +360,4 @@ FRED_SERIES = {
     "HOUST": "HOUST",  # Housing Starts
     "PAYEMS": "PAYEMS",  # All Employees: Total Nonfarm
     "DGORDER": "DGORDER"  # Manufacturers' New Orders: Durable Goods
-} 
\ No newline at end of file
+}
@@ -1,28 +1,187 @@
-import yfinance as yf
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+import logging
 import pandas as pd
 import numpy as np
 
+from app.services.price_store import PriceStore
+
+logger = logging.getLogger(__name__)
+
+# Calendar days of prices loaded on each side of an event
+REACTION_WINDOW_DAYS = 5
+
+# Trailing windows (trading days) and z-score cutoff for the anomaly scanner
+ANOMALY_WINDOWS = (20, 60)
+ANOMALY_THRESHOLD = 2.0
+ANOMALY_COLUMNS = ["date", "asset", "window", "change", "zscore"]
+
+REACTION_FIELDS = ["pre_event", "event_day", "post_event", "total_change", "volatility"]
+
+def close_matrix(assets: Dict[str, pd.DataFrame], field: str = "Close") -> pd.DataFrame:
+    """
+    Align one price field of several assets into a date x asset matrix.
+    Dates an asset did not trade on are NaN.
+    """
+    columns = {name: data[field] for name, data in assets.items() if not data.empty}
+    matrix = pd.concat(columns, axis=1).sort_index() if columns else pd.DataFrame()
+    return matrix.reindex(columns=list(assets))
+
+def daily_returns(prices: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns between consecutive traded days of each asset in a date x asset
+    matrix. Days an asset did not trade stay NaN instead of breaking its
+    return series.
+    """
+    previous = prices.ffill().shift(1)
+    return (prices / previous - 1).where(prices.notna())
+
+def scan_anomalies(
+    prices: pd.DataFrame,
+    windows: Iterable[int] = ANOMALY_WINDOWS,
+    threshold: float = ANOMALY_THRESHOLD
+) -> Dict[str, np.ndarray]:
+    """
+    Flag daily moves whose z-score against the trailing window of returns
+    exceeds the threshold, for every asset and window of a date x asset
+    price matrix. Each window is one rolling pass over the whole matrix.
+
+    Returns the flagged moves as columns: date, asset, window, change (%)
+    and zscore, ordered by date then asset.
+    """
+    returns = daily_returns(prices.sort_index())
+    assets = np.asarray(returns.columns, dtype=object)
+    dates = returns.index.values
+    flagged = {name: [] for name in ANOMALY_COLUMNS}
+
+    for window in windows:
+        # The trailing window ends the day before, so a move isn't scored against itself
+        trailing = returns.shift(1).rolling(window, min_periods=max(2, int(window * 0.8)))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            zscores = ((returns - trailing.mean()) / trailing.std()).to_numpy()
+        rows, cols = np.nonzero(np.abs(np.nan_to_num(zscores, nan=0.0, posinf=0.0, neginf=0.0)) > threshold)
+        flagged["date"].append(dates[rows])
+        flagged["asset"].append(assets[cols])
+        flagged["window"].append(np.full(len(rows), window))
+        flagged["change"].append(returns.to_numpy()[rows, cols] * 100)
+        flagged["zscore"].append(zscores[rows, cols])
+
+    if not flagged["date"]:
+        return {
+            "date": np.array([], dtype="datetime64[ns]"),
+            "asset": np.array([], dtype=object),
+            "window": np.array([], dtype=int),
+            "change": np.array([], dtype=float),
+            "zscore": np.array([], dtype=float),
+        }
+    columns = {name: np.concatenate(values) for name, values in flagged.items()}
+    order = np.lexsort((columns["window"], columns["asset"].astype(str), columns["date"]))
+    return {name: values[order] for name, values in columns.items()}
+
+def event_study(event_dates, prices: pd.DataFrame, window_days: int = REACTION_WINDOW_DAYS) -> Dict[str, pd.DataFrame]:
+    """
+    Score many events against every asset of a date x asset price matrix
+    at once. Each event's pre/event/post closes come from sorted-index
+    lookups, and volatility is the standard deviation of the daily returns
+    within window_days calendar days of the event, from prefix sums.
+
+    Returns an event x asset frame per field of calculate_reaction.
+    """
+    events = pd.DatetimeIndex(pd.to_datetime(event_dates))
+    prices = prices.sort_index()
+    dates = prices.index.values.astype("datetime64[ns]")
+    close = prices.to_numpy(dtype="float64")
+    n_dates, n_assets = close.shape
+    event_values = events.values.astype("datetime64[ns]")
+    cols = np.arange(n_assets)[None, :]
+
+    # Index of the last/next traded row per asset at or around each row,
+    # padded so row -1 and row n_dates resolve to "none"
+    valid = ~np.isnan(close)
+    rows = np.arange(n_dates)[:, None]
+    last_valid = np.maximum.accumulate(np.where(valid, rows, -1), axis=0) if n_dates else np.empty((0, n_assets), int)
+    next_valid = (
+        np.minimum.accumulate(np.where(valid, rows, n_dates)[::-1], axis=0)[::-1] if n_dates
+        else np.empty((0, n_assets), int)
+    )
+    last_before = np.vstack([np.full((1, n_assets), -1), last_valid])      # last_before[i]: last valid row < i
+    first_from = np.vstack([next_valid, np.full((1, n_assets), n_dates)])  # first_from[i]: first valid row >= i
+    padded = np.vstack([close, np.full((1, n_assets), np.nan)])            # row n_dates (and -1) read as NaN
+
+    left = np.searchsorted(dates, event_values, side="left")
+    right = np.searchsorted(dates, event_values, side="right")
+    window = np.timedelta64(window_days, "D")
+    lo = np.searchsorted(dates, event_values - window, side="left")[:, None]
+    hi = np.searchsorted(dates, event_values + window, side="right")[:, None]
+
+    # Like calculate_reaction on a window of prices, closes outside it don't count
+    pre_row, post_row = last_before[left], first_from[right]
+    pre = np.where(pre_row >= lo, padded[pre_row, cols], np.nan)
+    post = np.where(post_row < hi, padded[post_row, cols], np.nan)
+    on_event = (right > left)[:, None]
+    event_day = np.where(on_event, padded[np.minimum(left, n_dates)], np.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total_change = np.where((pre != 0) & (post != 0), (post - pre) / pre * 100, np.nan)
+
+        # Daily returns between consecutive traded rows of each asset
+        previous = padded[last_before[:n_dates], np.arange(n_assets)[None, :]]
+        returns = np.where(valid, close / previous - 1, np.nan)
+    has_return = ~np.isnan(returns)
+    zero = np.zeros((1, n_assets))
+    sums = np.vstack([zero, np.cumsum(np.where(has_return, returns, 0.0), axis=0)])
+    squares = np.vstack([zero, np.cumsum(np.where(has_return, returns * returns, 0.0), axis=0)])
+    counts = np.vstack([zero, np.cumsum(has_return, axis=0)])
+
+    # The first traded row in the window has no in-window return before it
+    start = np.minimum(first_from[lo[:, 0]] + 1, hi)
+    n = counts[hi, cols] - counts[start, cols]
+    total = sums[hi, cols] - sums[start, cols]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variance = (squares[hi, cols] - squares[start, cols] - total * total / n) / (n - 1)
+    volatility = np.where(n >= 2, np.sqrt(np.maximum(variance, 0.0)) * 100, np.nan)
+
+    fields = {
+        "pre_event": pre,
+        "event_day": event_day,
+        "post_event": post,
+        "total_change": total_change,
+        "volatility": volatility,
+    }
+    return {name: pd.DataFrame(values, index=events, columns=prices.columns) for name, values in fields.items()}
+
 class MarketReactionService:
-    def __init__(self):
+    def __init__(self, price_store: Optional[PriceStore] = None):
         self.asset_classes = {
             "stocks": "^GSPC",  # S&P 500
             "bonds": "^TNX",    # 10-year Treasury yield
             "gold": "GC=F",     # Gold futures
             "dollar": "DX-Y.NYB"  # Dollar index
         }
+        self.price_store = price_store or PriceStore()
     
     def get_asset_data(self, symbol: str, days_back: int = 5) -> pd.DataFrame:
         """Fetch historical data for an asset"""
-        end_date = datetime.now()
+        end_date = date.today()
         start_date = end_date - timedelta(days=days_back)
         try:
-            data = yf.download(symbol, start=start_date, end=end_date, interval="1d")
-            return data
+            return self.price_store.get_prices([symbol], start_date, end_date)[symbol]
         except Exception as e:
-            print(f"Error fetching data for {symbol}: {str(e)}")
+            logger.error(f"Error fetching data for {symbol}: {str(e)}")
             return pd.DataFrame()
+
+    def get_assets_data(self, start_date: date, end_date: date) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch every asset class over a date range with at most one batched
+        download per missing range. Call it with the full span of a batch of
+        events to warm the store before analyzing them.
+        """
+        try:
+            prices = self.price_store.get_prices(list(self.asset_classes.values()), start_date, end_date)
+        except Exception as e:
+            logger.error(f"Error fetching data for {list(self.asset_classes.values())}: {str(e)}")
+            return {asset_class: pd.DataFrame() for asset_class in self.asset_classes}
+        return {asset_class: prices[symbol] for asset_class, symbol in self.asset_classes.items()}
     
     def calculate_reaction(self, data: pd.DataFrame, event_date: datetime) -> Dict:
         """Calculate market reaction around an event"""
@@ -60,8 +219,12 @@ class MarketReactionService:
         """Analyze market reactions across all asset classes"""
         reactions = {}
         
-        for asset_class, symbol in self.asset_classes.items():
-            data = self.get_asset_data(symbol)
+        event_day = pd.Timestamp(event_date).date()
+        assets = self.get_assets_data(
+            event_day - timedelta(days=REACTION_WINDOW_DAYS),
+            min(event_day + timedelta(days=REACTION_WINDOW_DAYS), date.today())
+        )
+        for asset_class, data in assets.items():
             reaction = self.calculate_reaction(data, event_date)
             reactions[asset_class] = reaction
         
@@ -80,24 +243,66 @@ class MarketReactionService:
             }
         }
     
+    def analyze_events(self, event_dates, window_days: int = REACTION_WINDOW_DAYS) -> Dict[str, pd.DataFrame]:
+        """
+        Analyze market reactions to many events in one pass. Prices for the
+        whole span are loaded once and scored with event_study.
+        """
+        events = pd.DatetimeIndex(pd.to_datetime(event_dates))
+        if events.empty:
+            return {name: pd.DataFrame(columns=list(self.asset_classes)) for name in REACTION_FIELDS}
+        window = timedelta(days=window_days)
+        assets = self.get_assets_data(
+            events.min().date() - window,
+            min(events.max().date() + window, date.today())
+        )
+        return event_study(events, close_matrix(assets), window_days)
+
+    def scan_anomalies(
+        self,
+        days_back: int = 365,
+        windows: Iterable[int] = ANOMALY_WINDOWS,
+        threshold: float = ANOMALY_THRESHOLD,
+        symbols: Optional[Dict[str, str]] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Scan the tracked assets, or the given name -> symbol map, for moves
+        beyond the threshold z-score over the last days_back days
+        """
+        symbols = symbols or self.asset_classes
+        end_date = date.today()
+        start_date = end_date - timedelta(days=days_back + 2 * max(windows))
+        try:
+            prices = self.price_store.get_prices(list(symbols.values()), start_date, end_date)
+        except Exception as e:
+            logger.error(f"Error fetching data for {list(symbols.values())}: {str(e)}")
+            prices = {symbol: pd.DataFrame() for symbol in symbols.values()}
+        matrix = close_matrix({name: prices[symbol] for name, symbol in symbols.items()})
+        flagged = scan_anomalies(matrix, windows, threshold)
+        # Earlier prices only seed the trailing windows
+        keep = flagged["date"] >= np.datetime64(end_date - timedelta(days=days_back))
+        return {name: values[keep] for name, values in flagged.items()}
+    
     def get_historical_reactions(self, event_type: str, days_back: int = 30) -> List[Dict]:
         """Get historical market reactions for a specific event type"""
-        end_date = datetime.now()
+        end_date = date.today()
         start_date = end_date - timedelta(days=days_back)
         
-        reactions = []
-        for asset_class, symbol in self.asset_classes.items():
-            data = self.get_asset_data(symbol, days_back=days_back)
-            if not data.empty:
-                daily_changes = data["Close"].pct_change()
-                significant_changes = daily_changes[abs(daily_changes) > daily_changes.std() * 2]
-                
-                for date, change in significant_changes.items():
-                    reactions.append({
-                        "date": date.isoformat(),
-                        "asset_class": asset_class,
-                        "change": change * 100,
-                        "direction": "bullish" if change > 0 else "bearish"
-                    })
+        returns = daily_returns(close_matrix(self.get_assets_data(start_date, end_date))).dropna(how="all")
+        if returns.empty:
+            return []
+        # Moves beyond two standard deviations of each asset's own returns
+        significant = returns.abs() > returns.std() * 2
+        rows, cols = np.nonzero(significant.to_numpy())
+        order = np.lexsort((cols, -rows))
+        dates, assets, changes = returns.index, returns.columns, returns.to_numpy()
         
-        return sorted(reactions, key=lambda x: x["date"], reverse=True) 
\ No newline at end of file
+        return [
+            {
+                "date": dates[row].isoformat(),
+                "asset_class": assets[col],
+                "change": changes[row, col] * 100,
+                "direction": "bullish" if changes[row, col] > 0 else "bearish"
+            }
+            for row, col in zip(rows[order], cols[order])
+        ]
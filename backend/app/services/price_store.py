@@ -0,0 +1,219 @@
+from typing import Callable, Dict, List
+from datetime import date, timedelta
+import os
+import time
+import logging
+import pandas as pd
+import yfinance as yf
+
+from app.core.client import HTTPClient
+from app.core.metrics import UPSTREAM_FAILURES, track_upstream
+from app.db.ranges import DateRange, merge_date_ranges, missing_date_ranges
+from app.db.sqlite import BLS_DB_PATH, get_connection, get_connection_lock
+
+logger = logging.getLogger(__name__)
+
+PRICE_STORE_PATH = os.getenv("PRICE_STORE_PATH", BLS_DB_PATH)
+
+# Today's bar changes until the close, so it is refetched at most this often
+PRICE_LIVE_TTL_SECONDS = int(os.getenv("PRICE_LIVE_TTL_SECONDS", "300"))
+
+BARS_TABLE = "price_bars"
+RANGES_TABLE = "price_fetched_ranges"
+
+# yfinance column -> price_bars column
+PRICE_COLUMNS = {
+    "Open": "open",
+    "High": "high",
+    "Low": "low",
+    "Close": "close",
+    "Adj Close": "adj_close",
+    "Volume": "volume",
+}
+
+def download_prices(*args, **kwargs) -> pd.DataFrame:
+    """yf.download on the shared pooled session instead of a fresh one per call"""
+    kwargs.setdefault("session", HTTPClient.get_session())
+    return yf.download(*args, **kwargs)
+
+def expects_bars(start: date, end: date) -> bool:
+    """
+    Whether a download of start..end should return bars: it has weekdays
+    before today, whose bar isn't final until the close
+    """
+    covered_end = min(end, date.today() - timedelta(days=1))
+    return covered_end >= start and len(pd.bdate_range(start, covered_end)) > 0
+
+class PriceStore:
+    """
+    Daily OHLC bars per symbol, persisted in SQLite and mirrored in memory.
+
+    Reads name the symbols and date range they need; only the ranges not
+    fetched before are downloaded, and symbols missing the same range share
+    one batched yf.download call.
+    """
+    def __init__(self, db_path: str = PRICE_STORE_PATH, downloader: Callable[..., pd.DataFrame] = download_prices):
+        self.conn = get_connection(db_path)
+        self.downloader = downloader
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._live_fetched: Dict[str, float] = {}
+        # Shared with every other user of the connection, ingestion included
+        self._lock = get_connection_lock(db_path)
+        self.ensure_schema()
+
+    def ensure_schema(self) -> None:
+        with self._lock:
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {BARS_TABLE} (
+                    symbol TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    open REAL,
+                    high REAL,
+                    low REAL,
+                    close REAL,
+                    adj_close REAL,
+                    volume REAL,
+                    PRIMARY KEY (symbol, date)
+                ) WITHOUT ROWID
+            """)
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {RANGES_TABLE} (
+                    symbol TEXT NOT NULL,
+                    start_date TEXT NOT NULL,
+                    end_date TEXT NOT NULL,
+                    PRIMARY KEY (symbol, start_date)
+                ) WITHOUT ROWID
+            """)
+            self.conn.commit()
+
+    def fetched_ranges(self, symbol: str) -> List[DateRange]:
+        """Merged date ranges already fetched for a symbol"""
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT start_date, end_date FROM {RANGES_TABLE} WHERE symbol = ?", (symbol,)
+            ).fetchall()
+        return merge_date_ranges((date.fromisoformat(start), date.fromisoformat(end)) for start, end in rows)
+
+    def missing_ranges(self, symbol: str, start: date, end: date) -> List[DateRange]:
+        """Parts of start..end that still need a download"""
+        today = date.today()
+        missing = missing_date_ranges(start, end, self.fetched_ranges(symbol))
+        fetched_at = self._live_fetched.get(symbol)
+        if fetched_at is not None and time.monotonic() - fetched_at < PRICE_LIVE_TTL_SECONDS:
+            # Today's bar was downloaded recently; only older gaps count
+            missing = [(s, min(e, today - timedelta(days=1))) for s, e in missing if s < today]
+        return missing
+
+    def get_prices(self, symbols: List[str], start: date, end: date) -> Dict[str, pd.DataFrame]:
+        """
+        Get the daily bars for each symbol between start and end inclusive,
+        downloading only what the store lacks
+        """
+        symbols = list(dict.fromkeys(symbols))
+        self.fill_gaps(symbols, start, end)
+        return {symbol: self._frame(symbol).loc[pd.Timestamp(start):pd.Timestamp(end)] for symbol in symbols}
+
+    def fill_gaps(self, symbols: List[str], start: date, end: date) -> int:
+        """
+        Download the missing ranges of every symbol, batching symbols that
+        miss the same range. Returns the number of downloads made.
+        """
+        groups: Dict[DateRange, List[str]] = {}
+        for symbol in symbols:
+            for missing in self.missing_ranges(symbol, start, end):
+                groups.setdefault(missing, []).append(symbol)
+
+        for (range_start, range_end), group in sorted(groups.items()):
+            with track_upstream("yfinance", "download"):
+                # yfinance treats end as exclusive
+                frame = self.downloader(
+                    group,
+                    start=range_start.isoformat(),
+                    end=(range_end + timedelta(days=1)).isoformat(),
+                    interval="1d",
+                    group_by="ticker",
+                    auto_adjust=False,
+                    progress=False
+                )
+            frames = self._split_download(frame, group)
+            # yf.download reports failed tickers as empty frames instead of raising
+            if expects_bars(range_start, range_end) and any(f.empty for f in frames.values()):
+                UPSTREAM_FAILURES.inc(source="yfinance", operation="download")
+            self.store(frames, range_start, range_end)
+        if groups:
+            logger.info(f"Downloaded {len(groups)} price ranges for {len(symbols)} symbols")
+        return len(groups)
+
+    def store(self, frames: Dict[str, pd.DataFrame], start: date, end: date) -> None:
+        """
+        Save downloaded bars and record the range as fetched. yf.download
+        reports failures as an empty frame rather than raising, so a symbol
+        that got no bars for a range with trading days stays missing.
+        """
+        today = date.today()
+        # The current session's bar is still moving, so today stays missing
+        covered_end = min(end, today - timedelta(days=1))
+        has_trading_days = expects_bars(start, end)
+        with self._lock, self.conn:
+            for symbol, frame in frames.items():
+                if frame.empty and has_trading_days:
+                    logger.warning(f"No prices for {symbol} from {start} to {end}; will retry")
+                    continue
+                rows = [
+                    (symbol, pd.Timestamp(when).date().isoformat(), *(
+                        None if column not in frame.columns or pd.isna(bar[column]) else float(bar[column])
+                        for column in PRICE_COLUMNS
+                    ))
+                    for when, bar in frame.iterrows()
+                ]
+                self.conn.executemany(
+                    f"INSERT OR REPLACE INTO {BARS_TABLE} (symbol, date, {', '.join(PRICE_COLUMNS.values())}) "
+                    f"VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                if covered_end >= start:
+                    self.conn.execute(
+                        f"INSERT OR REPLACE INTO {RANGES_TABLE} (symbol, start_date, end_date) VALUES (?, ?, ?)",
+                        (symbol, start.isoformat(), covered_end.isoformat())
+                    )
+                if end >= today:
+                    self._live_fetched[symbol] = time.monotonic()
+                self._frames.pop(symbol, None)
+
+    def clear(self) -> None:
+        with self._lock, self.conn:
+            self.conn.execute(f"DELETE FROM {BARS_TABLE}")
+            self.conn.execute(f"DELETE FROM {RANGES_TABLE}")
+            self._frames.clear()
+            self._live_fetched.clear()
+
+    def _frame(self, symbol: str) -> pd.DataFrame:
+        """All stored bars for a symbol, read from disk once per change"""
+        with self._lock:
+            frame = self._frames.get(symbol)
+            if frame is None:
+                rows = self.conn.execute(
+                    f"SELECT date, {', '.join(PRICE_COLUMNS.values())} FROM {BARS_TABLE} WHERE symbol = ? ORDER BY date",
+                    (symbol,)
+                ).fetchall()
+                frame = pd.DataFrame(
+                    [row[1:] for row in rows],
+                    index=pd.DatetimeIndex([row[0] for row in rows], name="Date"),
+                    columns=list(PRICE_COLUMNS),
+                    dtype="float64"
+                )
+                self._frames[symbol] = frame
+            return frame
+
+    @staticmethod
+    def _split_download(frame: pd.DataFrame, symbols: List[str]) -> Dict[str, pd.DataFrame]:
+        """Split a yf.download result into one frame per symbol"""
+        if frame is None or frame.empty:
+            return {symbol: pd.DataFrame(columns=list(PRICE_COLUMNS)) for symbol in symbols}
+        if not isinstance(frame.columns, pd.MultiIndex):
+            return {symbols[0]: frame.dropna(how="all")}
+        tickers = set(frame.columns.get_level_values(0))
+        return {
+            symbol: frame[symbol].dropna(how="all") if symbol in tickers else pd.DataFrame(columns=list(PRICE_COLUMNS))
+            for symbol in symbols
+        }
@@ -0,0 +1,256 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+import os
+import json
+import time
+import logging
+import sqlite3
+import pandas as pd
+from sqlalchemy.dialects.sqlite import dialect as sqlite_dialect
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.db.sqlite import BLS_DB_PATH, get_connection, get_connection_lock
+from app.models.macro import IndicatorMetadata, MacroSeries
+from app.services import bls
+
+logger = logging.getLogger(__name__)
+
+# Release calendar: macro_series.next_update is the next expected release
+# (UTC) of each BLS series. indicator_metadata.release_schedule may hold the
+# published calendar as JSON, {"release_times": ["2024-11-13T13:30:00", ...]};
+# without it the next release is stepped from the last one by frequency.
+CALENDAR_TABLES = [MacroSeries.__table__, IndicatorMetadata.__table__]
+
+# A release that hasn't shown up yet is retried every RELEASE_RETRY_MINUTES
+# for RELEASE_WINDOW_HOURS, then once a day until it appears. Each retry is
+# one BLS query: the defaults spend at most 4 per late release, which leaves
+# room for several releases a day in the v1 quota of 25 queries.
+RELEASE_RETRY_MINUTES = int(os.getenv("RELEASE_RETRY_MINUTES", "30"))
+RELEASE_WINDOW_HOURS = int(os.getenv("RELEASE_WINDOW_HOURS", "2"))
+STALE_RETRY_HOURS = 24
+SCHEDULER_TICK_SECONDS = int(os.getenv("SCHEDULER_TICK_SECONDS", "60"))
+
+FREQUENCY_STEPS = {
+    "weekly": pd.DateOffset(weeks=1),
+    "monthly": pd.DateOffset(months=1),
+    "quarterly": pd.DateOffset(months=3),
+    "annual": pd.DateOffset(years=1),
+}
+
+# Series enqueued for refresh and the time until which they aren't enqueued
+# again. Stored with the calendar so every dispatcher process sees them.
+LEASE_TABLE = "release_leases"
+
+def ensure_calendar_schema(conn: sqlite3.Connection) -> None:
+    """
+    Create the release calendar tables alongside the BLS tables
+    """
+    bls.ensure_bls_schema(conn)
+    for table in CALENDAR_TABLES:
+        conn.execute(str(CreateTable(table, if_not_exists=True).compile(dialect=sqlite_dialect())))
+        for index in table.indexes:
+            conn.execute(str(CreateIndex(index, if_not_exists=True).compile(dialect=sqlite_dialect())))
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {LEASE_TABLE} ("
+        "series_id TEXT PRIMARY KEY, leased_until TEXT NOT NULL)"
+    )
+    conn.commit()
+
+def register_series(
+    conn: sqlite3.Connection,
+    series_id: str,
+    name: str,
+    frequency: str = "Monthly",
+    next_update: Optional[datetime] = None
+) -> None:
+    """
+    Add a series to the release calendar. Without next_update it is due
+    immediately, so the first run loads it.
+    """
+    conn.execute(
+        "INSERT INTO macro_series (series_id, name, frequency, next_update) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT(series_id) DO UPDATE SET name = excluded.name, frequency = excluded.frequency",
+        (series_id, name, frequency, _to_db(next_update))
+    )
+    conn.commit()
+
+def _to_db(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat(sep=" ") if value is not None else None
+
+def _from_db(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+def get_release_calendar(conn: sqlite3.Connection) -> Dict[str, Tuple[Optional[datetime], str, List[datetime]]]:
+    """
+    Get (next release, frequency, published release times) for every
+    scheduled series
+    """
+    rows = conn.execute(
+        "SELECT s.series_id, s.next_update, s.frequency, m.release_schedule FROM macro_series s "
+        "LEFT JOIN indicators i ON i.series_id = s.series_id "
+        "LEFT JOIN indicator_metadata m ON m.indicator_id = i.id"
+    ).fetchall()
+    calendar = {}
+    for series_id, next_update, frequency, schedule in rows:
+        release_times = []
+        if schedule:
+            try:
+                release_times = sorted(datetime.fromisoformat(t) for t in json.loads(schedule).get("release_times", []))
+            except (ValueError, TypeError, AttributeError):
+                logger.warning(f"Ignoring malformed release schedule for {series_id}")
+        calendar[series_id] = (_from_db(next_update), frequency or "Monthly", release_times)
+    return calendar
+
+def next_release_after(after: datetime, last_release: Optional[datetime], frequency: str, release_times: List[datetime]) -> datetime:
+    """
+    Get the first release after a point in time: from the published calendar
+    when it has one, otherwise stepped from the last release by frequency
+    """
+    upcoming = [t for t in release_times if t > after]
+    if upcoming:
+        return upcoming[0]
+    step = FREQUENCY_STEPS.get(frequency.lower(), FREQUENCY_STEPS["monthly"])
+    release = pd.Timestamp(last_release or after)
+    while release <= after:
+        release += step
+    return release.to_pydatetime()
+
+def due_release_groups(conn: sqlite3.Connection, now: datetime) -> Dict[datetime, List[str]]:
+    """
+    Get the series whose release time has passed, grouped by release time.
+    Series released together are refreshed by one job.
+    """
+    groups: Dict[datetime, List[str]] = {}
+    for series_id, (next_update, _, _) in get_release_calendar(conn).items():
+        release_at = next_update or datetime.min
+        if release_at <= now:
+            groups.setdefault(release_at, []).append(series_id)
+    return groups
+
+def refresh_release(
+    series_ids: List[str],
+    release_at: datetime,
+    db_path: str = BLS_DB_PATH,
+    now: Optional[datetime] = None
+) -> Dict[str, List[str]]:
+    """
+    Ingest the series of one release in a single planned fetch. Series that
+    now have a newer period move on to their next release; the others keep
+    their release time and are retried by the dispatcher.
+    Returns the updated and the unchanged series IDs.
+    """
+    now = now or datetime.utcnow()
+    conn = get_connection(db_path)
+    lock = get_connection_lock(db_path)
+    with lock:
+        ensure_calendar_schema(conn)
+        before = bls.get_ingestion_state(conn)
+
+    bls.ingest_bls_data(series_ids, start_year=str(now.year - 1), end_year=str(now.year), db_path=db_path)
+
+    updated, unchanged = [], []
+    with lock, conn:
+        after = bls.get_ingestion_state(conn)
+        calendar = get_release_calendar(conn)
+        for series_id in series_ids:
+            if after.get(series_id) is not None and after.get(series_id) != before.get(series_id):
+                _, frequency, release_times = calendar.get(series_id, (None, "Monthly", []))
+                next_update = next_release_after(now, release_at if release_at != datetime.min else None, frequency, release_times)
+                conn.execute(
+                    "UPDATE macro_series SET last_updated = ?, next_update = ? WHERE series_id = ?",
+                    (_to_db(now), _to_db(next_update), series_id)
+                )
+                updated.append(series_id)
+            else:
+                unchanged.append(series_id)
+
+    logger.info(f"Release {release_at}: {len(updated)} series updated, {len(unchanged)} not yet published")
+    return {"updated": updated, "unchanged": unchanged}
+
+def acquire_leases(conn: sqlite3.Connection, series_ids: List[str], now: datetime, until: datetime) -> List[str]:
+    """
+    Lease the series whose previous lease has expired until a point in time.
+    Each claim is a single conditional upsert, so two dispatchers can't both
+    take the same series. Returns the series leased.
+    """
+    leased = []
+    with conn:
+        for series_id in series_ids:
+            cursor = conn.execute(
+                f"INSERT INTO {LEASE_TABLE} (series_id, leased_until) VALUES (?, ?) "
+                f"ON CONFLICT(series_id) DO UPDATE SET leased_until = excluded.leased_until "
+                f"WHERE {LEASE_TABLE}.leased_until <= ?",
+                (series_id, _to_db(until), _to_db(now))
+            )
+            if cursor.rowcount:
+                leased.append(series_id)
+    return leased
+
+class ReleaseDispatcher:
+    """
+    Turn the release calendar into refresh jobs. Each tick reads the
+    calendar only, with no upstream calls, and enqueues one job per due
+    release. Series are leased in the database until their retry time, so
+    a pending or unpublished release isn't enqueued again every tick, by
+    this dispatcher or one in another process.
+    """
+    def __init__(self, enqueue: Callable[[List[str], datetime], None], db_path: str = BLS_DB_PATH):
+        self.enqueue = enqueue
+        self.db_path = db_path
+        self._schema_ready = False
+
+    def tick(self, now: Optional[datetime] = None) -> int:
+        """
+        Enqueue the due releases. Returns the number of jobs enqueued.
+        """
+        now = now or datetime.utcnow()
+        conn = get_connection(self.db_path)
+        lock = get_connection_lock(self.db_path)
+        with lock:
+            if not self._schema_ready:
+                ensure_calendar_schema(conn)
+                self._schema_ready = True
+            groups = due_release_groups(conn, now)
+
+        jobs = 0
+        for release_at, series_ids in sorted(groups.items()):
+            if now - release_at < timedelta(hours=RELEASE_WINDOW_HOURS):
+                lease = now + timedelta(minutes=RELEASE_RETRY_MINUTES)
+            else:
+                lease = now + timedelta(hours=STALE_RETRY_HOURS)
+            with lock:
+                series_ids = acquire_leases(conn, series_ids, now, lease)
+            if not series_ids:
+                continue
+            self.enqueue(series_ids, release_at)
+            jobs += 1
+        return jobs
+
+def run_scheduler(db_path: str = BLS_DB_PATH, tick_seconds: int = SCHEDULER_TICK_SECONDS) -> None:
+    """
+    Run the dispatcher and the refresh jobs in this process, for development
+    without a broker. Production uses the Celery beat schedule in app.worker.
+    """
+    def run_now(series_ids: List[str], release_at: datetime) -> None:
+        try:
+            refresh_release(series_ids, release_at, db_path)
+        except Exception as e:
+            logger.error(f"Refresh of {series_ids} failed: {e}")
+
+    dispatcher = ReleaseDispatcher(run_now, db_path)
+    while True:
+        dispatcher.tick()
+        time.sleep(tick_seconds)
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    conn = get_connection(BLS_DB_PATH)
+    with get_connection_lock(BLS_DB_PATH):
+        ensure_calendar_schema(conn)
+        # Series already on the calendar keep their release times
+        for name, series_id in bls.SERIES_MAP.items():
+            register_series(conn, series_id, name)
+    run_scheduler()
@@ -1,18 +1,186 @@
 from textblob import TextBlob
+from textblob.en import sentiment as pattern_sentiment
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from typing import Dict, List, Union
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import os
+import atexit
+import hashlib
+import logging
+import threading
+import unicodedata
 import numpy as np
 
+from app.core.cache import TieredCache
+from app.db.sqlite import BLS_DB_PATH
+
+logger = logging.getLogger(__name__)
+
+# Noun phrases mentioned fewer times than this are not reported as topics
+MIN_TOPIC_MENTIONS = 3
+
+# Streams track at most this many noun phrases; the rarest are pruned first
+MAX_TRACKED_TOPICS = int(os.getenv("SENTIMENT_MAX_TOPICS", "10000"))
+
+# Text without a sentence break is scored as one sentence past this length
+MAX_SENTENCE_CHARS = 10000
+
+# Batch scoring shards texts over worker processes, since both scorers are pure Python
+SENTIMENT_WORKERS = int(os.getenv("SENTIMENT_WORKERS", str(os.cpu_count() or 1)))
+SENTIMENT_CHUNK_SIZE = int(os.getenv("SENTIMENT_CHUNK_SIZE", "500"))
+
+# Scores are cached by a hash of the normalized text. Bump the version when
+# the scoring changes so stale scores are not served. An empty path keeps
+# the cache in memory only.
+SCORER_VERSION = "textblob+vader/1"
+SENTIMENT_CACHE_PATH = os.getenv("SENTIMENT_CACHE_PATH", BLS_DB_PATH)
+SENTIMENT_CACHE_MEMORY_ITEMS = int(os.getenv("SENTIMENT_CACHE_MEMORY_ITEMS", "50000"))
+SENTIMENT_CACHE_DISK_ITEMS = int(os.getenv("SENTIMENT_CACHE_DISK_ITEMS", "2000000"))
+SENTIMENT_CACHE_TABLE = "sentiment_score_cache"
+
+_default_cache: Optional[TieredCache] = None
+_default_cache_pid: Optional[int] = None
+_default_cache_lock = threading.Lock()
+
+def text_key(text: str) -> str:
+    """
+    Content address of a text: whitespace and Unicode forms are normalized,
+    case is kept because VADER scores capitals as emphasis
+    """
+    normalized = " ".join(unicodedata.normalize("NFKC", text).split())
+    return hashlib.blake2b(f"{SCORER_VERSION}\0{normalized}".encode("utf-8"), digest_size=16).hexdigest()
+
+def get_sentiment_cache() -> TieredCache:
+    """
+    Get the process-wide score cache, creating it on first use. Worker
+    processes get their own memory tier over the shared disk tier.
+    """
+    global _default_cache, _default_cache_pid
+    with _default_cache_lock:
+        if _default_cache is None or _default_cache_pid != os.getpid():
+            _default_cache = TieredCache(
+                SENTIMENT_CACHE_PATH or None,
+                SENTIMENT_CACHE_TABLE,
+                max_memory_items=SENTIMENT_CACHE_MEMORY_ITEMS,
+                max_disk_items=SENTIMENT_CACHE_DISK_ITEMS
+            )
+            _default_cache_pid = os.getpid()
+            atexit.register(_default_cache.flush)
+        return _default_cache
+
+class RunningStats:
+    """
+    Count, mean and variance of a stream of scores in constant memory.
+    Stats of separate shards merge exactly, so workers can reduce in any order.
+    """
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        if other.count:
+            count = self.count + other.count
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / count
+            self.m2 += other.m2 + delta * delta * self.count * other.count / count
+            self.count = count
+        return self
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation, like np.std"""
+        return (self.m2 / self.count) ** 0.5 if self.count else 0.0
+
+class SentimentAccumulator:
+    """
+    Running aggregates for a stream of scored texts or sentences: overall
+    mean and variance, plus score stats per noun phrase. Memory is bounded
+    by max_topics; when it is exceeded the least mentioned half of the
+    phrases is dropped, so rare phrases may be undercounted but frequent
+    ones are kept.
+    """
+    def __init__(self, max_topics: int = MAX_TRACKED_TOPICS):
+        self.stats = RunningStats()
+        self.topics: Dict[str, RunningStats] = {}
+        self.max_topics = max_topics
+
+    def add(self, score: float, noun_phrases: Iterable[str] = ()) -> None:
+        self.stats.add(score)
+        for noun in noun_phrases:
+            topic = self.topics.get(noun)
+            if topic is None:
+                topic = self.topics[noun] = RunningStats()
+            topic.add(score)
+        if len(self.topics) > self.max_topics:
+            self._prune()
+
+    def _prune(self) -> None:
+        ranked = sorted(self.topics.items(), key=lambda item: item[1].count, reverse=True)
+        self.topics = dict(ranked[:self.max_topics // 2])
+
+    def topic_sentiments(self, min_mentions: int = MIN_TOPIC_MENTIONS) -> Dict[str, float]:
+        return {topic: stats.mean for topic, stats in self.topics.items() if stats.count >= min_mentions}
+
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    """Yield lists of up to size items without materializing the iterable"""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+# Built once per worker process by the pool initializer
+_worker_service: Optional["SentimentService"] = None
+
+def _init_worker(cache_config: Dict[str, Any], np_extractor) -> None:
+    """Build the worker's service with the caller's cache settings and extractor"""
+    global _worker_service
+    _worker_service = SentimentService(np_extractor=np_extractor, cache=TieredCache(**cache_config))
+
+def _score_chunk(texts: List[str]) -> Tuple[int, float, float]:
+    """Score a chunk in a worker and return its stats as a picklable tuple"""
+    stats = RunningStats()
+    for text in texts:
+        stats.add(_worker_service.analyze_text(text)["combined_score"])
+    _worker_service.cache.flush()
+    return stats.count, stats.mean, stats.m2
+
 class SentimentService:
-    def __init__(self):
+    def __init__(self, np_extractor=None, cache: Optional[TieredCache] = None):
         self.vader = SentimentIntensityAnalyzer()
+        # None uses TextBlob's default FastNPExtractor
+        self.np_extractor = np_extractor
+        self.cache = cache or get_sentiment_cache()
     
     def analyze_text(self, text: str) -> Dict[str, float]:
         """Analyze text using both TextBlob and VADER"""
-        # TextBlob analysis
-        blob = TextBlob(text)
-        textblob_sentiment = blob.sentiment.polarity
-        
+        key = text_key(text)
+        cached = self.cache.get(key)
+        if cached is None:
+            # Same polarity as TextBlob(text).sentiment without building a blob and
+            # the namedtuple class TextBlob's analyzer creates on every call
+            cached = self._combine_scores(text, pattern_sentiment(text)[0])
+            self.cache.set(key, cached)
+        # Copies, including the nested VADER scores, so callers can't alter the cache entry
+        return dict(cached, vader_details=dict(cached["vader_details"]))
+
+    def cache_stats(self) -> Dict[str, float]:
+        """Score cache hit counters"""
+        return self.cache.stats()
+
+    def _combine_scores(self, text: str, textblob_sentiment: float) -> Dict[str, float]:
+        """Combine a TextBlob polarity already computed for text with its VADER scores"""
         # VADER analysis
         vader_scores = self.vader.polarity_scores(text)
         
@@ -37,59 +205,156 @@ class SentimentService:
     def analyze_texts(self, texts: List[str]) -> Dict[str, Union[float, str, Dict]]:
         """Analyze multiple texts and return aggregate sentiment"""
         if not texts:
+            return self._aggregate(0.0, 0.0, 0)
+        
+        scores = [self.analyze_text(text)["combined_score"] for text in texts]
+        self.cache.flush()
+        return self._aggregate(np.mean(scores), np.std(scores), len(texts))
+
+    def _aggregate(self, avg_score: float, std_score: float, sample_size: int) -> Dict[str, Union[float, str, int]]:
+        if not sample_size:
             return {
                 "sentiment_score": 0.0,
                 "sentiment_label": "neutral",
                 "confidence": 0.0,
                 "sample_size": 0
             }
-        
-        scores = [self.analyze_text(text)["combined_score"] for text in texts]
-        avg_score = np.mean(scores)
-        std_score = np.std(scores)
-        
         return {
             "sentiment_score": avg_score,
             "sentiment_label": self.get_sentiment_label(avg_score),
             "confidence": 1 - min(std_score, 1),  # Convert std to confidence
-            "sample_size": len(texts)
+            "sample_size": sample_size
         }
-    
-    def analyze_earnings_call(self, transcript: str) -> Dict[str, Union[float, str, Dict]]:
-        """Analyze earnings call transcript"""
-        # Split transcript into sentences
-        blob = TextBlob(transcript)
-        sentences = [str(sentence) for sentence in blob.sentences]
-        
-        # Analyze each sentence
-        sentence_scores = [self.analyze_text(sentence)["combined_score"] for sentence in sentences]
-        
-        # Calculate statistics
-        avg_score = np.mean(sentence_scores)
-        std_score = np.std(sentence_scores)
-        
-        # Identify key topics and their sentiment
-        topics = {}
-        for sentence in sentences:
-            blob = TextBlob(sentence)
-            for noun in blob.noun_phrases:
-                if noun not in topics:
-                    topics[noun] = []
-                topics[noun].append(self.analyze_text(sentence)["combined_score"])
-        
-        # Calculate topic sentiments
-        topic_sentiments = {
-            topic: np.mean(scores) 
-            for topic, scores in topics.items() 
-            if len(scores) >= 3  # Only include topics mentioned at least 3 times
+
+    def analyze_texts_batch(
+        self,
+        texts: Iterable[str],
+        max_workers: Optional[int] = None,
+        chunk_size: int = SENTIMENT_CHUNK_SIZE
+    ) -> Dict[str, Union[float, str, Dict]]:
+        """
+        Analyze a large corpus on a process pool and return the same aggregate
+        as analyze_texts. Texts are read lazily in chunks, at most two chunks
+        per worker are in flight, and each chunk's stats are merged as it
+        finishes.
+        """
+        workers = max_workers or SENTIMENT_WORKERS
+        stats = RunningStats()
+        if workers <= 1:
+            return self.analyze_text_stream(texts)
+
+        cache_config = {
+            "db_path": self.cache.db_path,
+            "table": self.cache.table,
+            "max_memory_items": self.cache.max_memory_items,
+            "max_disk_items": self.cache.max_disk_items,
         }
-        
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(cache_config, self.np_extractor)
+        ) as executor:
+            pending = set()
+            for chunk in chunked(texts, chunk_size):
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stats.merge(RunningStats(*future.result()))
+                pending.add(executor.submit(_score_chunk, chunk))
+            for future in pending:
+                stats.merge(RunningStats(*future.result()))
+        logger.info(f"Scored {stats.count} texts on {workers} worker processes")
+        return self._aggregate(stats.mean, stats.std, stats.count)
+    
+    def iter_sentences(self, chunks: Iterable[str]) -> Iterator:
+        """
+        Reassemble sentences from an iterable of text chunks or lines and
+        yield TextBlob sentences as soon as they are complete. Only the
+        unfinished tail of the stream is buffered.
+        """
+        buffer = ""
+        for chunk in chunks:
+            buffer = f"{buffer} {chunk}" if buffer else chunk
+            sentences = TextBlob(buffer, np_extractor=self.np_extractor).sentences
+            if not sentences:
+                buffer = ""
+                continue
+            # The last sentence may continue in the next chunk
+            yield from sentences[:-1]
+            buffer = buffer[sentences[-1].start:]
+            if len(buffer) > MAX_SENTENCE_CHARS:
+                yield sentences[-1]
+                buffer = ""
+        if buffer.strip():
+            yield from TextBlob(buffer, np_extractor=self.np_extractor).sentences
+
+    def score_sentences(self, transcript: Union[str, Iterable[str]]) -> Iterator[Tuple[str, float, List[str]]]:
+        """
+        Split a transcript, or a stream of its chunks, into sentences and
+        yield each sentence with its combined score and noun phrases. Every
+        sentence is tokenized, chunked and scored exactly once.
+        """
+        chunks = [transcript] if isinstance(transcript, str) else transcript
+        for sentence in self.iter_sentences(chunks):
+            text = str(sentence)
+            score = self.analyze_text(text)["combined_score"]
+            yield text, score, list(sentence.noun_phrases)
+
+    def stream_texts(
+        self,
+        texts: Iterable[str],
+        accumulator: Optional[SentimentAccumulator] = None
+    ) -> Iterator[Tuple[str, float]]:
+        """
+        Score a feed of texts one at a time, yielding each text with its
+        combined score and adding it to the accumulator if one is given
+        """
+        for text in texts:
+            score = self.analyze_text(text)["combined_score"]
+            if accumulator is not None:
+                accumulator.add(score)
+            yield text, score
+
+    def analyze_text_stream(self, texts: Iterable[str]) -> Dict[str, Union[float, str, Dict]]:
+        """Analyze a feed of texts in constant memory, returning the analyze_texts aggregate"""
+        accumulator = SentimentAccumulator()
+        for _ in self.stream_texts(texts, accumulator):
+            pass
+        self.cache.flush()
+        stats = accumulator.stats
+        return self._aggregate(stats.mean, stats.std, stats.count)
+
+    def stream_earnings_call(
+        self,
+        chunks: Union[str, Iterable[str]],
+        accumulator: Optional[SentimentAccumulator] = None
+    ) -> Iterator[Tuple[str, float, List[str]]]:
+        """
+        Score transcript chunks incrementally, yielding each scored sentence
+        and adding it to the accumulator if one is given
+        """
+        for sentence, score, noun_phrases in self.score_sentences(chunks):
+            if accumulator is not None:
+                accumulator.add(score, noun_phrases)
+            yield sentence, score, noun_phrases
+
+    def summarize_earnings_call(self, accumulator: SentimentAccumulator) -> Dict[str, Union[float, str, Dict]]:
+        """Build the analyze_earnings_call result from running aggregates"""
+        stats = accumulator.stats
         return {
             "overall_sentiment": {
-                "score": avg_score,
-                "label": self.get_sentiment_label(avg_score),
-                "confidence": 1 - min(std_score, 1)
+                "score": stats.mean,
+                "label": self.get_sentiment_label(stats.mean),
+                "confidence": 1 - min(stats.std, 1) if stats.count else 0.0
             },
-            "topic_sentiments": topic_sentiments,
-            "sample_size": len(sentences)
-        } 
\ No newline at end of file
+            "topic_sentiments": accumulator.topic_sentiments(),
+            "sample_size": stats.count
+        }
+
+    def analyze_earnings_call(self, transcript: Union[str, Iterable[str]]) -> Dict[str, Union[float, str, Dict]]:
+        """Analyze earnings call transcript, given whole or as a stream of chunks"""
+        accumulator = SentimentAccumulator()
+        for _ in self.stream_earnings_call(transcript, accumulator):
+            pass
+        self.cache.flush()
+        return self.summarize_earnings_call(accumulator)
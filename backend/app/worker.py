@@ -0,0 +1,45 @@
+from typing import Dict, List
+from datetime import datetime
+import os
+from celery import Celery
+from dotenv import load_dotenv
+
+from app.services.scheduler import SCHEDULER_TICK_SECONDS, ReleaseDispatcher, refresh_release
+
+load_dotenv()
+
+# Redis in docker-compose; the in-memory broker runs everything in one
+# process for local use and tests (set CELERY_TASK_ALWAYS_EAGER=true)
+celery_app = Celery(
+    "investor_gps",
+    broker=os.getenv("CELERY_BROKER_URL", "memory://"),
+    backend=os.getenv("CELERY_RESULT_BACKEND", "cache+memory://"),
+)
+celery_app.conf.update(
+    task_always_eager=os.getenv("CELERY_TASK_ALWAYS_EAGER", "false").lower() == "true",
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+    timezone="UTC",
+    beat_schedule={
+        "dispatch-due-releases": {
+            "task": "app.worker.dispatch_due_releases",
+            "schedule": float(SCHEDULER_TICK_SECONDS),
+        },
+    },
+)
+
+@celery_app.task(name="app.worker.refresh_release")
+def refresh_release_task(series_ids: List[str], release_at: str) -> Dict[str, List[str]]:
+    """Refresh the series of one release"""
+    return refresh_release(series_ids, datetime.fromisoformat(release_at))
+
+# Leases are stored in the BLS database, so ticks from any worker process
+# (or a second beat) don't enqueue a release twice
+dispatcher = ReleaseDispatcher(
+    lambda series_ids, release_at: refresh_release_task.delay(series_ids, release_at.isoformat())
+)
+
+@celery_app.task(name="app.worker.dispatch_due_releases")
+def dispatch_due_releases() -> int:
+    """Enqueue one refresh job per due release"""
+    return dispatcher.tick()
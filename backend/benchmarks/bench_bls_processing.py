@@ -0,0 +1,75 @@
+"""
+Benchmark the grouped BLS processing engine against the previous
+per-series implementation.
+
+    python -m benchmarks.bench_bls_processing
+"""
+from typing import List, Dict, Any
+import time
+
+import pandas as pd
+
+from app.services.bls import process_bls_payload
+from benchmarks.synthetic import make_bls_payload
+
+def legacy_process_bls_data(data: List[Dict[str, Any]], series_name: str):
+    """The per-series implementation process_bls_payload replaced, without the prints"""
+    df = pd.DataFrame(data)
+    df['value'] = pd.to_numeric(df['value'])
+    df['series'] = series_name
+
+    pivoted_df = df.pivot(index=['series', 'year'], columns='period', values='value').reset_index()
+    pivoted_df.columns.name = None
+
+    latest_mo = df[df['latest'] == 'true']['period'].values[0]
+    latest_yr = df[df['latest'] == 'true']['year'].values[0]
+
+    df_sorted = df.sort_values(by=['year', 'period'])
+    df_sorted['mom_change'] = df_sorted.groupby('series')['value'].pct_change().round(3) * 100
+
+    pivoted_df_sorted = df_sorted.pivot(index=['series', 'year'], columns='period', values='mom_change').reset_index()
+    pivoted_df_sorted['yoy_change'] = pivoted_df.groupby('series')[latest_mo].pct_change().round(3) * 100
+    pivoted_df_sorted.columns.name = None
+
+    latest_mom_chg = pivoted_df_sorted[(pivoted_df_sorted['year'] == latest_yr)][latest_mo].values[0]
+    latest_yoy_chg = pivoted_df_sorted[(pivoted_df_sorted['year'] == latest_yr)]['yoy_change'].values[0]
+
+    summary_df = pd.DataFrame({
+        'series name': series_name,
+        'latest_mom_chg': latest_mom_chg,
+        'latest_yoy_chg': latest_yoy_chg
+    }, index=[0])
+    return pivoted_df_sorted, summary_df
+
+def legacy_process_payload(series_list: List[Dict[str, Any]]):
+    results = [legacy_process_bls_data(series['data'], series['seriesID']) for series in series_list]
+    return (
+        pd.concat([combined for combined, _ in results], ignore_index=True),
+        pd.concat([summary for _, summary in results], ignore_index=True)
+    )
+
+def best_of(func, *args, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    print(f"{'series':>8} {'years':>6} {'legacy (s)':>12} {'grouped (s)':>12} {'speedup':>8}")
+    for n_series, n_years in [(10, 2), (100, 5), (500, 10), (1000, 20)]:
+        payload = make_bls_payload(n_series, n_years)
+
+        # Both paths must agree before their timings mean anything
+        legacy_combined, legacy_summary = legacy_process_payload(payload)
+        combined, summary = process_bls_payload(payload)
+        pd.testing.assert_frame_equal(combined, legacy_combined, check_dtype=False)
+        pd.testing.assert_frame_equal(summary, legacy_summary, check_dtype=False)
+
+        legacy = best_of(legacy_process_payload, payload)
+        grouped = best_of(process_bls_payload, payload)
+        print(f"{n_series:>8} {n_years:>6} {legacy:>12.4f} {grouped:>12.4f} {legacy / grouped:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
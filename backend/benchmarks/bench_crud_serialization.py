@@ -0,0 +1,66 @@
+"""
+Benchmark the cursor-to-JSON crud path against the previous pandas path
+(read_sql_query, to_dict, response model validation, JSON encoding).
+
+    python -m benchmarks.bench_crud_serialization
+"""
+from typing import List, Dict, Any
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.bls import get_matrix_data_json
+from benchmarks.synthetic import seed_bls_database
+
+_response_model = TypeAdapter(List[Dict[str, Any]])
+
+def legacy_matrix_response(db) -> bytes:
+    """What FastAPI did for a pandas crud result behind response_model"""
+    df = pd.read_sql_query("SELECT * FROM bls_combined_data", db.bind)
+    records = df.to_dict('records')
+    validated = _response_model.validate_python(records)
+    return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+def measure(func, db, repeat: int = 3):
+    """Best wall time and peak traced memory over a few runs"""
+    timings, peaks = [], []
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        func(db)
+        timings.append(time.perf_counter() - start)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return min(timings), min(peaks)
+
+def main():
+    print(f"{'rows':>8} {'legacy ms':>10} {'legacy MiB':>11} {'json ms':>8} {'json MiB':>9} {'speedup':>8}")
+    for n_series, n_years in [(10, 10), (100, 20), (500, 40)]:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "bench.db")
+            seed_bls_database(db_path, n_series, n_years)
+            engine = create_engine(f"sqlite:///{db_path}")
+            db = sessionmaker(bind=engine)()
+            try:
+                legacy_time, legacy_peak = measure(legacy_matrix_response, db)
+                json_time, json_peak = measure(get_matrix_data_json, db)
+            finally:
+                db.close()
+                engine.dispose()
+
+        rows = n_series * n_years
+        print(
+            f"{rows:>8} {legacy_time * 1000:>10.1f} {legacy_peak / 2**20:>11.2f} "
+            f"{json_time * 1000:>8.1f} {json_peak / 2**20:>9.2f} {legacy_time / json_time:>7.1f}x"
+        )
+
+if __name__ == "__main__":
+    main()
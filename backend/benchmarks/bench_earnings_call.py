@@ -0,0 +1,58 @@
+"""
+Benchmark earnings call analysis against the previous implementation that
+re-tokenized and re-scored each sentence for every noun phrase in it.
+Needs the TextBlob corpora (python -m textblob.download_corpora).
+
+    python -m benchmarks.bench_earnings_call
+"""
+from typing import Dict, List
+import time
+
+import numpy as np
+from textblob import TextBlob
+
+from app.services.sentiment_service import SentimentService
+from benchmarks.synthetic import make_transcript
+
+def legacy_analyze_earnings_call(service: SentimentService, transcript: str) -> Dict:
+    """The implementation analyze_earnings_call replaced"""
+    blob = TextBlob(transcript, np_extractor=service.np_extractor)
+    sentences = [str(sentence) for sentence in blob.sentences]
+    sentence_scores = [service.analyze_text(sentence)["combined_score"] for sentence in sentences]
+    avg_score = np.mean(sentence_scores)
+    std_score = np.std(sentence_scores)
+
+    topics: Dict[str, List[float]] = {}
+    for sentence in sentences:
+        blob = TextBlob(sentence, np_extractor=service.np_extractor)
+        for noun in blob.noun_phrases:
+            if noun not in topics:
+                topics[noun] = []
+            topics[noun].append(service.analyze_text(sentence)["combined_score"])
+
+    topic_sentiments = {topic: np.mean(scores) for topic, scores in topics.items() if len(scores) >= 3}
+    return {
+        "overall_sentiment": {"score": avg_score, "confidence": 1 - min(std_score, 1)},
+        "topic_sentiments": topic_sentiments,
+        "sample_size": len(sentences)
+    }
+
+def time_once(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def main():
+    service = SentimentService()
+    # Trains the noun phrase tagger outside the timed runs
+    service.analyze_earnings_call(make_transcript(50))
+
+    print(f"{'words':>7} {'legacy s':>9} {'single-pass s':>14} {'speedup':>8}")
+    for n_words in [1000, 10000]:
+        transcript = make_transcript(n_words)
+        legacy_time = time_once(lambda: legacy_analyze_earnings_call(service, transcript))
+        new_time = time_once(lambda: service.analyze_earnings_call(transcript))
+        print(f"{n_words:>7} {legacy_time:>9.2f} {new_time:>14.2f} {legacy_time / new_time:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Benchmark scoring many events with the vectorized event study against
+looping over analyze_market_reaction. Both read from a warmed price store,
+so only the scoring is timed.
+
+    python -m benchmarks.bench_event_study
+"""
+from datetime import date
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.db.sqlite import close_connections
+from app.services.market_reaction import MarketReactionService
+from app.services.price_store import PriceStore
+from benchmarks.synthetic import SyntheticDownloader
+
+def best_of(func, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    start, end = date(2010, 1, 1), date(2023, 12, 31)
+    print(f"{'events':>7} {'loop ms':>9} {'batch ms':>9} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        service = MarketReactionService(PriceStore(os.path.join(tmp, "prices.db"), downloader=SyntheticDownloader()))
+        service.get_assets_data(start, end)
+
+        rng = np.random.default_rng(0)
+        days = pd.bdate_range(start, end)
+        for n_events in [10, 100, 500]:
+            events = pd.DatetimeIndex(np.sort(rng.choice(days.values, n_events, replace=False)))
+            loop_time = best_of(lambda: [
+                service.analyze_market_reaction(event.to_pydatetime(), "CPI", "") for event in events
+            ])
+            batch_time = best_of(lambda: service.analyze_events(events))
+            print(f"{n_events:>7} {loop_time * 1000:>9.1f} {batch_time * 1000:>9.1f} {loop_time / batch_time:>7.0f}x")
+        close_connections()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Benchmark batch sentiment throughput as worker processes are added.
+Throughput should grow close to linearly up to the number of cores.
+
+    python -m benchmarks.bench_sentiment_batch [n_posts]
+"""
+import os
+import sys
+import time
+
+from app.services.sentiment_service import SentimentService
+from benchmarks.synthetic import make_posts
+
+def main():
+    n_posts = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    cores = os.cpu_count() or 1
+    service = SentimentService()
+    worker_counts = sorted({1, 2, 4, cores})
+
+    print(f"{n_posts} posts on {cores} cores")
+    print(f"{'workers':>8} {'seconds':>8} {'posts/s':>9} {'scaling':>8}")
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        service.analyze_texts_batch(make_posts(n_posts), max_workers=workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>8.2f} {n_posts / elapsed:>9.0f} {baseline / elapsed:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Compare peak memory of scoring a text feed through the streaming path
+against loading it into a list for analyze_texts, at growing feed sizes.
+
+    python -m benchmarks.bench_sentiment_stream
+"""
+import time
+import tracemalloc
+
+from app.services.sentiment_service import SentimentService
+from benchmarks.synthetic import make_posts
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024
+
+def main():
+    service = SentimentService()
+    # Load the TextBlob and VADER lexicons outside the measured runs
+    service.analyze_texts(list(make_posts(10)))
+    print(f"{'posts':>7} {'list s':>7} {'list KiB':>9} {'stream s':>9} {'stream KiB':>11}")
+    for n_posts in [1000, 10000, 100000]:
+        list_time, list_peak = measure(lambda: service.analyze_texts(list(make_posts(n_posts))))
+        stream_time, stream_peak = measure(lambda: service.analyze_text_stream(make_posts(n_posts)))
+        print(f"{n_posts:>7} {list_time:>7.2f} {list_peak:>9.0f} {stream_time:>9.2f} {stream_peak:>11.0f}")
+
+if __name__ == "__main__":
+    main()
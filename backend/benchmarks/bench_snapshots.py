@@ -0,0 +1,48 @@
+"""
+Benchmark full-history reads from memory-mapped snapshots against reading
+the same rows from SQLite through pandas.
+
+    python -m benchmarks.bench_snapshots
+"""
+import os
+import sqlite3
+import tempfile
+import time
+
+import pandas as pd
+
+from app.db.snapshots import load_series_arrays, load_series_history, refresh_snapshots
+from benchmarks.synthetic import seed_bls_database
+
+def best_of(func, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    print(f"{'years':>6} {'sqlite ms':>10} {'frame ms':>9} {'arrays ms':>10}")
+    for n_years in [10, 50, 100]:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "bench.db")
+            seed_bls_database(db_path, n_series=20, n_years=n_years)
+            conn = sqlite3.connect(db_path)
+            series_ids = [row[0] for row in conn.execute("SELECT series_id FROM indicators")]
+            refresh_snapshots(conn, series_ids, db_path)
+            series_id = series_ids[0]
+
+            sqlite_time = best_of(lambda: pd.read_sql_query(
+                "SELECT p.year, p.month, p.value, p.is_preliminary, p.is_revised FROM time_series_points p "
+                "JOIN indicators i ON i.id = p.indicator_id WHERE i.series_id = ? ORDER BY p.year, p.month",
+                conn, params=(series_id,)
+            ))
+            frame_time = best_of(lambda: load_series_history(conn, series_id, db_path))
+            arrays_time = best_of(lambda: load_series_arrays(conn, series_id, db_path))
+            conn.close()
+
+        print(f"{n_years:>6} {sqlite_time * 1000:>10.2f} {frame_time * 1000:>9.2f} {arrays_time * 1000:>10.2f}")
+
+if __name__ == "__main__":
+    main()
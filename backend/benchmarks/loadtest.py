@@ -0,0 +1,274 @@
+"""
+HTTP load test for the API on a seeded SQLite database, reporting
+throughput, latency percentiles and per-worker memory.
+
+    python -m benchmarks.loadtest                                   # app in-process
+    python -m benchmarks.loadtest --workers 4 --concurrency 64      # uvicorn workers
+    python -m benchmarks.loadtest --url http://localhost:8000       # a running server
+
+In-process runs go through the ASGI transport with no sockets, so they
+measure the app alone. --workers starts uvicorn on the seeded database and
+includes the server and the network stack.
+"""
+from typing import Any, Dict, List, Optional
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+from benchmarks.synthetic import seed_bls_database
+
+DEFAULT_PATHS = ["/api/v1/macro/bls/indicators", "/health"]
+PERCENTILES = (50, 95, 99)
+
+def rss_kib(pid: int) -> Dict[str, int]:
+    """Current and peak resident memory of a process, from /proc (Linux)"""
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(("VmRSS:", "VmHWM:")):
+                    name, value = line.split(":")
+                    memory["rss_kib" if name == "VmRSS" else "peak_rss_kib"] = int(value.split()[0])
+    except OSError:
+        pass
+    return memory
+
+def child_pids(pid: int) -> List[int]:
+    """The direct children of a process, e.g. the uvicorn workers"""
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command may contain spaces, so parse after its closing paren
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            children.append(int(entry))
+    return sorted(children)
+
+def summarize(latencies: Dict[str, List[float]], statuses: Dict[str, Dict[int, int]], elapsed: float) -> Dict[str, Any]:
+    """Throughput and latency percentiles (ms) per path and overall"""
+    def stats(values: List[float], counts: Dict[int, int]) -> Dict[str, Any]:
+        ms = np.asarray(values) * 1000
+        result = {
+            "requests": len(values),
+            "rps": len(values) / elapsed if elapsed else 0.0,
+            "errors": sum(n for status, n in counts.items() if status >= 400 or status == 0),
+            "statuses": {str(status): n for status, n in sorted(counts.items())},
+        }
+        if len(ms):
+            result.update({f"p{p}_ms": float(np.percentile(ms, p)) for p in PERCENTILES})
+            result["mean_ms"] = float(ms.mean())
+            result["max_ms"] = float(ms.max())
+        return result
+
+    all_counts: Dict[int, int] = {}
+    for counts in statuses.values():
+        for status, n in counts.items():
+            all_counts[status] = all_counts.get(status, 0) + n
+    return {
+        "elapsed_s": elapsed,
+        "total": stats([v for values in latencies.values() for v in values], all_counts),
+        "paths": {path: stats(latencies[path], statuses[path]) for path in latencies},
+    }
+
+async def drive(
+    client: httpx.AsyncClient,
+    paths: List[str],
+    concurrency: int,
+    requests: Optional[int] = None,
+    duration: Optional[float] = None,
+    conditional: bool = False
+) -> Dict[str, Any]:
+    """
+    Send requests from concurrency tasks, cycling through paths, until the
+    request count or the duration runs out. Status 0 records a transport
+    error. With conditional, each task revalidates with the ETag it last saw.
+    """
+    latencies: Dict[str, List[float]] = {path: [] for path in paths}
+    statuses: Dict[str, Dict[int, int]] = {path: {} for path in paths}
+    remaining = [requests if requests is not None else float("inf")]
+    deadline = time.perf_counter() + duration if duration else float("inf")
+
+    async def worker(offset: int) -> None:
+        etags: Dict[str, str] = {}
+        i = offset
+        while remaining[0] > 0 and time.perf_counter() < deadline:
+            remaining[0] -= 1
+            path = paths[i % len(paths)]
+            i += 1
+            headers = {"If-None-Match": etags[path]} if conditional and path in etags else {}
+            start = time.perf_counter()
+            try:
+                response = await client.get(path, headers=headers)
+                await response.aread()
+                status = response.status_code
+                if "etag" in response.headers:
+                    etags[path] = response.headers["etag"]
+            except httpx.HTTPError:
+                status = 0
+            latencies[path].append(time.perf_counter() - start)
+            statuses[path][status] = statuses[path].get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return summarize(latencies, statuses, time.perf_counter() - start)
+
+def run_in_process(db_path: str, **load) -> Dict[str, Any]:
+    """Drive the app through the ASGI transport against the seeded database"""
+    from app.db.session import create_db_engine, get_read_db
+    from app.main import app
+    from app.routers.macro import response_cache
+    from sqlalchemy.orm import sessionmaker
+
+    engine = create_db_engine(f"sqlite:///{db_path}", read_only=True)
+    ReadSession = sessionmaker(bind=engine)
+
+    def override_get_read_db():
+        db = ReadSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    response_cache.clear()
+
+    async def run() -> Dict[str, Any]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            return await drive(client, **load)
+
+    try:
+        report = asyncio.run(run())
+    finally:
+        app.dependency_overrides.pop(get_read_db, None)
+        engine.dispose()
+    report["memory"] = {"in-process": rss_kib(os.getpid())}
+    return report
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_until_up(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not come up within {timeout:.0f}s")
+
+def run_against_server(url: str, server_pid: Optional[int] = None, **load) -> Dict[str, Any]:
+    """Drive a running server; with its pid, sample every worker's memory"""
+    concurrency = load["concurrency"]
+
+    async def run() -> Dict[str, Any]:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+            return await drive(client, **load)
+
+    report = asyncio.run(run())
+    if server_pid is not None:
+        workers = child_pids(server_pid) or [server_pid]
+        report["memory"] = {str(pid): rss_kib(pid) for pid in workers}
+    return report
+
+def run_with_workers(db_path: str, workers: int, **load) -> Dict[str, Any]:
+    """Start uvicorn with workers processes on the seeded database and drive it"""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    env = dict(
+        os.environ,
+        BLS_DB_PATH=db_path,
+        BLS_DATABASE_URL=f"sqlite:///{db_path}",
+        BLS_DATABASE_READ_URL=f"sqlite:///{db_path}",
+        SENTIMENT_CACHE_PATH="",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    try:
+        wait_until_up(url)
+        return run_against_server(url, server.pid, **load)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [f"{'path':<32} {'requests':>9} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}"]
+    rows = list(report["paths"].items()) + [("total", report["total"])]
+    for path, stats in rows:
+        lines.append(
+            f"{path:<32} {stats['requests']:>9} {stats['rps']:>9.1f} {stats.get('p50_ms', 0):>8.2f} "
+            f"{stats.get('p95_ms', 0):>8.2f} {stats.get('p99_ms', 0):>8.2f} {stats['errors']:>7}"
+        )
+    for worker, memory in report.get("memory", {}).items():
+        lines.append(
+            f"memory {worker}: rss {memory.get('rss_kib', 0) / 1024:.1f} MiB, "
+            f"peak {memory.get('peak_rss_kib', 0) / 1024:.1f} MiB"
+        )
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="drive a running server instead of starting one")
+    parser.add_argument("--workers", type=int, default=0, help="uvicorn workers to start; 0 runs the app in-process")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000, help="total requests (ignored with --duration)")
+    parser.add_argument("--duration", type=float, help="run for this many seconds instead")
+    parser.add_argument("--paths", default=",".join(DEFAULT_PATHS))
+    parser.add_argument("--conditional", action="store_true", help="revalidate with If-None-Match like a browser")
+    parser.add_argument("--series", type=int, default=500, help="synthetic series to seed")
+    parser.add_argument("--years", type=int, default=20, help="years of monthly history per series")
+    parser.add_argument("--json", metavar="PATH", help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    load = {
+        "paths": args.paths.split(","),
+        "concurrency": args.concurrency,
+        "requests": None if args.duration else args.requests,
+        "duration": args.duration,
+        "conditional": args.conditional,
+    }
+
+    if args.url:
+        report = run_against_server(args.url.rstrip("/"), **load)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "bls.db")
+            seed_bls_database(db_path, args.series, args.years)
+            if args.workers:
+                report = run_with_workers(db_path, args.workers, **load)
+            else:
+                report = run_in_process(db_path, **load)
+    report["config"] = {k: v for k, v in vars(args).items() if k != "json"}
+
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
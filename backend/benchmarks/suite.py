@@ -0,0 +1,230 @@
+"""
+Offline size sweep over the compute hot paths, with a machine-readable
+baseline to catch regressions.
+
+    python -m benchmarks.suite                                  # print timings
+    python -m benchmarks.suite --save benchmarks/baseline.json  # record a baseline
+    python -m benchmarks.suite --compare benchmarks/baseline.json
+
+--compare exits non-zero when a case is slower than the baseline by more
+than --tolerance. Baselines are only comparable on the machine that
+recorded them.
+"""
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from datetime import date, datetime, timedelta
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from textblob.exceptions import MissingCorpusError
+
+from benchmarks.synthetic import (
+    SyntheticDownloader, make_bls_payload, make_posts, make_transcript, seed_bls_database
+)
+
+SCALES = (1, 10, 100)
+DEFAULT_TOLERANCE = 1.5
+# Large sizes stop repeating once they have used this much time
+TIME_BUDGET_SECONDS = 2.0
+
+# A case's setup takes the scale and a scratch directory and returns the
+# timed callable and the size it works on
+Setup = Callable[[int, str], Tuple[Callable[[], Any], int]]
+
+def setup_process_bls_data(scale: int, tmp: str):
+    from app.services.bls import process_bls_data
+
+    payload = make_bls_payload(10 * scale, 10)
+    def run():
+        for series in payload:
+            process_bls_data(series["data"], series["seriesID"])
+    return run, sum(len(series["data"]) for series in payload)
+
+def setup_get_indicators_matrix(scale: int, tmp: str):
+    from app.crud.bls import get_indicators_matrix
+
+    db_path = os.path.join(tmp, "bls.db")
+    seed_bls_database(db_path, 100 * scale, 2)
+    db = sessionmaker(bind=create_engine(f"sqlite:///{db_path}"))()
+    return lambda: get_indicators_matrix(db), 100 * scale
+
+def setup_calculate_reaction(scale: int, tmp: str):
+    from app.services.market_reaction import MarketReactionService
+    from app.services.price_store import PriceStore
+
+    downloader = SyntheticDownloader()
+    days = 250 * scale
+    end = pd.Timestamp("2024-01-01")
+    start = end - pd.offsets.BDay(days)
+    data = downloader(["SPY"], start, end)["SPY"]
+    event = data.index[len(data) // 2]
+    service = MarketReactionService(PriceStore(os.path.join(tmp, "prices.db"), downloader=downloader))
+    return lambda: service.calculate_reaction(data, event), len(data)
+
+def setup_get_historical_reactions(scale: int, tmp: str):
+    from app.services.market_reaction import MarketReactionService
+    from app.services.price_store import PriceStore
+
+    days_back = 365 * scale
+    service = MarketReactionService(PriceStore(os.path.join(tmp, "prices.db"), downloader=SyntheticDownloader()))
+    # Warm the store so only the scan is timed
+    service.get_assets_data(date.today() - timedelta(days=days_back), date.today())
+    return lambda: service.get_historical_reactions("CPI", days_back=days_back), days_back
+
+def setup_analyze_texts(scale: int, tmp: str):
+    from app.core.cache import TieredCache
+    from app.services.sentiment_service import SentimentService
+
+    service = SentimentService(cache=TieredCache(None, "bench_sentiment"))
+    texts = list(make_posts(100 * scale))
+    def run():
+        # Score every text; a warm cache would only time lookups
+        service.cache.clear()
+        service.analyze_texts(texts)
+    return run, len(texts)
+
+def setup_analyze_earnings_call(scale: int, tmp: str):
+    from app.core.cache import TieredCache
+    from app.services.sentiment_service import SentimentService
+
+    service = SentimentService(cache=TieredCache(None, "bench_sentiment"))
+    transcript = make_transcript(500 * scale)
+    def run():
+        service.cache.clear()
+        service.analyze_earnings_call(transcript)
+    return run, len(transcript.split())
+
+CASES: Dict[str, Setup] = {
+    "process_bls_data": setup_process_bls_data,
+    "get_indicators_matrix": setup_get_indicators_matrix,
+    "calculate_reaction": setup_calculate_reaction,
+    "get_historical_reactions": setup_get_historical_reactions,
+    "analyze_texts": setup_analyze_texts,
+    "analyze_earnings_call": setup_analyze_earnings_call,
+}
+
+def best_of(func: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+        if sum(timings) > TIME_BUDGET_SECONDS:
+            break
+    return min(timings)
+
+def run_case(name: str, scale: int, repeat: int) -> Dict[str, Any]:
+    """
+    Time one case at one scale. Cases whose dependencies are missing here
+    (e.g. NLTK corpora) are reported as skipped rather than failing the run.
+    """
+    from app.db.sqlite import close_connections
+
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            func, size = CASES[name](scale, tmp)
+            func()  # warm-up: imports, lazy loads, first-touch allocations
+            seconds = best_of(func, repeat)
+        except (LookupError, MissingCorpusError) as e:
+            return {"skipped": str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__}
+        finally:
+            close_connections()
+    return {"size": size, "seconds": seconds}
+
+def run_suite(
+    cases: Optional[Iterable[str]] = None,
+    scales: Iterable[int] = SCALES,
+    repeat: int = 3
+) -> Dict[str, Any]:
+    """
+    Run the sweep and return a baseline document
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    for name in cases or CASES:
+        results[name] = {f"{scale}x": run_case(name, scale, repeat) for scale in scales}
+    return {
+        "created": datetime.utcnow().isoformat(timespec="seconds"),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+        },
+        "repeat": repeat,
+        "results": results,
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    Get the cases slower than the baseline by more than tolerance.
+    Cases or scales missing or skipped on either side are not compared.
+    """
+    regressions = []
+    for name, scales in current["results"].items():
+        for scale, result in scales.items():
+            previous = baseline.get("results", {}).get(name, {}).get(scale, {})
+            if "seconds" not in result or "seconds" not in previous:
+                continue
+            ratio = result["seconds"] / previous["seconds"]
+            if ratio > tolerance:
+                regressions.append(
+                    f"{name} {scale}: {result['seconds'] * 1000:.2f} ms vs {previous['seconds'] * 1000:.2f} ms ({ratio:.2f}x)"
+                )
+    return regressions
+
+def format_results(document: Dict[str, Any]) -> str:
+    lines = [f"{'case':<26} {'scale':>6} {'size':>9} {'ms':>11}"]
+    for name, scales in document["results"].items():
+        for scale, result in scales.items():
+            if "seconds" in result:
+                lines.append(f"{name:<26} {scale:>6} {result['size']:>9} {result['seconds'] * 1000:>11.2f}")
+            else:
+                lines.append(f"{name:<26} {scale:>6} {'':>9} {'skipped':>11}  {result['skipped']}")
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", help="comma-separated case names", default=",".join(CASES))
+    parser.add_argument("--scales", help="comma-separated size multipliers", default=",".join(map(str, SCALES)))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", metavar="PATH", help="write the results as a baseline")
+    parser.add_argument("--compare", metavar="PATH", help="fail on regressions against a baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    unknown = set(args.cases.split(",")) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    document = run_suite(args.cases.split(","), [int(s) for s in args.scales.split(",")], args.repeat)
+    print(format_results(document))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(document, f, indent=2)
+            f.write("\n")
+        print(f"Saved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(document, json.load(f), args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regressions beyond {args.tolerance:.2f}x:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"No regressions beyond {args.tolerance:.2f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Synthetic data generators for the offline benchmarks
+"""
+from typing import Any, Dict, Iterator, List
+import random
+
+def make_bls_payload(n_series: int, n_years: int, end_year: int = 2024, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Build a Results.series payload shaped like the BLS API response,
+    newest observation first with the latest flag on the first point
+    """
+    rng = random.Random(seed)
+    series_list = []
+    for i in range(n_series):
+        value = rng.uniform(50, 500)
+        data = []
+        for year in range(end_year - n_years + 1, end_year + 1):
+            for month in range(1, 13):
+                value *= 1 + rng.gauss(0.002, 0.01)
+                data.append({
+                    "year": str(year),
+                    "period": f"M{month:02d}",
+                    "periodName": "",
+                    "value": f"{value:.3f}",
+                    "latest": "false",
+                    "footnotes": [{}]
+                })
+        data.reverse()
+        data[0]["latest"] = "true"
+        series_list.append({"seriesID": f"SYN{i:05d}", "data": data})
+    return series_list
+
+def seed_bls_database(db_path: str, n_series: int, n_years: int, end_year: int = 2024, seed: int = 0) -> None:
+    """
+    Fill a SQLite file with observations and materialized BLS tables
+    built from a synthetic payload, the same way ingestion stores them
+    """
+    import sqlite3
+    from app.services.bls import ensure_bls_schema, store_bls_payload
+
+    conn = sqlite3.connect(db_path)
+    try:
+        ensure_bls_schema(conn)
+        store_bls_payload(conn, make_bls_payload(n_series, n_years, end_year=end_year, seed=seed))
+    finally:
+        conn.close()
+
+class SyntheticDownloader:
+    """
+    Stand-in for yf.download(group_by="ticker") serving random-walk daily
+    bars on business days, so market benchmarks run offline
+    """
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+        self.calls = 0
+
+    def __call__(self, tickers, start, end, **kwargs):
+        import numpy as np
+        import pandas as pd
+
+        self.calls += 1
+        index = pd.bdate_range(start, pd.Timestamp(end) - pd.Timedelta(days=1), name="Date")
+        rng = np.random.default_rng(self.seed)
+        frames = {}
+        for ticker in tickers:
+            close = 100 * np.cumprod(1 + rng.normal(0.0003, 0.01, len(index)))
+            frames[ticker] = pd.DataFrame({
+                "Open": close, "High": close * 1.005, "Low": close * 0.995,
+                "Close": close, "Adj Close": close, "Volume": 1e6
+            }, index=index)
+        return pd.concat(frames, axis=1)
+
+TRANSCRIPT_SENTENCES = [
+    "Thank you, operator, and good afternoon everyone.",
+    "Total revenue grew {pct} percent year over year to {amount} billion dollars.",
+    "Our cloud business delivered record operating margin this quarter.",
+    "Gross margin declined {pct} basis points due to higher supply chain costs.",
+    "We remain cautious about consumer demand in the second half of the year.",
+    "Free cash flow was strong and we returned {amount} billion dollars to shareholders.",
+    "Operating expenses increased as we continued to invest in artificial intelligence.",
+    "Foreign exchange was a headwind of roughly {pct} percent to reported revenue.",
+    "We are raising our full year guidance for earnings per share.",
+    "Inventory levels in the channel normalized faster than we expected.",
+    "The weak macro environment weighed on advertising revenue in Europe.",
+    "Next question comes from the line of an analyst at a large bank.",
+]
+
+def make_transcript(n_words: int, seed: int = 0) -> str:
+    """
+    Build an earnings-call style transcript of roughly n_words words from
+    a fixed set of sentences, so topics repeat like they do in real calls
+    """
+    rng = random.Random(seed)
+    sentences, words = [], 0
+    while words < n_words:
+        sentence = rng.choice(TRANSCRIPT_SENTENCES).format(pct=rng.randint(1, 40), amount=rng.randint(1, 90))
+        sentences.append(sentence)
+        words += len(sentence.split())
+    return " ".join(sentences)
+
+def make_posts(n_posts: int, seed: int = 0) -> Iterator[str]:
+    """
+    Yield short social-media style posts built from the transcript
+    sentences, without holding the corpus in memory
+    """
+    rng = random.Random(seed)
+    for _ in range(n_posts):
+        sentence = rng.choice(TRANSCRIPT_SENTENCES).format(pct=rng.randint(1, 40), amount=rng.randint(1, 90))
+        yield f"${rng.choice(['AAPL', 'MSFT', 'NVDA', 'JPM', 'XOM'])} {sentence}"
@@ -0,0 +1,4 @@
+import os
+
+# Keep the sentiment score cache out of the app database during tests
+os.environ.setdefault("SENTIMENT_CACHE_PATH", "")
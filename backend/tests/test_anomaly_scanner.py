@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from app.services.market_reaction import daily_returns, scan_anomalies
+
+
+def make_prices(n_days=300, n_assets=4, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2022-01-03", periods=n_days)
+    returns = rng.normal(0, 0.005, (n_days, n_assets))
+    return pd.DataFrame(100 * np.cumprod(1 + returns, axis=0), index=index, columns=[f"A{i}" for i in range(n_assets)])
+
+
+def test_planted_move_is_flagged_for_each_window():
+    prices = make_prices()
+    prices.iloc[200:, 2] *= 1.08
+    flagged = scan_anomalies(prices, windows=(20, 60), threshold=4.0)
+
+    hits = (flagged["asset"] == "A2") & (flagged["date"] == prices.index[200])
+    assert sorted(flagged["window"][hits]) == [20, 60]
+    assert np.all(flagged["change"][hits] > 7)
+    assert np.all(flagged["zscore"][hits] > 4)
+    # Columns stay aligned and ordered by date
+    assert len({len(values) for values in flagged.values()}) == 1
+    assert np.all(np.diff(flagged["date"].astype("int64")) >= 0)
+
+
+def test_returns_skip_days_an_asset_did_not_trade():
+    prices = pd.DataFrame(
+        {"a": [100.0, np.nan, 110.0], "b": [10.0, 11.0, 11.0]},
+        index=pd.bdate_range("2024-01-01", periods=3)
+    )
+    returns = daily_returns(prices)
+
+    assert np.isnan(returns["a"].iloc[1])
+    assert abs(returns["a"].iloc[2] - 0.1) < 1e-12
+    assert abs(returns["b"].iloc[1] - 0.1) < 1e-12
+
+
+def test_empty_matrix_scans_to_empty_columns():
+    flagged = scan_anomalies(pd.DataFrame(), windows=(20,))
+    assert all(len(values) == 0 for values in flagged.values())
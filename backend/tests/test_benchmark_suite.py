@@ -0,0 +1,38 @@
+import json
+
+from benchmarks import suite
+
+
+def document(results):
+    return {"results": results}
+
+
+def test_compare_flags_only_slowdowns_beyond_tolerance():
+    baseline = document({
+        "calculate_reaction": {"1x": {"size": 250, "seconds": 0.010}, "10x": {"size": 2500, "seconds": 0.020}},
+        "analyze_texts": {"1x": {"skipped": "missing corpora"}},
+    })
+    current = document({
+        "calculate_reaction": {"1x": {"size": 250, "seconds": 0.012}, "10x": {"size": 2500, "seconds": 0.050}},
+        "analyze_texts": {"1x": {"size": 100, "seconds": 9.0}},
+        "process_bls_data": {"1x": {"size": 1200, "seconds": 1.0}},
+    })
+
+    regressions = suite.compare(current, baseline, tolerance=1.5)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("calculate_reaction 10x")
+
+
+def test_sweep_saves_a_comparable_baseline(tmp_path):
+    path = tmp_path / "baseline.json"
+    assert suite.main(["--cases", "calculate_reaction", "--scales", "1,10", "--repeat", "1", "--save", str(path)]) == 0
+
+    saved = json.loads(path.read_text())
+    results = saved["results"]["calculate_reaction"]
+    assert list(results) == ["1x", "10x"]
+    assert results["10x"]["size"] == 10 * results["1x"]["size"]
+    assert saved["machine"]["cpu_count"]
+
+    # The same run compared with itself at a generous tolerance passes
+    assert suite.main(["--cases", "calculate_reaction", "--scales", "1", "--repeat", "1",
+                       "--compare", str(path), "--tolerance", "100"]) == 0
@@ -0,0 +1,109 @@
+import sqlite3
+
+import pytest
+
+from app.db.sqlite import close_connections
+from app.services import bls
+
+CPI = "CUSR0000SA0"
+
+
+def make_series(series_id, start_year, end_year, last_month=12, base=100.0):
+    """Build a BLS API series payload, newest observation first like the real API"""
+    data = []
+    value = base
+    for year in range(start_year, end_year + 1):
+        months = last_month if year == end_year else 12
+        for month in range(1, months + 1):
+            value += 1.0
+            data.append({"year": str(year), "period": f"M{month:02d}", "value": str(value), "latest": "false"})
+    data.reverse()
+    data[0]["latest"] = "true"
+    return {"seriesID": series_id, "data": data}
+
+
+@pytest.fixture(autouse=True)
+def shared_connections():
+    yield
+    close_connections()
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    """Serve payloads from an in-memory history and record each call"""
+    calls = []
+    history = {CPI: make_series(CPI, 2020, 2023, last_month=6)}
+
+    def fetch(series_ids, start_year, end_year):
+        calls.append((list(series_ids), start_year, end_year))
+        series = []
+        for series_id in series_ids:
+            data = [p for p in history[series_id]["data"] if int(start_year) <= int(p["year"]) <= int(end_year)]
+            series.append({"seriesID": series_id, "data": data})
+        return {"Results": {"series": series}}
+
+    monkeypatch.setattr(bls, "fetch_bls_data", fetch)
+    return history, calls
+
+
+def test_full_then_incremental_refresh(tmp_path, fake_api):
+    history, calls = fake_api
+    db_path = str(tmp_path / "bls.db")
+
+    written = bls.ingest_bls_data([CPI], "2020", "2023", db_path=db_path)
+    assert written == 3 * 12 + 6
+    assert calls[-1] == ([CPI], "2020", "2023")
+
+    # A new month only refetches the last stored year; MoM/YoY bases are local
+    history[CPI] = make_series(CPI, 2020, 2023, last_month=7)
+    history[CPI]["data"][0]["value"] = "150.0"
+    written = bls.ingest_bls_data([CPI], "2020", "2023", db_path=db_path)
+    assert calls[-1] == ([CPI], "2023", "2023")
+    assert written == 1
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT year, M07 FROM bls_combined_data ORDER BY year").fetchall()
+    state = bls.get_ingestion_state(conn)
+    conn.close()
+
+    assert [year for year, _ in rows] == [2020, 2021, 2022, 2023]
+    assert rows[-1][1] is not None
+    assert state[CPI] == (2020, 2023, "M07")
+
+
+def test_refresh_without_new_data_writes_nothing(tmp_path, fake_api):
+    db_path = str(tmp_path / "bls.db")
+    bls.ingest_bls_data([CPI], "2020", "2023", db_path=db_path)
+
+    written = bls.ingest_bls_data([CPI], "2020", "2023", db_path=db_path)
+    assert written == 0
+
+
+def test_legacy_table_is_upgraded(tmp_path, fake_api):
+    db_path = str(tmp_path / "bls.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE bls_combined_data (series TEXT, year TEXT, M01 REAL, yoy_change REAL)')
+    conn.execute("INSERT INTO bls_combined_data VALUES ('Consumer Price Index', '2020', 1.0, NULL)")
+    conn.execute("INSERT INTO bls_combined_data VALUES ('Consumer Price Index', '2020', 1.0, NULL)")
+    conn.commit()
+    conn.close()
+
+    bls.ingest_bls_data([CPI], "2020", "2023", db_path=db_path)
+
+    conn = sqlite3.connect(db_path)
+    count = conn.execute("SELECT COUNT(*) FROM bls_combined_data WHERE year = 2020").fetchone()[0]
+    conn.close()
+    assert count == 1
+
+
+def test_refresh_stops_before_exceeding_daily_quota(tmp_path, fake_api):
+    _, calls = fake_api
+    db_path = str(tmp_path / "bls.db")
+    conn = sqlite3.connect(db_path)
+    bls.ensure_bls_schema(conn)
+    bls.record_queries(conn, 25)
+    conn.close()
+
+    with pytest.raises(bls.BLSError):
+        bls.ingest_bls_data([CPI], "2020", "2023", db_path=db_path)
+    assert calls == []
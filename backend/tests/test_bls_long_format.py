@@ -0,0 +1,166 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import bls as crud
+from app.db.sqlite import close_connections
+from app.services import bls
+
+
+def point(year, period, value, latest=False, footnotes=None):
+    return {
+        "year": str(year), "period": period, "value": str(value),
+        "latest": "true" if latest else "false", "footnotes": footnotes or [{}]
+    }
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "bls.db"))
+    bls.ensure_bls_schema(conn)
+    yield conn
+    conn.close()
+    close_connections()
+
+
+def monthly(series_id, start_year, end_year, base=100.0):
+    data = []
+    for year in range(start_year, end_year + 1):
+        for month in range(1, 13):
+            data.append(point(year, f"M{month:02d}", base + (year - start_year) * 12 + month))
+    data.append(point(end_year, "M13", base))  # annual averages are not stored
+    return {"seriesID": series_id, "data": data}
+
+
+def test_observations_are_stored_long(conn):
+    written = bls.store_bls_payload(conn, [monthly("CUSR0000SA0", 2022, 2023)])
+
+    assert written == 24
+    assert bls.get_ingestion_state(conn) == {"CUSR0000SA0": (2022, 2023, "M12")}
+    assert conn.execute("SELECT COUNT(*) FROM bls_combined_data").fetchone()[0] == 2
+
+
+def test_revisions_are_tracked(conn):
+    bls.store_bls_payload(conn, [monthly("CUSR0000SA0", 2022, 2023)])
+
+    revised = {"seriesID": "CUSR0000SA0", "data": [
+        point(2023, "M11", 999.0),
+        point(2023, "M12", 124.0, latest=True, footnotes=[{"code": "P", "text": "preliminary"}]),
+    ]}
+    written = bls.store_bls_payload(conn, [revised])
+
+    assert written == 2
+    rows = conn.execute(
+        "SELECT month, value, is_revised, is_preliminary, footnotes FROM time_series_points "
+        "WHERE year = 2023 AND month IN (11, 12) ORDER BY month"
+    ).fetchall()
+    assert rows == [(11, 999.0, 1, 0, None), (12, 124.0, 0, 1, "preliminary")]
+    revision = conn.execute("SELECT previous_value, new_value FROM indicator_revisions").fetchall()
+    assert revision == [(123.0, 999.0)]
+
+    # The materialized view picks up the revision from the local base
+    m12 = conn.execute("SELECT M12 FROM bls_combined_data WHERE year = 2023").fetchone()[0]
+    assert m12 == pytest.approx(round(124.0 / 999.0 - 1, 3) * 100)
+
+
+def test_quarterly_periods_map_to_closing_month(conn):
+    data = [point(2023, f"Q0{q}", 100 + q) for q in range(1, 5)] + [point(2023, "Q05", 102.5)]
+    bls.store_bls_payload(conn, [{"seriesID": "CIS1010000000000Q", "data": data}])
+
+    months = [row[0] for row in conn.execute("SELECT month FROM time_series_points ORDER BY month")]
+    assert months == [3, 6, 9, 12]
+    assert bls.get_ingestion_state(conn)["CIS1010000000000Q"] == (2023, 2023, "Q04")
+
+
+def test_range_across_year_boundary_is_one_index_seek(conn, tmp_path):
+    bls.store_bls_payload(conn, [monthly("CUSR0000SA0", 2000, 2024), monthly("LNS14000000", 2000, 2024)])
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'bls.db'}")
+    db = sessionmaker(bind=engine)()
+    try:
+        points = crud.get_series_points(db, "CUSR0000SA0", start=(2022, 11), end=(2023, 2))
+        assert [(p["year"], p["month"]) for p in points] == [(2022, 11), (2022, 12), (2023, 1), (2023, 2)]
+
+        query, params = crud._series_points_query("CUSR0000SA0", (2022, 11), (2023, 2))
+        plan = db.execute(text(f"EXPLAIN QUERY PLAN {query.text}"), params).fetchall()
+        detail = " ".join(row[-1] for row in plan)
+        assert "idx_indicator_time" in detail
+        assert "SCAN" not in detail
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def test_migration_backfills_levels_for_wide_history(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "bls.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE bls_combined_data (series TEXT, year TEXT, M01 REAL, yoy_change REAL)")
+    conn.execute("INSERT INTO bls_combined_data VALUES ('Consumer Price Index', '2021', 0.1, NULL)")
+    conn.commit()
+    conn.close()
+
+    calls = []
+
+    def fetch(series_ids, start_year, end_year):
+        calls.append((series_ids, start_year, end_year))
+        return {"Results": {"series": [monthly(series_ids[0], int(start_year), int(end_year))]}}
+
+    monkeypatch.setattr(bls, "fetch_bls_data", fetch)
+    try:
+        written = bls.migrate_to_long_format(db_path=db_path, end_year="2023")
+    finally:
+        close_connections()
+
+    assert calls == [(["CUSR0000SA0"], "2021", "2023")]
+    assert written == 36
+
+
+def test_unavailable_observations_are_skipped(conn):
+    payload = monthly("CUSR0000SA0", 2025, 2025)
+    # BLS publishes "-" for months it couldn't collect, e.g. during a shutdown
+    payload["data"][9]["value"] = "-"
+    other = monthly("LNS14000000", 2025, 2025, base=4.0)
+
+    written = bls.store_bls_payload(conn, [payload, other])
+
+    assert written == 23
+    months = [m for (m,) in conn.execute(
+        "SELECT month FROM time_series_points p JOIN indicators i ON i.id = p.indicator_id "
+        "WHERE i.series_id = 'CUSR0000SA0' ORDER BY month"
+    )]
+    assert 10 not in months and len(months) == 11
+
+
+def test_incremental_refresh_matches_full_ingest(tmp_path):
+    def through(series_id, last_month):
+        data = [
+            point(year, f"M{month:02d}", 100.0 + year % 7 + month * (1 + year % 3) / 10)
+            for year in range(2021, 2025) for month in range(1, 13)
+            if year < 2024 or month <= last_month
+        ]
+        data[-1]["latest"] = "true"
+        return {"seriesID": series_id, "data": data}
+
+    def contents(conn):
+        return {
+            table: sorted(conn.execute(f"SELECT * FROM {table}").fetchall(), key=repr)
+            for table in ("bls_combined_data", "bls_summary_data")
+        }
+
+    incremental = sqlite3.connect(str(tmp_path / "incremental.db"))
+    bls.ensure_bls_schema(incremental)
+    bls.store_bls_payload(incremental, [through("CUSR0000SA0", 3)])
+    # A refresh fetches the current year only, as ingest_bls_data plans it
+    latest = through("CUSR0000SA0", 4)
+    latest["data"] = [p for p in latest["data"] if p["year"] == "2024"]
+    bls.store_bls_payload(incremental, [latest])
+
+    full = sqlite3.connect(str(tmp_path / "full.db"))
+    bls.ensure_bls_schema(full)
+    bls.store_bls_payload(full, [through("CUSR0000SA0", 4)])
+
+    assert contents(incremental) == contents(full)
+    incremental.close()
+    full.close()
@@ -0,0 +1,48 @@
+from app.db.ranges import merge_ranges, subtract_ranges
+from app.services.bls_planner import BLSRequestPlanner
+
+
+def test_merge_ranges_joins_adjacent_and_overlapping():
+    assert merge_ranges([(2015, 2016), (2010, 2012), (2013, 2014), (2020, 2021)]) == [(2010, 2016), (2020, 2021)]
+
+
+def test_subtract_ranges():
+    assert subtract_ranges((2000, 2024), [(2005, 2009), (2010, 2019)]) == [(2000, 2004), (2020, 2024)]
+    assert subtract_ranges((2000, 2024), [(1990, 2030)]) == []
+
+
+def test_plan_respects_series_limit():
+    planner = BLSRequestPlanner("v1")
+    series_ids = [f"S{i:03d}" for i in range(60)]
+
+    plan = planner.plan(series_ids, 2023, 2024)
+
+    assert len(plan) == 3
+    assert all(len(request["series_ids"]) <= planner.max_series for request in plan)
+    assert sorted(s for request in plan for s in request["series_ids"]) == series_ids
+
+
+def test_plan_respects_year_limit():
+    planner = BLSRequestPlanner("v1")
+
+    plan = planner.plan(["A", "B"], 2000, 2024)
+
+    assert [(r["start_year"], r["end_year"]) for r in plan] == [
+        ("2000", "2004"), ("2005", "2014"), ("2015", "2024")
+    ]
+    assert all(r["series_ids"] == ["A", "B"] for r in plan)
+
+
+def test_plan_skips_stored_years_and_packs_shared_windows():
+    planner = BLSRequestPlanner("v1")
+    stored = {"A": [(2000, 2022)], "B": [(2000, 2023)]}
+
+    plan = planner.plan(["A", "B", "C"], 2020, 2024, stored=stored, lookback_years=1)
+
+    assert plan == [{"series_ids": ["C", "A", "B"], "start_year": "2020", "end_year": "2024"}]
+
+
+def test_plan_is_empty_when_everything_is_stored():
+    planner = BLSRequestPlanner("v2")
+
+    assert planner.plan(["A"], 2020, 2024, stored={"A": [(2010, 2024)]}) == []
@@ -0,0 +1,63 @@
+import math
+
+import pytest
+
+from app.services.bls import process_bls_payload, process_bls_data
+
+
+def series(series_id, values_by_period, latest):
+    data = [
+        {"year": year, "period": period, "value": str(value), "latest": "true" if (year, period) == latest else "false"}
+        for (year, period), value in values_by_period.items()
+    ]
+    return {"seriesID": series_id, "data": data}
+
+
+@pytest.fixture
+def payload():
+    cpi = series("CUSR0000SA0", {
+        ("2023", "M01"): 100.0, ("2023", "M02"): 101.0,
+        ("2024", "M01"): 102.0, ("2024", "M02"): 104.0,
+    }, latest=("2024", "M02"))
+    unemployment = series("LNS14000000", {
+        ("2023", "M01"): 4.0, ("2024", "M01"): 5.0,
+    }, latest=("2024", "M01"))
+    return [cpi, unemployment]
+
+
+def test_combined_has_mom_by_month_and_yoy(payload):
+    combined, _ = process_bls_payload(payload)
+
+    assert list(combined.columns) == ["series", "year", "M01", "M02", "yoy_change"]
+    cpi = combined[combined["series"] == "Consumer Price Index"].set_index("year")
+    assert cpi.loc["2023", "M02"] == pytest.approx(1.0)
+    assert cpi.loc["2024", "M01"] == pytest.approx(1.0)
+    assert cpi.loc["2024", "M02"] == pytest.approx(2.0)
+    # YoY is measured on the latest month, M02
+    assert math.isnan(cpi.loc["2023", "yoy_change"])
+    assert cpi.loc["2024", "yoy_change"] == pytest.approx(3.0)
+
+
+def test_summary_has_one_row_per_series(payload):
+    _, summary = process_bls_payload(payload)
+
+    summary = summary.set_index("series name")
+    assert list(summary.index) == ["Consumer Price Index", "Unemployment Rate"]
+    assert summary.loc["Consumer Price Index", "latest_mom_chg"] == pytest.approx(2.0)
+    assert summary.loc["Consumer Price Index", "latest_yoy_chg"] == pytest.approx(3.0)
+    assert summary.loc["Unemployment Rate", "latest_yoy_chg"] == pytest.approx(25.0)
+
+
+def test_unknown_series_keep_their_id(payload):
+    payload[0]["seriesID"] = "NOTMAPPED"
+    combined, summary = process_bls_data(payload[0]["data"], "NOTMAPPED")
+
+    assert set(combined["series"]) == {"NOTMAPPED"}
+    assert list(summary["series name"]) == ["NOTMAPPED"]
+
+
+def test_empty_payload():
+    combined, summary = process_bls_payload([])
+
+    assert combined.empty
+    assert summary.empty
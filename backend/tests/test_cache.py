@@ -0,0 +1,47 @@
+import pytest
+
+from app.core.cache import TieredCache
+from app.db.sqlite import close_connections
+
+
+@pytest.fixture(autouse=True)
+def shared_connections():
+    yield
+    close_connections()
+
+
+def test_memory_tier_is_lru():
+    cache = TieredCache(None, "scores", max_memory_items=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["memory_items"] == 2
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    cache = TieredCache(db_path, "scores")
+    cache.set("headline", {"combined_score": 0.5})
+    cache.flush()
+
+    fresh = TieredCache(db_path, "scores")
+    assert fresh.get("headline") == {"combined_score": 0.5}
+    assert fresh.get("headline") == {"combined_score": 0.5}
+    stats = fresh.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 0)
+    assert stats["hit_rate"] == 1.0
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = TieredCache(str(tmp_path / "cache.db"), "scores", max_memory_items=1, max_disk_items=10, write_batch_size=1)
+    for i in range(30):
+        cache.set(f"key{i}", i)
+    cache.flush()
+
+    assert cache.stats()["disk_items"] <= 10
+    assert cache.get("key29") == 29
+    assert cache.get("key0") is None
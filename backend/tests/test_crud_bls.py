@@ -0,0 +1,80 @@
+import json
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import bls as crud
+from app.services import bls
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "bls.db")
+    conn = sqlite3.connect(path)
+    bls.ensure_bls_schema(conn)
+    conn.executemany(
+        "INSERT INTO bls_combined_data (series, year, M01, M02, yoy_change) VALUES (?, ?, ?, ?, ?)",
+        [("Core CPI", year, 0.1 * year, None, 2.5) for year in range(2000, 2025)]
+    )
+    conn.commit()
+    conn.close()
+
+    engine = create_engine(f"sqlite:///{path}")
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_json_path_matches_records(db):
+    records = crud.get_matrix_data(db)
+    encoded = crud.query_to_json(db, "SELECT * FROM bls_combined_data", batch_size=7)
+
+    assert len(records) == 25
+    assert records[0]["M02"] is None
+    assert json.loads(encoded) == records
+
+
+def test_json_path_on_empty_table(db):
+    assert crud.get_indicators_json(db) == b"[]"
+    assert crud.get_indicators_matrix(db) == []
+
+
+def test_matrix_page_filters_projects_and_pages(db):
+    rows, cursor = crud.get_matrix_page(db, series=["Core CPI"], start_year=2010, end_year=2014, months=["M02"], limit=3)
+
+    assert [row["year"] for row in rows] == [2010, 2011, 2012]
+    assert list(rows[0]) == ["series", "year", "M02", "yoy_change"]
+
+    rows, cursor = crud.get_matrix_page(db, series=["Core CPI"], start_year=2010, end_year=2014, months=["M02"], cursor=cursor, limit=3)
+    assert [row["year"] for row in rows] == [2013, 2014]
+    assert cursor is None
+
+
+def test_matrix_page_rejects_unknown_columns(db):
+    with pytest.raises(ValueError):
+        crud.get_matrix_page(db, months=["M01; DROP TABLE bls_combined_data"])
+
+
+def test_matrix_page_query_seeks_the_series_year_index(db):
+    plan = db.execute(text(
+        "EXPLAIN QUERY PLAN SELECT series, year FROM bls_combined_data "
+        "WHERE series IN ('Core CPI') AND year >= 2010 AND (series, year) > ('Core CPI', 2011) "
+        "ORDER BY series, year"
+    )).fetchall()
+
+    detail = " ".join(row[-1] for row in plan)
+    assert "uq_bls_combined_series_year" in detail
+    assert "TEMP B-TREE" not in detail
+
+
+def test_data_version_without_table_on_server_database():
+    class MissingTableSession:
+        """Postgres reports a missing table as ProgrammingError, not OperationalError"""
+        def execute(self, statement):
+            raise ProgrammingError(str(statement), {}, Exception('relation "bls_data_version" does not exist'))
+
+    assert crud.get_data_version(MissingTableSession()) == (0, None)
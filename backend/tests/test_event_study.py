@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.market_reaction import MarketReactionService, close_matrix, event_study
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range("2023-01-02", "2023-12-29")
+    matrix = pd.DataFrame(
+        100 * np.cumprod(1 + rng.normal(0, 0.01, (len(index), 3)), axis=0),
+        index=index,
+        columns=["stocks", "gold", "dollar"]
+    )
+    # Assets trade on different calendars
+    matrix.iloc[10:15, 1] = np.nan
+    matrix.iloc[40, 0] = np.nan
+    return matrix
+
+
+def test_event_study_matches_per_event_reaction(prices):
+    events = pd.to_datetime(["2023-01-02", "2023-01-17", "2023-02-28", "2023-03-04", "2023-12-29"])
+    result = event_study(events, prices, window_days=5)
+    service = MarketReactionService.__new__(MarketReactionService)
+
+    for event in events:
+        for asset in prices.columns:
+            window = prices.loc[event - pd.Timedelta(days=5):event + pd.Timedelta(days=5), [asset]].dropna()
+            expected = service.calculate_reaction(window.rename(columns={asset: "Close"}), event)
+            for field, value in expected.items():
+                actual = result[field].loc[event, asset]
+                if value is None or pd.isna(value):
+                    assert np.isnan(actual), (field, event, asset)
+                else:
+                    assert actual == pytest.approx(value), (field, event, asset)
+
+
+def test_close_matrix_aligns_assets():
+    a = pd.DataFrame({"Close": [1.0, 2.0]}, index=pd.to_datetime(["2024-01-02", "2024-01-03"]))
+    b = pd.DataFrame({"Close": [5.0]}, index=pd.to_datetime(["2024-01-03"]))
+    matrix = close_matrix({"a": a, "b": b, "c": pd.DataFrame()})
+
+    assert list(matrix.columns) == ["a", "b", "c"]
+    assert np.isnan(matrix.loc["2024-01-02", "b"])
+    assert matrix["c"].isna().all()
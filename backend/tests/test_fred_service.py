@@ -0,0 +1,126 @@
+import threading
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from app.core.ratelimit import TokenBucket
+from app.db.sqlite import close_connections
+from app.services.fred_service import FREDObservationCache, FREDService
+
+
+class FakeFred:
+    """Serve a monthly series dated on the first of each month, like FRED"""
+    def __init__(self, months):
+        today = date.today()
+        first = date(today.year, today.month, 1)
+        dates = []
+        for _ in range(months):
+            dates.append(first)
+            first = (first - timedelta(days=1)).replace(day=1)
+        self.history = pd.Series(range(len(dates), 0, -1), index=pd.DatetimeIndex(dates), dtype="float64").sort_index()
+        self.calls = []
+        self.failing = set()
+        self.delay = 0.0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def get_series(self, series_id, observation_start=None, observation_end=None):
+        with self._lock:
+            self.calls.append((series_id, observation_start, observation_end))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        if series_id in self.failing:
+            raise ValueError(f"Bad Request. The series does not exist: {series_id}")
+        start, end = pd.Timestamp(observation_start), pd.Timestamp(observation_end)
+        return self.history[(self.history.index >= start) & (self.history.index <= end)]
+
+
+@pytest.fixture(autouse=True)
+def shared_connections():
+    yield
+    close_connections()
+
+
+@pytest.fixture
+def service(tmp_path):
+    fred = FakeFred(months=36)
+    return FREDService(
+        fred=fred,
+        cache=FREDObservationCache(str(tmp_path / "fred.db")),
+        rate_limiter=TokenBucket(rate=1000.0, capacity=100)
+    )
+
+
+def test_indicator_data_uses_one_cached_series(service):
+    data = service.get_indicator_data("CPIAUCSL", "CPI", "inflation")
+
+    assert data["value"] == 36.0
+    assert data["previous_value"] == 35.0
+    assert len(service.fred.calls) == 1
+
+
+def test_refresh_fetches_only_after_newest_observation(service):
+    service.refresh(["CPIAUCSL"], revision_lookback=0)
+    newest = service.cache.last_observation_date("CPIAUCSL")
+
+    calls = service.refresh(["CPIAUCSL"], revision_lookback=0)
+    _, start, end = service.fred.calls[-1]
+    assert calls == {"CPIAUCSL": 1}
+    assert start == newest + timedelta(days=1)
+    assert end == date.today()
+
+
+def test_refresh_picks_up_revisions_to_recent_observations(service):
+    service.refresh(["PAYEMS"])
+    history = service.fred.history
+    revised = history.index[-2]
+    history[revised] = 99.0
+
+    calls = service.refresh(["PAYEMS"], revision_lookback=3)
+    _, start, _ = service.fred.calls[-1]
+    assert calls == {"PAYEMS": 1}
+    assert start == history.index[-3].date()
+    assert service.cache.get_observations("PAYEMS")[revised] == 99.0
+
+
+def test_missing_ranges_skip_fetched_history(service):
+    today = date.today()
+    service.get_series("CPIAUCSL", days_back=365)
+
+    missing = service.cache.missing_ranges("CPIAUCSL", today - timedelta(days=730), today)
+    assert missing[0] == (today - timedelta(days=730), today - timedelta(days=366))
+    assert missing[-1][0] == service.cache.last_observation_date("CPIAUCSL") + timedelta(days=1)
+
+
+def test_get_indicators_runs_concurrently_and_reports_errors(service):
+    service.fred.delay = 0.05
+    service.fred.failing = {"BADSERIES"}
+    series_map = {f"S{i}": f"SERIES{i}" for i in range(6)}
+    series_map["Broken"] = "BADSERIES"
+
+    result = service.get_indicators(series_map, max_workers=4)
+
+    assert sorted(result["indicators"]) == sorted(f"S{i}" for i in range(6))
+    assert "does not exist" in result["errors"]["Broken"]
+    assert 1 < service.fred.peak <= 4
+
+
+def test_token_bucket_waits_for_refill():
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=lambda: now[0], sleep=sleep)
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    assert not bucket.try_acquire()
+    assert bucket.acquire() == pytest.approx(0.5)
@@ -0,0 +1,129 @@
+from datetime import date
+
+import httpx
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import client as client_module
+from app.core.client import HTTPClient, request_with_retry
+from app.main import app
+from app.services import bls
+from app.services.fred_service import FREDClient
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    delays = []
+    monkeypatch.setattr(client_module.time, "sleep", delays.append)
+    return delays
+
+
+def flaky_transport(failures, status=503, headers=None):
+    """Fail the first requests with a status, then answer 200"""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) <= failures:
+            return httpx.Response(status, headers=headers or {})
+        return httpx.Response(200, json={"ok": True})
+    return handler, calls
+
+
+def test_retries_transient_statuses_with_backoff(no_sleep):
+    handler, calls = flaky_transport(2)
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        response = request_with_retry("GET", "https://example.test/", client=client, max_retries=3)
+    assert response.status_code == 200
+    assert len(calls) == 3
+    assert len(no_sleep) == 2 and no_sleep[1] > no_sleep[0]
+
+
+def test_honours_retry_after_and_gives_up(no_sleep):
+    handler, calls = flaky_transport(10, status=429, headers={"Retry-After": "7"})
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        response = request_with_retry("GET", "https://example.test/", client=client, max_retries=2)
+    assert response.status_code == 429
+    assert len(calls) == 3
+    assert no_sleep == [7.0, 7.0]
+
+
+def test_client_errors_are_not_retried():
+    handler, calls = flaky_transport(10, status=404)
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        response = request_with_retry("GET", "https://example.test/", client=client)
+    assert response.status_code == 404
+    assert len(calls) == 1
+
+
+def test_shared_clients_are_reused_until_closed():
+    try:
+        client = HTTPClient.get_client()
+        session = HTTPClient.get_session()
+        assert HTTPClient.get_client() is client
+        assert HTTPClient.get_session() is session
+    finally:
+        HTTPClient.close()
+    assert client.is_closed
+    assert HTTPClient.get_client() is not client
+    HTTPClient.close()
+
+
+def test_lifespan_opens_and_closes_shared_clients():
+    with TestClient(app):
+        client, session = HTTPClient.client, HTTPClient.session
+        assert client is not None and session is not None
+    assert client.is_closed
+    assert HTTPClient.client is None and HTTPClient.session is None
+
+
+def test_fred_client_parses_observations():
+    requests_seen = []
+
+    def handler(request):
+        requests_seen.append(request)
+        return httpx.Response(200, json={"observations": [
+            {"date": "2024-01-01", "value": "3.7"},
+            {"date": "2024-02-01", "value": "."},
+        ]})
+
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        series = FREDClient(api_key="key", client=client).get_series("UNRATE", date(2024, 1, 1), date(2024, 2, 29))
+
+    assert series.iloc[0] == 3.7 and series.isna().iloc[1]
+    assert list(series.index) == [pd.Timestamp("2024-01-01"), pd.Timestamp("2024-02-01")]
+    params = requests_seen[0].url.params
+    assert params["observation_start"] == "2024-01-01" and params["file_type"] == "json"
+
+
+def test_fred_client_raises_api_errors():
+    def handler(request):
+        return httpx.Response(400, json={"error_code": 400, "error_message": "Bad Request. The series does not exist."})
+
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        with pytest.raises(ValueError, match="does not exist"):
+            FREDClient(api_key="key", client=client).get_series("NOPE")
+
+
+def test_fred_client_reports_non_json_errors_by_status():
+    def handler(request):
+        return httpx.Response(502, text="<html>Bad Gateway</html>")
+
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        with pytest.raises(ValueError, match="FRED returned 502"):
+            FREDClient(api_key="key", client=client).get_series("UNRATE")
+
+
+def test_bls_fetch_maps_failures_to_bls_error(monkeypatch):
+    def handler(request):
+        return httpx.Response(200, json={"status": "REQUEST_NOT_PROCESSED", "message": ["daily threshold"]})
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(HTTPClient, "client", client)
+    try:
+        with pytest.raises(bls.BLSError, match="daily threshold"):
+            bls.fetch_bls_data(["CUSR0000SA0"], "2023", "2024")
+    finally:
+        HTTPClient.close()
+
@@ -0,0 +1,28 @@
+from benchmarks import loadtest
+from benchmarks.synthetic import seed_bls_database
+
+
+def test_in_process_run_reports_percentiles(tmp_path):
+    db_path = str(tmp_path / "bls.db")
+    seed_bls_database(db_path, 5, 2)
+
+    report = loadtest.run_in_process(
+        db_path, paths=loadtest.DEFAULT_PATHS, concurrency=4, requests=40, conditional=False
+    )
+
+    total = report["total"]
+    assert total["requests"] == 40 and total["errors"] == 0
+    assert total["p50_ms"] <= total["p95_ms"] <= total["p99_ms"] <= total["max_ms"]
+    assert total["statuses"] == {"200": 40}
+    assert set(report["paths"]) == set(loadtest.DEFAULT_PATHS)
+    assert report["memory"]["in-process"]["rss_kib"] > 0
+
+
+def test_conditional_requests_revalidate(tmp_path):
+    db_path = str(tmp_path / "bls.db")
+    seed_bls_database(db_path, 5, 2)
+
+    report = loadtest.run_in_process(
+        db_path, paths=["/api/v1/macro/bls/indicators"], concurrency=1, requests=5, conditional=True
+    )
+    assert report["total"]["statuses"] == {"200": 1, "304": 4}
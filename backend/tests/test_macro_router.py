@@ -0,0 +1,128 @@
+import json
+import os
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import bls as crud
+from app.db import snapshots
+from app.db.session import create_db_engine, get_read_db
+from app.main import app
+from app.routers.macro import response_cache
+from app.services import bls
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "bls.db")
+    conn = sqlite3.connect(path)
+    bls.ensure_bls_schema(conn)
+    conn.execute("INSERT INTO bls_summary_data VALUES ('Consumer Price Index', 0.2, NULL)")
+    bls.bump_data_version(conn)
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def client(db_path):
+    engine = create_db_engine(f"sqlite:///{db_path}", read_only=True)
+    TestingSession = sessionmaker(bind=engine)
+
+    def override_get_db():
+        db = TestingSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_read_db] = override_get_db
+    response_cache.clear()
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    engine.dispose()
+
+
+def test_indicators_return_etag_and_last_modified(client):
+    response = client.get("/api/v1/macro/bls/indicators")
+
+    assert response.status_code == 200
+    assert response.json() == [{"series name": "Consumer Price Index", "latest_mom_chg": 0.2, "latest_yoy_chg": None}]
+    assert response.headers["ETag"]
+    assert response.headers["Last-Modified"].endswith("GMT")
+
+
+def test_matching_etag_returns_304(client):
+    etag = client.get("/api/v1/macro/bls/indicators").headers["ETag"]
+
+    response = client.get("/api/v1/macro/bls/indicators", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+
+def test_version_bump_invalidates_cache(client, db_path):
+    etag = client.get("/api/v1/macro/bls/indicators").headers["ETag"]
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE bls_summary_data SET latest_mom_chg = 0.5")
+    bls.bump_data_version(conn)
+    conn.commit()
+    conn.close()
+
+    response = client.get("/api/v1/macro/bls/indicators", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()[0]["latest_mom_chg"] == 0.5
+
+
+def test_matrix_endpoint_pages_with_cursor(client, db_path):
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO bls_combined_data (series, year, M01) VALUES (?, ?, ?)",
+        [(name, year, 1.0) for name in ("Core CPI", "Job Openings") for year in range(2020, 2025)]
+    )
+    conn.commit()
+    conn.close()
+
+    params = {"series": ["Job Openings"], "months": ["M01"], "limit": 4}
+    first = client.get("/api/v1/macro/bls/matrix", params=params).json()
+    assert [row["year"] for row in first["data"]] == [2020, 2021, 2022, 2023]
+
+    second = client.get("/api/v1/macro/bls/matrix", params={**params, "cursor": first["next_cursor"]}).json()
+    assert [row["year"] for row in second["data"]] == [2024]
+    assert second["next_cursor"] is None
+
+
+def test_matrix_endpoint_rejects_bad_cursor(client):
+    response = client.get("/api/v1/macro/bls/matrix", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_series_range_is_served_from_the_snapshot(tmp_path):
+    path = str(tmp_path / "series.db")
+    conn = sqlite3.connect(path)
+    bls.ensure_bls_schema(conn)
+    data = [
+        {"year": str(year), "period": f"M{month:02d}", "value": str(100 + year - 2020 + month / 100)}
+        for year in range(2020, 2025) for month in range(1, 13)
+    ]
+    bls.store_bls_payload(conn, [{"seriesID": "CUSR0000SA0", "data": data}])
+    conn.close()
+
+    engine = create_db_engine(f"sqlite:///{path}", read_only=True)
+    db = sessionmaker(bind=engine)()
+    try:
+        body = crud.get_series_points_json(db, "CUSR0000SA0", start=(2022, 11), end=(2023, 2))
+        assert os.path.exists(snapshots.snapshot_path("CUSR0000SA0", path))
+        # Same rows as the SQL range query
+        expected = crud.get_series_points(db, "CUSR0000SA0", start=(2022, 11), end=(2023, 2))
+        assert json.loads(body) == expected
+        assert [(row["year"], row["month"]) for row in expected] == [(2022, 11), (2022, 12), (2023, 1), (2023, 2)]
+        assert crud.get_series_points_json(db, "UNKNOWN") == b"[]"
+    finally:
+        db.close()
+        engine.dispose()
@@ -0,0 +1,93 @@
+from datetime import date
+
+import httpx
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.core.client import HTTPClient
+from app.core.metrics import (
+    DB_QUERY_SECONDS, HTTP_REQUEST_SECONDS, UPSTREAM_FAILURES, UPSTREAM_REQUEST_SECONDS,
+    Histogram, MetricsRegistry, instrument_engine
+)
+from app.db.sqlite import close_connections
+from app.main import app
+from app.services import bls
+from app.services.price_store import PriceStore
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.register(Histogram("job_seconds", "Job time", ["job"], buckets=(0.1, 1.0)))
+    histogram.observe(0.05, job='say "hi"')
+    histogram.observe(0.5, job='say "hi"')
+    histogram.observe(5.0, job='say "hi"')
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP job_seconds Job time", "# TYPE job_seconds histogram"]
+    assert 'job_seconds_bucket{job="say \\"hi\\"",le="0.1"} 1' in lines
+    assert 'job_seconds_bucket{job="say \\"hi\\"",le="1"} 2' in lines
+    assert 'job_seconds_bucket{job="say \\"hi\\"",le="+Inf"} 3' in lines
+    assert 'job_seconds_count{job="say \\"hi\\""} 3' in lines
+
+    with pytest.raises(ValueError):
+        registry.register(Histogram("job_seconds", "Again"))
+
+
+def test_requests_are_timed_by_route_template():
+    client = TestClient(app)
+    before = HTTP_REQUEST_SECONDS.count(method="GET", route="/health", status="200")
+    client.get("/health")
+    client.get("/no-such-page")
+
+    assert HTTP_REQUEST_SECONDS.count(method="GET", route="/health", status="200") == before + 1
+    assert HTTP_REQUEST_SECONDS.count(method="GET", route="unmatched", status="404") >= 1
+
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in response.text
+
+
+def test_sql_statements_are_timed(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'metrics.db'}")
+    instrument_engine(engine, "test")
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE t (x INTEGER)"))
+            conn.execute(text("SELECT * FROM t"))
+            with pytest.raises(Exception):
+                conn.execute(text("SELECT * FROM missing"))
+            conn.execute(text("SELECT * FROM t"))
+    finally:
+        engine.dispose()
+    assert DB_QUERY_SECONDS.count(engine="test", operation="SELECT") == 2
+    assert DB_QUERY_SECONDS.count(engine="test", operation="CREATE") == 1
+
+
+def test_upstream_failures_are_counted(monkeypatch):
+    monkeypatch.setattr(HTTPClient, "client", httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(404))))
+    labels = {"source": "bls", "operation": "fetch_bls_data"}
+    failures = UPSTREAM_FAILURES.value(**labels)
+    calls = UPSTREAM_REQUEST_SECONDS.count(**labels)
+    try:
+        with pytest.raises(bls.BLSError):
+            bls.fetch_bls_data(["CUSR0000SA0"], "2023", "2024")
+    finally:
+        HTTPClient.close()
+    assert UPSTREAM_FAILURES.value(**labels) == failures + 1
+    assert UPSTREAM_REQUEST_SECONDS.count(**labels) == calls + 1
+
+
+def test_empty_price_downloads_are_counted_as_failures(tmp_path):
+    labels = {"source": "yfinance", "operation": "download"}
+    failures = UPSTREAM_FAILURES.value(**labels)
+    calls = UPSTREAM_REQUEST_SECONDS.count(**labels)
+    # yf.download returns an empty frame rather than raising when it fails
+    store = PriceStore(str(tmp_path / "prices.db"), downloader=lambda *args, **kwargs: pd.DataFrame())
+    try:
+        store.get_prices(["SPY"], date(2024, 1, 1), date(2024, 1, 31))
+    finally:
+        close_connections()
+    assert UPSTREAM_REQUEST_SECONDS.count(**labels) == calls + 1
+    assert UPSTREAM_FAILURES.value(**labels) == failures + 1
@@ -0,0 +1,115 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.db.sqlite import close_connections
+from app.services.market_reaction import MarketReactionService
+from app.services.price_store import PriceStore
+
+
+class FakeDownloader:
+    """Mimic yf.download(group_by="ticker") over business days and record calls"""
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, tickers, start, end, **kwargs):
+        self.calls.append((list(tickers), start, end))
+        index = pd.bdate_range(start, pd.Timestamp(end) - pd.Timedelta(days=1), name="Date")
+        frames = {}
+        for i, ticker in enumerate(tickers):
+            close = 100.0 + i + np.arange(len(index), dtype="float64")
+            frames[ticker] = pd.DataFrame(
+                {"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Adj Close": close, "Volume": 1e6},
+                index=index
+            )
+        return pd.concat(frames, axis=1)
+
+
+@pytest.fixture(autouse=True)
+def shared_connections():
+    yield
+    close_connections()
+
+
+@pytest.fixture
+def downloader():
+    return FakeDownloader()
+
+
+@pytest.fixture
+def service(tmp_path, downloader):
+    return MarketReactionService(price_store=PriceStore(str(tmp_path / "prices.db"), downloader=downloader))
+
+
+def test_events_share_one_batched_download(service, downloader):
+    service.get_assets_data(date(2024, 1, 1), date(2024, 6, 28))
+    assert len(downloader.calls) == 1
+    assert sorted(downloader.calls[0][0]) == sorted(service.asset_classes.values())
+
+    for event in ["2024-02-13", "2024-03-12", "2024-04-10"]:
+        result = service.analyze_market_reaction(pd.Timestamp(event).to_pydatetime(), "CPI", "CPI release")
+        assert result["asset_reactions"]["stocks"]["total_change"] is not None
+    assert len(downloader.calls) == 1
+
+
+def test_only_missing_gap_is_downloaded(service, downloader):
+    service.get_assets_data(date(2024, 3, 1), date(2024, 3, 31))
+    service.get_assets_data(date(2024, 2, 1), date(2024, 3, 31))
+
+    _, start, end = downloader.calls[-1]
+    assert (start, end) == ("2024-02-01", "2024-03-01")
+
+
+def test_store_is_reused_from_disk(tmp_path, downloader):
+    db_path = str(tmp_path / "prices.db")
+    PriceStore(db_path, downloader=downloader).get_prices(["^GSPC"], date(2024, 1, 1), date(2024, 1, 31))
+
+    fresh = PriceStore(db_path, downloader=downloader)
+    bars = fresh.get_prices(["^GSPC"], date(2024, 1, 8), date(2024, 1, 12))["^GSPC"]
+    assert len(downloader.calls) == 1
+    assert list(bars.index.day) == [8, 9, 10, 11, 12]
+
+
+def test_todays_bar_is_not_refetched_within_ttl(service, downloader):
+    today = date.today()
+    service.get_assets_data(today - timedelta(days=10), today)
+    service.get_assets_data(today - timedelta(days=10), today)
+    assert len(downloader.calls) == 1
+
+
+def test_download_failures_are_logged_and_return_empty_frames(tmp_path, caplog):
+    def failing_downloader(*args, **kwargs):
+        raise ConnectionError("Yahoo is down")
+
+    service = MarketReactionService(price_store=PriceStore(str(tmp_path / "prices.db"), downloader=failing_downloader))
+    with caplog.at_level("ERROR", logger="app.services.market_reaction"):
+        frames = service.get_assets_data(date.today() - timedelta(days=10), date.today())
+
+    assert all(frame.empty for frame in frames.values())
+    assert "Yahoo is down" in caplog.text
+
+
+def test_empty_download_is_not_recorded_as_fetched(tmp_path, downloader):
+    # yf.download returns an empty frame on network and ticker failures
+    responses = [pd.DataFrame()]
+
+    def flaky_downloader(tickers, start, end, **kwargs):
+        return responses.pop() if responses else downloader(tickers, start, end, **kwargs)
+
+    store = PriceStore(str(tmp_path / "prices.db"), downloader=flaky_downloader)
+    start, end = date(2024, 1, 1), date(2024, 3, 29)
+
+    assert store.get_prices(["SPY"], start, end)["SPY"].empty
+    assert store.missing_ranges("SPY", start, end) == [(start, end)]
+    assert not store.get_prices(["SPY"], start, end)["SPY"].empty
+    assert store.missing_ranges("SPY", start, end) == []
+
+
+def test_range_without_trading_days_is_recorded(tmp_path):
+    store = PriceStore(str(tmp_path / "prices.db"), downloader=lambda *args, **kwargs: pd.DataFrame())
+    saturday, sunday = date(2024, 3, 2), date(2024, 3, 3)
+
+    store.get_prices(["SPY"], saturday, sunday)
+    assert store.missing_ranges("SPY", saturday, sunday) == []
@@ -0,0 +1,70 @@
+import json
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.profiling import ProfilingMiddleware
+
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return total
+
+
+@pytest.fixture
+def profiled(tmp_path):
+    app = FastAPI()
+
+    @app.get("/sync")
+    def sync_endpoint():
+        return {"total": busy_loop(0.1)}
+
+    @app.get("/async")
+    async def async_endpoint():
+        return {"total": busy_loop(0.1)}
+
+    app.add_middleware(ProfilingMiddleware, token="secret", profile_dir=str(tmp_path), interval=0.001)
+    return TestClient(app), tmp_path
+
+
+def test_requests_without_the_token_are_not_profiled(profiled):
+    client, profile_dir = profiled
+    responses = (
+        client.get("/sync"),
+        client.get("/sync", headers={"X-Profile-Token": "wrong"}),
+        # The token is only accepted in the header, never in the URL
+        client.get("/sync?profile=secret"),
+    )
+    for response in responses:
+        assert response.status_code == 200
+        assert "x-profile-file" not in response.headers
+    assert list(profile_dir.iterdir()) == []
+
+
+@pytest.mark.parametrize("path", ["/sync", "/async"])
+def test_profile_is_saved_to_disk(profiled, path):
+    client, profile_dir = profiled
+    response = client.get(path, headers={"X-Profile-Token": "secret"})
+
+    assert response.status_code == 200 and "total" in response.json()
+    report = json.loads((profile_dir / response.headers["x-profile-file"]).read_text())
+    assert report["status"] == 200 and report["samples"] > 10
+    assert report["top"][0]["function"].startswith("busy_loop")
+    endpoint = report["call_tree"]["children"][0]
+    assert endpoint["function"].startswith(path.strip("/") + "_endpoint")
+    assert endpoint["children"][0]["function"].startswith("busy_loop")
+
+
+def test_profile_can_replace_the_response(profiled):
+    client, profile_dir = profiled
+    response = client.get("/sync?profile_output=response", headers={"X-Profile-Token": "secret"})
+
+    report = response.json()
+    assert report["path"] == "/sync"
+    assert any(entry["function"].startswith("busy_loop") for entry in report["top"])
+    assert (profile_dir / response.headers["x-profile-file"]).exists()
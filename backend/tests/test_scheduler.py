@@ -0,0 +1,123 @@
+import json
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.db.sqlite import close_connections
+from app.services import bls, scheduler
+from app.services.bls_planner import BLSRequestPlanner
+
+CPI = "CUSR0000SA0"
+CORE = "CUSR0000SA0L1E"
+PAYROLLS = "CES0000000001"
+RELEASE = datetime(2024, 8, 14, 12, 30)
+
+
+def make_series(series_id, last_month):
+    data = [
+        {"year": "2024", "period": f"M{month:02d}", "value": str(100.0 + month), "latest": "false"}
+        for month in range(last_month, 0, -1)
+    ]
+    data[0]["latest"] = "true"
+    return {"seriesID": series_id, "data": data}
+
+
+@pytest.fixture(autouse=True)
+def shared_connections():
+    yield
+    close_connections()
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    calls = []
+    history = {CPI: make_series(CPI, 6), CORE: make_series(CORE, 6), PAYROLLS: make_series(PAYROLLS, 6)}
+
+    def fetch(series_ids, start_year, end_year):
+        calls.append(list(series_ids))
+        return {"Results": {"series": [history[s] for s in series_ids]}}
+
+    monkeypatch.setattr(bls, "fetch_bls_data", fetch)
+    return history, calls
+
+
+@pytest.fixture
+def db_path(tmp_path, fake_api):
+    path = str(tmp_path / "bls.db")
+    conn = sqlite3.connect(path)
+    scheduler.ensure_calendar_schema(conn)
+    scheduler.register_series(conn, CPI, "CPI", next_update=RELEASE)
+    scheduler.register_series(conn, CORE, "Core CPI", next_update=RELEASE)
+    scheduler.register_series(conn, PAYROLLS, "Payrolls", next_update=RELEASE + timedelta(days=20))
+    conn.close()
+    # Initial load of the stored history
+    bls.ingest_bls_data([CPI, CORE, PAYROLLS], "2024", "2024", db_path=path)
+    return path
+
+
+def test_series_released_together_share_one_job(db_path):
+    jobs = []
+    dispatcher = scheduler.ReleaseDispatcher(lambda ids, at: jobs.append((sorted(ids), at)), db_path)
+
+    assert dispatcher.tick(RELEASE - timedelta(minutes=1)) == 0
+    assert dispatcher.tick(RELEASE + timedelta(minutes=1)) == 1
+    assert jobs == [(sorted([CPI, CORE]), RELEASE)]
+    # Leased until the retry time, so the next tick doesn't enqueue it again
+    assert dispatcher.tick(RELEASE + timedelta(minutes=2)) == 0
+
+
+def test_leases_are_shared_between_dispatchers(db_path):
+    jobs = []
+    # Separate instances stand in for dispatchers in different worker processes
+    first = scheduler.ReleaseDispatcher(lambda ids, at: jobs.append(sorted(ids)), db_path)
+    second = scheduler.ReleaseDispatcher(lambda ids, at: jobs.append(sorted(ids)), db_path)
+
+    assert first.tick(RELEASE + timedelta(minutes=1)) == 1
+    assert second.tick(RELEASE + timedelta(minutes=2)) == 0
+    assert second.tick(RELEASE + timedelta(minutes=scheduler.RELEASE_RETRY_MINUTES + 2)) == 1
+    assert jobs == [sorted([CPI, CORE])] * 2
+
+
+def test_default_retries_fit_the_v1_quota():
+    retries = scheduler.RELEASE_WINDOW_HOURS * 60 // scheduler.RELEASE_RETRY_MINUTES
+    assert retries < BLSRequestPlanner("v1").daily_queries
+
+
+def test_published_series_move_on_and_late_ones_are_retried(db_path, fake_api):
+    history, calls = fake_api
+    history[CPI] = make_series(CPI, 7)
+    now = RELEASE + timedelta(minutes=1)
+
+    result = scheduler.refresh_release([CPI, CORE], RELEASE, db_path=db_path, now=now)
+    assert result == {"updated": [CPI], "unchanged": [CORE]}
+    assert calls[-1] == [CPI, CORE]
+
+    calendar = scheduler.get_release_calendar(sqlite3.connect(db_path))
+    assert calendar[CPI][0] == datetime(2024, 9, 14, 12, 30)
+    assert calendar[CORE][0] == RELEASE
+
+    jobs = []
+    dispatcher = scheduler.ReleaseDispatcher(lambda ids, at: jobs.append(ids), db_path)
+    dispatcher.tick(now)
+    dispatcher.tick(now + timedelta(minutes=scheduler.RELEASE_RETRY_MINUTES + 1))
+    assert jobs == [[CORE], [CORE]]
+
+
+def test_published_calendar_sets_next_release():
+    times = [datetime(2024, 8, 14, 12, 30), datetime(2024, 9, 11, 12, 30)]
+    assert scheduler.next_release_after(datetime(2024, 8, 14, 13), times[0], "Monthly", times) == times[1]
+    assert scheduler.next_release_after(datetime(2024, 9, 12), times[1], "Monthly", times) == datetime(2024, 10, 11, 12, 30)
+
+
+def test_release_schedule_is_read_from_indicator_metadata(db_path):
+    conn = sqlite3.connect(db_path)
+    indicator_id = conn.execute("SELECT id FROM indicators WHERE series_id = ?", (CPI,)).fetchone()[0]
+    conn.execute(
+        "INSERT INTO indicator_metadata (indicator_id, release_schedule) VALUES (?, ?)",
+        (indicator_id, json.dumps({"release_times": ["2024-09-11T12:30:00"]}))
+    )
+    conn.commit()
+
+    assert scheduler.get_release_calendar(conn)[CPI][2] == [datetime(2024, 9, 11, 12, 30)]
+    conn.close()
@@ -0,0 +1,181 @@
+import re
+import sqlite3
+
+import numpy as np
+import pytest
+import textblob.blob
+from textblob import TextBlob
+from textblob.base import BaseNPExtractor
+
+from app.core.cache import TieredCache
+from app.db.sqlite import close_connections
+from app.services.sentiment_service import RunningStats, SentimentAccumulator, SentimentService, text_key
+
+
+class KeywordExtractor(BaseNPExtractor):
+    """Noun phrases from a fixed vocabulary, so no NLTK corpora are needed"""
+    PHRASES = ("cloud revenue", "demand", "europe", "growth engine")
+
+    def extract(self, text):
+        lowered = text.lower()
+        return [phrase for phrase in self.PHRASES if phrase in lowered]
+
+
+@pytest.fixture
+def offline_nlp(monkeypatch):
+    """Split sentences on terminal punctuation instead of NLTK's punkt model"""
+    monkeypatch.setattr(
+        textblob.blob, "sent_tokenize",
+        lambda text: [sentence for sentence in re.split(r"(?<=[.!?])\s+", text.strip()) if sentence]
+    )
+    return SentimentService(np_extractor=KeywordExtractor())
+
+TRANSCRIPT = (
+    "Cloud revenue grew strongly this quarter. "
+    "Cloud revenue beat our own expectations. "
+    "We saw weak demand in Europe. "
+    "Cloud revenue remains our best growth engine."
+)
+
+
+def test_analyze_text_matches_textblob_polarity():
+    text = "Guidance was raised, but margins were disappointing"
+    assert SentimentService().analyze_text(text)["textblob_score"] == TextBlob(text).sentiment.polarity
+
+
+def test_analyze_text_combines_both_scores():
+    scores = SentimentService().analyze_text("Excellent results and strong growth")
+    assert scores["combined_score"] == pytest.approx((scores["textblob_score"] + scores["vader_score"]) / 2)
+    assert scores["combined_score"] > 0.05
+
+
+def test_earnings_call_scores_each_sentence_once(monkeypatch, offline_nlp):
+    service = offline_nlp
+    calls = []
+    combine = service._combine_scores
+    monkeypatch.setattr(service, "_combine_scores", lambda text, polarity: calls.append(text) or combine(text, polarity))
+
+    result = service.analyze_earnings_call(TRANSCRIPT)
+
+    assert result["sample_size"] == 4
+    assert len(calls) == 4
+    assert "cloud revenue" in result["topic_sentiments"]
+    cloud = [str(s) for s in TextBlob(TRANSCRIPT).sentences if "Cloud revenue" in str(s)]
+    expected = sum(service.analyze_text(s)["combined_score"] for s in cloud) / len(cloud)
+    assert result["topic_sentiments"]["cloud revenue"] == pytest.approx(expected)
+
+
+HEADLINES = [
+    "Stocks rally as inflation cools",
+    "Bank shares plunge on weak earnings",
+    "Fed holds rates steady",
+    "Strong jobs report lifts markets",
+    "Oil prices crash amid recession fears",
+]
+
+
+def test_running_stats_merge_matches_numpy():
+    values = [0.3, -0.2, 0.9, 0.0, -0.7, 0.4, 0.1]
+    left, right = RunningStats(), RunningStats()
+    for value in values[:3]:
+        left.add(value)
+    for value in values[3:]:
+        right.add(value)
+
+    merged = left.merge(right)
+    assert merged.count == len(values)
+    assert merged.mean == pytest.approx(np.mean(values))
+    assert merged.std == pytest.approx(np.std(values))
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_batch_matches_analyze_texts(max_workers):
+    service = SentimentService()
+    texts = HEADLINES * 20
+
+    expected = service.analyze_texts(texts)
+    result = service.analyze_texts_batch(iter(texts), max_workers=max_workers, chunk_size=7)
+
+    assert result["sample_size"] == expected["sample_size"]
+    assert result["sentiment_label"] == expected["sentiment_label"]
+    assert result["sentiment_score"] == pytest.approx(expected["sentiment_score"])
+    assert result["confidence"] == pytest.approx(expected["confidence"])
+
+
+def test_batch_workers_use_the_callers_cache(tmp_path):
+    db_path = str(tmp_path / "scores.db")
+    service = SentimentService(cache=TieredCache(db_path, "worker_scores"))
+
+    service.analyze_texts_batch(iter(HEADLINES), max_workers=2, chunk_size=2)
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM worker_scores").fetchone()[0] == len(HEADLINES)
+    conn.close()
+    close_connections()
+
+
+def test_cached_scores_cannot_be_mutated_by_callers():
+    service = SentimentService(cache=TieredCache(None, "scores"))
+    first = service.analyze_text("Strong jobs report lifts markets")
+    first["vader_details"]["compound"] = 99.0
+    first["combined_score"] = 99.0
+
+    again = service.analyze_text("Strong jobs report lifts markets")
+    assert again["vader_details"]["compound"] != 99.0
+    assert again["combined_score"] != 99.0
+
+
+def test_batch_of_nothing_is_neutral():
+    assert SentimentService().analyze_texts_batch([], max_workers=2)["sample_size"] == 0
+
+
+def test_text_stream_matches_analyze_texts():
+    service = SentimentService()
+    texts = HEADLINES * 10
+
+    result = service.analyze_text_stream(text for text in texts)
+    expected = service.analyze_texts(texts)
+    assert result["sample_size"] == expected["sample_size"]
+    assert result["sentiment_score"] == pytest.approx(expected["sentiment_score"])
+    assert result["confidence"] == pytest.approx(expected["confidence"])
+
+
+def test_accumulator_bounds_tracked_topics():
+    accumulator = SentimentAccumulator(max_topics=10)
+    for i in range(100):
+        accumulator.add(0.5, ["revenue", f"rare phrase {i}"])
+
+    assert len(accumulator.topics) <= 10
+    assert accumulator.topics["revenue"].count == 100
+    assert accumulator.topic_sentiments() == {"revenue": pytest.approx(0.5)}
+
+
+def test_streamed_transcript_matches_whole_transcript(offline_nlp):
+    service = offline_nlp
+    words = TRANSCRIPT.split(" ")
+    chunks = (" ".join(words[i:i + 3]) for i in range(0, len(words), 3))
+
+    streamed = service.analyze_earnings_call(chunks)
+    whole = service.analyze_earnings_call(TRANSCRIPT)
+    assert streamed["sample_size"] == whole["sample_size"]
+    assert streamed["topic_sentiments"] == pytest.approx(whole["topic_sentiments"])
+
+
+def test_repeated_text_is_served_from_cache(tmp_path):
+    cache = TieredCache(str(tmp_path / "scores.db"), "sentiment_score_cache")
+    service = SentimentService(cache=cache)
+
+    first = service.analyze_text("Thank you, operator.")
+    again = service.analyze_text("  Thank you,\toperator. ")
+    service.analyze_texts(["Thank you, operator."] * 3)
+
+    assert again == first
+    stats = service.cache_stats()
+    assert stats["misses"] == 1
+    assert stats["memory_hits"] == 4
+    close_connections()
+
+
+def test_case_changes_the_cache_key():
+    assert text_key("GREAT quarter") != text_key("great quarter")
+    assert text_key("great  quarter") == text_key("great quarter")
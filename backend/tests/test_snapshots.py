@@ -0,0 +1,75 @@
+import os
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import bls as crud
+from app.db import snapshots
+from app.services import bls
+
+CPI = "CUSR0000SA0"
+
+
+def payload(start_year, end_year, bump=0.0):
+    data = [
+        {"year": str(year), "period": f"M{month:02d}", "value": str(100.0 + year - start_year + month / 100 + bump)}
+        for year in range(start_year, end_year + 1)
+        for month in range(1, 13)
+    ]
+    return [{"seriesID": CPI, "data": data}]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "bls.db")
+    conn = sqlite3.connect(path)
+    bls.ensure_bls_schema(conn)
+    bls.store_bls_payload(conn, payload(2000, 2024))
+    conn.close()
+    return path
+
+
+def test_snapshot_is_written_and_memory_mapped(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        assert snapshots.refresh_snapshots(conn, [CPI], db_path) == 1
+        assert snapshots.refresh_snapshots(conn, [CPI], db_path) == 0
+
+        arrays = snapshots.load_series_arrays(conn, CPI, db_path)
+    finally:
+        conn.close()
+
+    assert os.path.exists(snapshots.snapshot_path(CPI, db_path))
+    assert len(arrays["value"]) == 25 * 12
+    assert arrays["year"][0] == 2000 and arrays["month"][-1] == 12
+    # Zero-copy views into the mapping are read-only
+    assert not arrays["value"].flags.writeable
+
+
+def test_changed_data_invalidates_snapshot(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        snapshots.refresh_snapshots(conn, [CPI], db_path)
+        bls.store_bls_payload(conn, payload(2024, 2024, bump=1.0))
+
+        history = snapshots.load_series_history(conn, CPI, db_path)
+    finally:
+        conn.close()
+
+    assert history["value"].iloc[-1] == pytest.approx(101.12)
+    assert history["is_revised"].iloc[-1]
+
+
+def test_crud_reads_history_from_snapshot(db_path):
+    engine = create_engine(f"sqlite:///{db_path}")
+    db = sessionmaker(bind=engine)()
+    try:
+        history = crud.get_series_history(db, CPI)
+        assert list(history.columns) == snapshots.SNAPSHOT_COLUMNS
+        assert len(history) == 300
+        assert crud.get_series_history(db, "UNKNOWN").empty
+    finally:
+        db.close()
+        engine.dispose()
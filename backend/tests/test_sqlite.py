@@ -0,0 +1,101 @@
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.db.session import DB_MAX_OVERFLOW, DB_POOL_SIZE, create_db_engine, engine_options
+from app.core.cache import TieredCache
+from app.db.sqlite import apply_pragmas, close_connections, get_connection, get_connection_lock
+from app.services.fred_service import FREDObservationCache
+from app.services.price_store import PriceStore
+
+
+def test_shared_connection_is_reused_and_tuned(tmp_path):
+    db_path = str(tmp_path / "store.db")
+    try:
+        conn = get_connection(db_path)
+        assert get_connection(db_path) is conn
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    finally:
+        close_connections()
+
+
+def test_pragmas_are_configurable(tmp_path):
+    db_path = str(tmp_path / "store.db")
+    try:
+        conn = get_connection(db_path)
+        apply_pragmas(conn, {"synchronous": "FULL", "cache_size": -1024})
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -1024
+    finally:
+        close_connections()
+
+
+def test_stores_on_a_shared_connection_serialize_transactions(tmp_path):
+    db_path = str(tmp_path / "store.db")
+    try:
+        fred = FREDObservationCache(db_path)
+        prices = PriceStore(db_path, downloader=None)
+        cache = TieredCache(db_path, "shared_cache", write_batch_size=1)
+        assert fred._lock is prices._lock is get_connection_lock(db_path)
+
+        conn = get_connection(db_path)
+        writer = threading.Thread(target=cache.set, args=("key", 1))
+        with get_connection_lock(db_path):
+            conn.execute("INSERT INTO fred_observations (series_id, date, value) VALUES ('GDP', '2024-01-01', 1.0)")
+            writer.start()
+            writer.join(0.2)
+            # The cache flush waits for the open transaction
+            assert writer.is_alive()
+            conn.rollback()
+        writer.join()
+
+        # ...and commits on its own instead of inside the rolled back one
+        assert conn.execute("SELECT COUNT(*) FROM shared_cache").fetchone()[0] == 1
+        assert conn.execute("SELECT COUNT(*) FROM fred_observations").fetchone()[0] == 0
+    finally:
+        close_connections()
+
+
+def test_engine_options_pool_server_databases():
+    options = engine_options("postgresql://user:password@db:5432/investor_gps")
+    assert options["pool_size"] == DB_POOL_SIZE
+    assert options["max_overflow"] == DB_MAX_OVERFLOW
+    assert options["pool_pre_ping"] is True
+    assert "pool_size" not in engine_options("sqlite://")
+
+
+def test_read_only_engine_is_tuned_and_refuses_writes(tmp_path):
+    url = f"sqlite:///{tmp_path / 'store.db'}"
+    writer = create_db_engine(url)
+    reader = create_db_engine(url, read_only=True)
+    try:
+        with writer.begin() as conn:
+            conn.execute(text("CREATE TABLE t (x INTEGER)"))
+            conn.execute(text("INSERT INTO t VALUES (1)"))
+        with reader.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("SELECT x FROM t")).scalar() == 1
+            with pytest.raises(OperationalError, match="readonly"):
+                conn.execute(text("INSERT INTO t VALUES (2)"))
+    finally:
+        writer.dispose()
+        reader.dispose()
+
+
+def test_api_engine_ignores_the_alembic_database_url(tmp_path):
+    # DATABASE_URL names the Postgres database ingestion doesn't write to
+    env = dict(os.environ, DATABASE_URL="postgresql://user:password@db:5432/investor_gps",
+               BLS_DB_PATH=str(tmp_path / "bls.db"))
+    env.pop("BLS_DATABASE_URL", None)
+    env.pop("BLS_DATABASE_READ_URL", None)
+    urls = subprocess.run(
+        [sys.executable, "-c", "from app.db.session import engine, read_engine; print(engine.url, read_engine.url)"],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout.split()
+    assert urls == [f"sqlite:///{tmp_path / 'bls.db'}"] * 2